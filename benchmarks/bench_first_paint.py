@@ -0,0 +1,97 @@
+# Benchmark: opening one large category in the title list.
+# Measures the time from opening the category to the first painted screen, how long it takes until every title
+# is fetched and laid out, and the longest event loop turn in the meantime (the window does not react to input
+# during a turn). "paged" is the list of the main window: SnippetListModel fetches its first page and the rest
+# when idle, the view lays out in batches. "all rows" fetches every title at once and lays them out in one pass.
+#
+# Runs headless (offscreen Qt platform).
+#
+# Usage: python benchmarks/bench_first_paint.py [--sizes 1000,10000,50000]
+import argparse
+import os
+import platform
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from synthetic_config import write_config  # noqa: E402 (also puts src on sys.path)
+
+from PyQt5.QtWidgets import QApplication, QListView  # noqa: E402
+
+from fastfill.core import ConfigStore  # noqa: E402
+from fastfill.models import SnippetListModel  # noqa: E402
+
+TIMEOUT = 30  # seconds until the list has to be laid out completely
+
+
+def create_view(model, paged):
+    view = QListView()
+    view.setUniformItemSizes(True)
+    view.setLayoutMode(QListView.Batched if paged else QListView.SinglePass)
+    view.setBatchSize(100)
+    view.resize(450, 520)  # like the list of the main window
+    view.setModel(model)
+    view.show()
+    return view
+
+
+def open_category(app, store, section, paged):
+    """
+    Returns (first paint, until laid out, longest event loop turn) in seconds.
+    """
+    model = SnippetListModel(store)
+    view = create_view(model, paged)
+    app.processEvents()
+
+    start = time.perf_counter()
+    model.set_section(section)
+    if not paged:
+        model.fetch_all()
+    view.repaint()
+    first_paint = time.perf_counter() - start
+
+    longest = 0
+    last_index = None
+    deadline = start + TIMEOUT
+    while time.perf_counter() < deadline:
+        turn = time.perf_counter()
+        app.processEvents()
+        longest = max(longest, time.perf_counter() - turn)
+        if not model.canFetchMore():
+            last_index = last_index or model.index(model.rowCount() - 1)
+            if view.visualRect(last_index).isValid():
+                break
+    laid_out = time.perf_counter() - start
+
+    view.close()
+    return first_paint, laid_out, longest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="1000,10000,50000", help="titles in the category, comma separated")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    print("FastFill first paint of a category")
+    print(f"Python {platform.python_version()} on {platform.platform()}\n")
+    print(f"{'titles':>8}  {'list':<9}{'first paint ms':>16}{'laid out ms':>13}{'longest turn ms':>17}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size in [int(size) for size in args.sizes.split(",")]:
+            path = os.path.join(directory, f"FastFillConfig-{size}.ini")
+            write_config(path, size, size)  # one category
+            store = ConfigStore(path, save_delay=3600)
+            section = store.sections()[0]
+            store.titles(section)  # the title index is built when the category is opened first
+
+            for paged in (False, True):
+                first_paint, laid_out, longest = open_category(app, store, section, paged)
+                print(f"{size:>8,}  {'paged' if paged else 'all rows':<9}{first_paint * 1000:>16.1f}"
+                      f"{laid_out * 1000:>13.1f}{longest * 1000:>17.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+# Benchmark: config writes during a drag-reorder session.
+# Every row moved in the title list fires save_title_order, which reorders the section and saves the config.
+# This compares writing the whole file on every move (how FastFill used to save) with the
+# debounced, atomic write-behind of ConfigStore.
+#
+# Usage: python benchmarks/bench_reorder_writes.py [--snippets 2000] [--moves 500]
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from fastfill.core.store import ConfigStore  # noqa: E402
+
+
+def write_config(path, snippets):
+    with open(path, 'w') as cfg:
+        cfg.write("[Category 1]\n")
+        for i in range(1, snippets + 1):
+            cfg.write(f"item{i}_title = Title {i}\n")
+            cfg.write(f"item{i}_content = Content of title {i} with some text\n")
+
+
+def run_session(store, moves, write_every_move):
+    """
+    Moves a random row to a random position `moves` times, like dragging rows in the list.
+    Returns the latency of each move as seen by the GUI thread.
+    """
+    rng = random.Random(42)
+    titles = [title for title, _ in store.titles("Category 1")]
+    latencies = []
+
+    for _ in range(moves):
+        row = rng.randrange(len(titles))
+        titles.insert(rng.randrange(len(titles)), titles.pop(row))
+
+        start = time.perf_counter()
+        store.reorder_snippets("Category 1", titles)
+        if write_every_move:
+            with open(store.path, 'w') as cfg:  # the old synchronous, non-atomic save
+                store._config.write(cfg)
+        else:
+            store.save()
+        latencies.append(time.perf_counter() - start)
+
+    return latencies
+
+
+def report(name, latencies, writes, total):
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(f"{name:<24} writes: {writes:>5}   move p50: {p50:7.3f} ms   move p99: {p99:7.3f} ms   "
+          f"session incl. final write: {total * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--snippets", type=int, default=2000)
+    parser.add_argument("--moves", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"Reorder session: {args.moves} moves in a category with {args.snippets} titles\n")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "FastFillConfig.ini")
+
+        write_config(path, args.snippets)
+        store = ConfigStore(path)
+        start = time.perf_counter()
+        latencies = run_session(store, args.moves, write_every_move=True)
+        report("write on every move", latencies, args.moves, time.perf_counter() - start)
+
+        write_config(path, args.snippets)
+        store = ConfigStore(path)
+        start = time.perf_counter()
+        latencies = run_session(store, args.moves, write_every_move=False)
+        store.flush()
+        report("debounced write-behind", latencies, store._writer.write_count, time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    main()
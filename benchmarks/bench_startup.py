@@ -0,0 +1,125 @@
+# Benchmark: cold start until the tray icon exists.
+# FastFill starts with Windows, so this is the time users wait for after logging in. Every run starts a fresh
+# interpreter with `python -X importtime`, goes through the same steps as main.py's __main__ block
+# (without the event loop) and reads the phases of main.startup_timer.
+#
+# The benchmark fails (exit code 1) if the median time to the tray icon is above --budget-ms,
+# or if a module that main.py imports on first use was already imported at startup.
+#
+# Usage: python benchmarks/bench_startup.py [--runs 5] [--budget-ms 1500] [--snippets 2000] [--imports 10]
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from synthetic_config import write_config
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+# Imported on first use only, see the top of main.py
+LAZY_MODULES = ["cryptography", "pyqttoast", "requests", "urllib3", "win32com", "webbrowser", "plyer"]
+
+STARTUP = """
+import json, sys
+import main
+from PyQt5.QtWidgets import QApplication, QDialog
+
+main.app = QApplication(sys.argv)
+main.startup_timer.mark("qt")
+main.Dialog = QDialog()
+ui = main.UiDialogMain()
+ui.setupUi(main.Dialog)
+ui.dialog = main.Dialog
+main.startup_timer.mark("window")
+ui.create_tray_icon(main.Dialog)
+main.startup_timer.mark("tray")
+
+print(json.dumps({"phases": main.startup_timer.phases, "tray": main.startup_timer.elapsed(),
+                  "modules": sorted(sys.modules)}))
+"""
+
+
+def run_once(appdata):
+    env = dict(os.environ, APPDATA=appdata)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")  # no window on the screen
+
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", STARTUP], cwd=SRC, env=env,
+                            capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        sys.exit(f"Startup failed:\n{result.stderr[-2000:]}")
+
+    data = json.loads(result.stdout.strip().splitlines()[-1])
+    data["wall"] = wall
+    data["imports"] = parse_importtime(result.stderr)
+    return data
+
+
+def parse_importtime(stderr):
+    """
+    Returns [(cumulative microseconds, module)] of the imports of `python -X importtime` that main.py
+    (or the startup code) made itself. Deeper imports are part of the cumulative time of their parent.
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth <= 1 and name.strip() != "main":
+            imports.append((int(cumulative), name.strip()))
+    return imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1500)
+    parser.add_argument("--snippets", type=int, default=2000)
+    parser.add_argument("--imports", type=int, default=10, help="number of slowest imports to show")
+    args = parser.parse_args()
+
+    print(f"Cold start to tray icon: {args.runs} runs, config with {args.snippets} titles\n")
+
+    runs = []
+    with tempfile.TemporaryDirectory() as appdata:
+        os.makedirs(os.path.join(appdata, "FastFill"))
+        write_config(os.path.join(appdata, "FastFill", "FastFillConfig.ini"), args.snippets, per_section=100)
+        with open(os.path.join(appdata, "FastFill", "settings.ini"), 'w') as settings:
+            # An already calibrated key derivation, calibrating runs once after installing
+            settings.write("[App]\nfirst_run=false\n\n[Security]\nkdf=scrypt\nkdf_cost_scrypt=15\n")
+
+        for _ in range(args.runs):
+            runs.append(run_once(appdata))
+
+    for phase, _ in runs[0]["phases"]:
+        seconds = statistics.median(dict(run["phases"])[phase] for run in runs)
+        print(f"  {phase:<10} {seconds * 1000:8.1f} ms")
+
+    tray = statistics.median(run["tray"] for run in runs) * 1000
+    wall = statistics.median(run["wall"] for run in runs) * 1000
+    print(f"\nTime to tray (median): {tray:.1f} ms   whole process incl. interpreter start and exit: {wall:.1f} ms")
+
+    print("\nSlowest imports (first run, -X importtime):")
+    for cumulative, name in sorted(runs[0]["imports"], reverse=True)[:args.imports]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    failed = False
+    eager = sorted({name for run in runs for name in LAZY_MODULES if name in run["modules"]})
+    if eager:
+        print(f"\nFAIL: imported at startup although they are imported on first use: {', '.join(eager)}")
+        failed = True
+    if tray > args.budget_ms:
+        print(f"\nFAIL: time to tray {tray:.1f} ms is above the budget of {args.budget_ms:.0f} ms")
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,255 @@
+# Benchmark suite: the snippet storage and lookup of FastFill at scale.
+# Generates synthetic configs (see synthetic_config.py) with 10 up to 100k titles and measures what the
+# main window does with them: loading the config, opening a category, the lookup behind every click on a title,
+# adding / renaming / removing / reordering titles, writing the config, searching and typing into the quick paste
+# palette.
+#
+# --backend sqlite measures the SQLite database (imported from the same configs) instead of the config file,
+# there "load" opens the database, "save" checkpoints the WAL and "search_query" uses its full-text index.
+# "save_throughput" is left out for it, a checkpoint writes the changed pages only, not the whole database.
+# --backend packed measures the index file with memory-mapped bodies, "save" writes the index.
+#
+# Runs headless (offscreen Qt platform, nothing Windows-specific is imported). Results can be saved with --json
+# and compared with an earlier run with --compare, which exits with 1 if a metric got slower than --tolerance.
+#
+# Usage: python benchmarks/bench_suite.py [--sizes 10,1000,10000,100000] [--per-section 250] [--backend ini]
+#                                          [--json results.json] [--compare baseline.json] [--tolerance 0.25]
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from synthetic_config import write_config  # noqa: E402 (also puts src on sys.path)
+
+from PyQt5.QtCore import QCoreApplication  # noqa: E402
+
+from fastfill.models import SnippetListModel  # noqa: E402
+from fastfill.core import ConfigStore, SnippetRepository  # noqa: E402
+from fastfill.core.packed_store import PackedStore  # noqa: E402
+from fastfill.core.search import TitleIndex, TrigramIndex  # noqa: E402
+from fastfill.core.sqlite_store import SqliteStore  # noqa: E402
+from fastfill.core.usage import UsageStats  # noqa: E402
+
+# metric -> (unit, description), in the order of the report
+METRICS = {
+    "load": ("ms", "parse the config file"),
+    "open_category_cold": ("ms", "first open of a category (title index is built)"),
+    "open_category": ("ms", "open a category again (list model reset)"),
+    "click_lookup": ("us", "content lookup behind a click on a title"),
+    "add": ("us", "add a title"),
+    "rename": ("us", "rename a title"),
+    "remove": ("us", "remove a title"),
+    "reorder": ("us", "move one title in a category"),
+    "add_many": ("ms", "add --ops titles to a category in one call"),
+    "remove_many": ("ms", "remove --ops titles of a category in one call"),
+    "save": ("ms", "write the whole config"),
+    "save_throughput": ("MB/s", "bytes written per second by save (not for sqlite)"),
+    "search_build": ("ms", "build the search index"),
+    "search_query": ("us", "search one query"),
+    "palette_query": ("us", "quick paste palette, one typed character"),
+    "usage_record": ("us", "count one copy in the usage statistics"),
+}
+SCALE = {"ms": 1000, "us": 1000000, "MB/s": 1}
+NOT_COMPARED = {"save_throughput"}  # follows from save, which is compared
+NOISE_FLOOR = {"ms": 0.05, "us": 5}  # differences below this are never reported as regressions
+
+app = None  # the QCoreApplication, the list model needs one
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def median_of(function, arguments):
+    return statistics.median(timed(function, *args) for args in arguments)
+
+
+def open_database(path):
+    store = SqliteStore(path)
+    store.sections()
+    store.close()
+
+
+def run_size(directory, snippets, per_section, ops, rng, backend="ini"):
+    path = os.path.join(directory, f"FastFillConfig-{snippets}.ini")
+    titles = write_config(path, snippets, per_section)
+    sections = list(titles)
+    results = {}
+
+    if backend == "sqlite":
+        ini_path, path = path, os.path.join(directory, f"FastFill-{snippets}.db")
+        SqliteStore(path, ini_path=ini_path).close()
+        results["load"] = median_of(open_database, [(path,)] * 3)
+        store = SqliteStore(path)  # without ini_path, flush() only checkpoints the WAL
+    elif backend == "packed":
+        ini_path, path = path, os.path.join(directory, f"FastFill-{snippets}.idx")
+        PackedStore(path, ini_path=ini_path)
+        results["load"] = median_of(lambda: PackedStore(path, save_delay=3600), [()] * 3)
+        store = PackedStore(path, save_delay=3600)  # without ini_path, flush() only writes the index
+    else:
+        results["load"] = median_of(lambda: ConfigStore(path, save_delay=3600), [()] * 3)
+        store = ConfigStore(path, save_delay=3600)  # nothing is written unless flush() is called
+
+    model = SnippetListModel(store)
+    cold = rng.sample(sections, min(len(sections), 20))
+    results["open_category_cold"] = median_of(model.set_section, [(section,) for section in cold])
+    results["open_category"] = median_of(model.set_section, [(section,) for section in cold])
+
+    clicks = []
+    for _ in range(ops * 4):
+        section = rng.choice(sections)
+        clicks.append((section, rng.choice(titles[section])))
+    for section, _ in clicks:
+        store.titles(section)  # the category was opened before its titles can be clicked
+    results["click_lookup"] = median_of(store.get_content, clicks)
+
+    section = sections[0]
+    results["add"] = median_of(lambda title: (store.add_snippet(section, title, "Added content"), store.save()),
+                               [(f"Added title {i}",) for i in range(ops)])
+    results["rename"] = median_of(lambda old, new: (store.rename_snippet(section, old, new), store.save()),
+                                  [(f"Added title {i}", f"Renamed title {i}") for i in range(ops)])
+    results["remove"] = median_of(lambda title: (store.remove_snippet(section, title), store.save()),
+                                  [(f"Renamed title {i}",) for i in range(ops)])
+
+    def reorder():
+        order = [title for title, _ in store.titles(section)]
+        order.insert(rng.randrange(len(order)), order.pop(rng.randrange(len(order))))
+        store.reorder_snippets(section, order)
+        store.save()
+    results["reorder"] = median_of(reorder, [()] * ops)
+
+    repository = SnippetRepository(store)
+    batch = [(f"Batch title {i}", "Batch content") for i in range(ops)]
+    results["add_many"] = timed(repository.add_many, section, batch)
+    results["remove_many"] = timed(repository.remove_many, section, [title for title, _ in batch])
+
+    def save():
+        store.save()
+        store.flush()
+    results["save"] = median_of(save, [()] * 3)
+    if backend != "sqlite":
+        results["save_throughput"] = os.path.getsize(path) / 1048576 / results["save"]  # the file is rewritten
+
+    def build():
+        index = TrigramIndex()
+        for snippet_section, title, encrypted, content in store.snippets():
+            index.add(snippet_section, title, None if encrypted else content)
+        return index
+    results["search_build"] = median_of(build, [()] * 2)
+
+    index = build()
+    queries = []
+    for _ in range(ops):
+        words = rng.choice(titles[rng.choice(sections)]).lower().split()
+        queries.append((" ".join(word[:rng.randint(2, len(word))] for word in words[:rng.randint(1, 2)]),))
+    results["search_query"] = median_of(store.search if backend == "sqlite" else index.search, queries)
+
+    title_index = TitleIndex(store)
+    while not title_index.ready:
+        time.sleep(0.001)
+    keystrokes = [(query[:length],) for query, in queries for length in range(1, len(query) + 1)]
+    results["palette_query"] = median_of(title_index.search, keystrokes)
+
+    usage_path = os.path.join(directory, f"FastFillUsage-{snippets}.log")
+    usage = UsageStats(usage_path)
+    results["usage_record"] = median_of(usage.record, clicks)
+    usage.flush()
+    os.unlink(usage_path)
+
+    if backend == "sqlite":
+        store.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.unlink(path + suffix)
+        path = ini_path
+    elif backend == "packed":
+        for name in os.listdir(directory):
+            if name.startswith(f"FastFill-{snippets}.") or name.startswith(f"FastFill-{snippets}-"):
+                os.unlink(os.path.join(directory, name))
+        path = ini_path
+    os.unlink(path)
+    return results
+
+
+def print_report(sizes, results):
+    print(f"{'metric':<20}{'unit':>6}" + "".join(f"{size:>12,}" for size in sizes))
+    for metric, (unit, description) in METRICS.items():
+        values = "".join(f"{'-':>12}" if metric not in results[str(size)] else
+                         f"{results[str(size)][metric] * SCALE[unit]:>12.3f}" for size in sizes)
+        print(f"{metric:<20}{unit:>6}{values}   {description}")
+
+
+def compare(results, baseline, tolerance):
+    """
+    Prints every metric that is worse than in the baseline by more than tolerance. Returns True if there was one.
+    """
+    regressions = []
+    for size, metrics in results.items():
+        for metric, value in metrics.items():
+            base = baseline.get("results", {}).get(size, {}).get(metric)
+            if not base or metric not in METRICS or metric in NOT_COMPARED:
+                continue
+
+            unit = METRICS[metric][0]
+            if value > base * (1 + tolerance) and (value - base) * SCALE[unit] > NOISE_FLOOR[unit]:
+                regressions.append(f"  {metric} with {int(size):,} titles: "
+                                   f"{base * SCALE[unit]:.3f} -> {value * SCALE[unit]:.3f} {unit}")
+
+    if regressions:
+        print(f"\nFAIL: slower than the baseline by more than {tolerance:.0%}:")
+        print("\n".join(regressions))
+    else:
+        print(f"\nNo metric is worse than the baseline by more than {tolerance:.0%}.")
+    return bool(regressions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10,1000,10000,100000", help="numbers of titles, comma separated")
+    parser.add_argument("--per-section", type=int, default=250, help="titles per category")
+    parser.add_argument("--ops", type=int, default=200, help="operations per metric")
+    parser.add_argument("--backend", choices=["ini", "packed", "sqlite"], default="ini", help="storage to measure")
+    parser.add_argument("--json", help="save the results to this file")
+    parser.add_argument("--compare", help="compare with the results of an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    global app
+    sizes = [int(size) for size in args.sizes.split(",")]
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    rng = random.Random(42)
+
+    print(f"FastFill storage benchmark ({args.backend}): {args.per_section} titles per category, "
+          f"{args.ops} operations per metric")
+    print(f"Python {platform.python_version()} on {platform.platform()}\n")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            results[str(size)] = run_size(directory, size, args.per_section, args.ops, rng, args.backend)
+
+    print_report(sizes, results)
+
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump({"python": platform.python_version(), "platform": platform.platform(),
+                       "backend": args.backend, "per_section": args.per_section, "results": results},
+                      output, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        sys.exit(1 if compare(results, baseline, args.tolerance) else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+# Synthetic FastFill configs for the benchmarks.
+# The files have the layout FastFill writes itself: one section per category, numbered
+# "itemN_title" / "itemN_content" keys starting at 1 in every section with the "order" key of the title order,
+# and encrypted values with the "_encrypted" title suffix and their content in the current encrypted format.
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from fastfill.core import crypto  # noqa: E402
+from fastfill.core.store import ENCRYPTED_SUFFIX, ORDER_KEY  # noqa: E402
+
+PASSWORD = "benchmark"
+
+WORDS = ("mail address invoice meeting reply thanks regards signature template customer order delivery "
+         "support password account login server project report offer contract phone number street city "
+         "question answer request update schedule reminder payment bank transfer").split()
+
+
+def section_names(count):
+    return [f"Category {i}" for i in range(1, count + 1)]
+
+
+def layout(snippets, per_section=250):
+    """
+    Returns the number of titles of every section for a config with `snippets` titles.
+    """
+    sections = max(1, -(-snippets // per_section))
+    sizes = [snippets // sections] * sections
+    for i in range(snippets % sections):
+        sizes[i] += 1
+    return sizes
+
+
+def write_config(path, snippets, per_section=250, encrypted_ratio=0.05, seed=42):
+    """
+    Writes a config with `snippets` titles spread over sections of about `per_section` titles.
+    Returns {section: [displayed titles in file order]}.
+    """
+    rng = random.Random(seed)
+
+    # One key for all encrypted values, like values saved in one unlocked session
+    salt = os.urandom(crypto.SALT_SIZE)
+    key = crypto.derive_key(PASSWORD, salt, crypto.DEFAULT_PARAMS) if encrypted_ratio else None
+
+    sizes = layout(snippets, per_section)
+    titles = {}
+    number = 0
+    with open(path, 'w', encoding='utf-8') as cfg:
+        for section, size in zip(section_names(len(sizes)), sizes):
+            cfg.write(f"[{section}]\n")
+            cfg.write(f"{ORDER_KEY} = {','.join(str(i) for i in range(1, size + 1))}\n")
+            titles[section] = []
+            for i in range(1, size + 1):
+                number += 1
+                title = f"{rng.choice(WORDS).capitalize()} {rng.choice(WORDS)} {number}"
+                content = " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 60)))
+
+                if key is not None and rng.random() < encrypted_ratio:
+                    content = crypto.encrypt_with_key(key, salt, crypto.DEFAULT_PARAMS, content)
+                    cfg.write(f"item{i}_title = {title}{ENCRYPTED_SUFFIX}\n")
+                else:
+                    cfg.write(f"item{i}_title = {title}\n")
+                cfg.write(f"item{i}_content = {content}\n")
+                titles[section].append(title)
+            cfg.write("\n")
+
+    return titles
@@ -0,0 +1,2 @@
+# FastFill application package.
+# Holds the parts of FastFill that are shared by the main window and do not belong into main.py itself.
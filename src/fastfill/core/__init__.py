@@ -0,0 +1,7 @@
+# GUI-free core of FastFill: config storage, snippet operations, encryption, search and updates.
+# Nothing in this package imports Qt or a Windows-only module, so it can be used headless on every platform,
+# e.g. by scripts, tests and the benchmarks.
+from fastfill.core.repository import (BatchResult, CategoryExistsError, CategoryNotFoundError, InvalidNameError,
+                                      LastCategoryError, RepositoryError, Snippet, SnippetRepository,
+                                      TitleExistsError, TitleNotFoundError)
+from fastfill.core.store import ConfigStore
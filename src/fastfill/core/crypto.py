@@ -0,0 +1,411 @@
+# Encryption of the values that are saved with "_encrypted".
+#
+# Current format (version 2): "$ff2$" + base64(header + salt + nonce + AES-GCM ciphertext and tag).
+# The header holds the format version, the KDF (PBKDF2-SHA256 or scrypt) and its cost parameters,
+# so the cost can be raised later without breaking existing values. Header and salt are authenticated
+# together with the ciphertext, a wrong password or a changed value is always detected.
+#
+# Legacy format (FastFill up to 2.x): base64(salt + iv + AES-CBC ciphertext) with PBKDF2-SHA256 and
+# 100,000 iterations. It can still be decrypted and is replaced by the current format on the next save.
+#
+# Deriving a key is slow on purpose, so an optional KeyCache keeps derived keys for an unlocked session
+# and wipes them again when the session is locked or has been idle for too long.
+#
+# The cryptography package is imported on first use, most sessions never encrypt or decrypt anything
+# and FastFill starts with Windows, so it should not delay the tray icon.
+import base64
+import hashlib
+import hmac
+import logging
+import os
+import struct
+import threading
+import time
+from collections import namedtuple
+
+from fastfill.core.instrumentation import timed
+
+FORMAT_PREFIX = "$ff2$"  # "$" is not part of the base64 alphabet, legacy values never start with it
+FORMAT_VERSION = 2
+HEADER = struct.Struct(">BBIBB")  # version, KDF id, cost, scrypt r, scrypt p
+
+KDF_PBKDF2 = 1  # cost = iterations
+KDF_SCRYPT = 2  # cost = log2(n)
+KDF_NAMES = {"pbkdf2": KDF_PBKDF2, "scrypt": KDF_SCRYPT}
+
+SALT_SIZE = 16
+NONCE_SIZE = 12
+IV_SIZE = 16  # legacy format
+LEGACY_ITERATIONS = 100000
+
+# KDF and cost parameters stored in the header of every value
+KdfParams = namedtuple("KdfParams", ["kdf", "cost", "r", "p"])
+
+LEGACY_PARAMS = KdfParams(KDF_PBKDF2, LEGACY_ITERATIONS, 0, 0)
+DEFAULT_PARAMS = KdfParams(KDF_SCRYPT, 15, 8, 1)  # used until calibrate() has measured this machine
+# Default of every KDF until it is calibrated (600,000 PBKDF2-SHA256 iterations as recommended by OWASP)
+DEFAULT_KDF_PARAMS = {KDF_SCRYPT: DEFAULT_PARAMS, KDF_PBKDF2: KdfParams(KDF_PBKDF2, 600000, 0, 0)}
+
+# Limits for calibrate() and for parameters read from a value
+MIN_PBKDF2_ITERATIONS = LEGACY_ITERATIONS
+MAX_PBKDF2_ITERATIONS = 10000000
+MIN_SCRYPT_LOG_N = 14
+MAX_SCRYPT_LOG_N = 20  # 2^20 * 8 * 128 bytes = 1 GB of memory
+
+
+@timed("derive_key")
+def derive_key(password: str, salt: bytes, params: KdfParams = LEGACY_PARAMS) -> bytes:
+    """
+    Generates a strong encryption key from a password.
+    """
+    from cryptography.hazmat.backends import default_backend
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+    from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+
+    if params.kdf == KDF_PBKDF2:
+        if not MIN_PBKDF2_ITERATIONS <= params.cost <= MAX_PBKDF2_ITERATIONS:
+            raise ValueError(f"Unsupported PBKDF2 iterations: {params.cost}")
+        kdf = PBKDF2HMAC(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=salt,
+            iterations=params.cost,
+            backend=default_backend()
+        )
+    elif params.kdf == KDF_SCRYPT:
+        if not MIN_SCRYPT_LOG_N <= params.cost <= MAX_SCRYPT_LOG_N or not 1 <= params.r <= 32 or not 1 <= params.p <= 16:
+            raise ValueError(f"Unsupported scrypt parameters: {params}")
+        kdf = Scrypt(salt=salt, length=32, n=2 ** params.cost, r=params.r, p=params.p, backend=default_backend())
+    else:
+        raise ValueError(f"Unknown KDF: {params.kdf}")
+
+    return kdf.derive(password.encode())
+
+
+def calibrate(kdf=KDF_SCRYPT, target_seconds=0.25):
+    """
+    Measures the KDF on this machine and returns the KdfParams with which deriving a key takes about
+    target_seconds, but never less than the minimum cost.
+    """
+    salt = os.urandom(SALT_SIZE)
+
+    if kdf == KDF_PBKDF2:
+        probe = KdfParams(KDF_PBKDF2, MIN_PBKDF2_ITERATIONS, 0, 0)
+        elapsed = _time_derivation(probe, salt)
+        iterations = int(probe.cost * target_seconds / max(elapsed, 1e-6)) // 1000 * 1000
+        return probe._replace(cost=min(max(iterations, MIN_PBKDF2_ITERATIONS), MAX_PBKDF2_ITERATIONS))
+
+    if kdf == KDF_SCRYPT:
+        params = KdfParams(KDF_SCRYPT, MIN_SCRYPT_LOG_N, 8, 1)
+        elapsed = _time_derivation(params, salt)
+        # Doubling n doubles the time
+        while elapsed * 2 <= target_seconds and params.cost < MAX_SCRYPT_LOG_N:
+            params = params._replace(cost=params.cost + 1)
+            elapsed *= 2
+        return params
+
+    raise ValueError(f"Unknown KDF: {kdf}")
+
+
+def _time_derivation(params, salt):
+    start = time.perf_counter()
+    derive_key("calibration", salt, params)
+    return time.perf_counter() - start
+
+
+def is_legacy(encrypted_data: str) -> bool:
+    """
+    True for values in the legacy format, they are migrated when they are saved again.
+    """
+    return not encrypted_data.startswith(FORMAT_PREFIX)
+
+
+def _parse(encrypted_data: str):
+    """
+    Returns (params, salt, header + salt to authenticate, nonce, ciphertext) of a current format value.
+    """
+    data = base64.b64decode(encrypted_data[len(FORMAT_PREFIX):], validate=True)
+    if len(data) < HEADER.size + SALT_SIZE + NONCE_SIZE + 16:
+        raise ValueError("Encrypted value is too short")
+
+    version, kdf, cost, r, p = HEADER.unpack_from(data)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported format version: {version}")
+
+    salt_end = HEADER.size + SALT_SIZE
+    return (KdfParams(kdf, cost, r, p), data[HEADER.size:salt_end], data[:salt_end],
+            data[salt_end:salt_end + NONCE_SIZE], data[salt_end + NONCE_SIZE:])
+
+
+def params_of(encrypted_data: str):
+    """
+    Returns (salt, KdfParams) of an encrypted value in either format.
+    """
+    if is_legacy(encrypted_data):
+        return base64.b64decode(encrypted_data)[:SALT_SIZE], LEGACY_PARAMS
+    params, salt, _, _, _ = _parse(encrypted_data)
+    return salt, params
+
+
+def encrypt_with_key(key, salt: bytes, params: KdfParams, plaintext: str) -> str:
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+    header = HEADER.pack(FORMAT_VERSION, *params) + salt
+    nonce = os.urandom(NONCE_SIZE)  # a new nonce for every encryption, also when the key is reused
+    aesgcm = AESGCM(key)
+    _check_not_wiped(key)  # never encrypt with the zeros of a key KeyCache wiped in the meantime
+    ciphertext = aesgcm.encrypt(nonce, plaintext.encode(), header)
+    return FORMAT_PREFIX + base64.b64encode(header + nonce + ciphertext).decode()
+
+
+def decrypt_with_key(key, encrypted_data: str) -> str:
+    """
+    Decrypts a value in either format. Raises ValueError if the key is wrong or the value was changed.
+    """
+    if is_legacy(encrypted_data):
+        return _decrypt_legacy(key, encrypted_data)
+
+    from cryptography.exceptions import InvalidTag
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+    _, _, header, nonce, ciphertext = _parse(encrypted_data)
+    aesgcm = AESGCM(key)
+    _check_not_wiped(key)
+    try:
+        return aesgcm.decrypt(nonce, ciphertext, header).decode()
+    except InvalidTag:
+        raise ValueError("Wrong password or damaged value")
+
+
+def _check_not_wiped(key):
+    """
+    Raises ValueError if key is a bytearray of a KeyCache that was wiped (all zeros).
+    """
+    if not any(key):
+        raise ValueError("The key was wiped, the value is locked again")
+
+
+def _decrypt_legacy(key, encrypted_data: str) -> str:
+    from cryptography.hazmat.backends import default_backend
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+    data = base64.b64decode(encrypted_data)
+    iv, ciphertext = data[SALT_SIZE:SALT_SIZE + IV_SIZE], data[SALT_SIZE + IV_SIZE:]
+    if not ciphertext or len(ciphertext) % 16:
+        raise ValueError("Damaged value")
+
+    cipher = Cipher(algorithms.AES(key), modes.CBC(iv), backend=default_backend())
+    decryptor = cipher.decryptor()
+    _check_not_wiped(key)
+    decrypted_padded = decryptor.update(ciphertext) + decryptor.finalize()
+
+    # Without an integrity check, the padding is the only hint for a wrong password: all padding bytes must be equal
+    padding_length = decrypted_padded[-1]
+    if not 1 <= padding_length <= 16 or decrypted_padded[-padding_length:] != bytes([padding_length]) * padding_length:
+        raise ValueError("Wrong password or damaged value")
+
+    return decrypted_padded[:-padding_length].decode()  # raises UnicodeDecodeError for most wrong keys as well
+
+
+def encrypt_data(password: str, plaintext: str, key_cache=None, params: KdfParams = DEFAULT_PARAMS) -> str:
+    """
+    Encrypts plaintext in the current format with a key derived from password. Returns None on errors.
+    With an enabled key_cache, a key already derived from the same password with the same params is reused with its
+    salt, otherwise a new salt and key are derived, so a value never inherits the weaker cost of an older key.
+    """
+    try:
+        cached = key_cache.find_password(password, params) if key_cache is not None else None
+        if cached is not None:
+            salt, key = cached
+        else:
+            salt = os.urandom(SALT_SIZE)  # Generate a new salt
+            key = derive_key(password, salt, params)
+            if key_cache is not None:
+                key_cache.put(salt, password, key, params)
+
+        return encrypt_with_key(key, salt, params, plaintext)
+    except Exception as e:
+        logging.error(e)
+
+
+def decrypt_data(password: str, encrypted_data: str, key_cache=None) -> str:
+    """
+    Decrypts a value with a key derived from password. Returns None if the password is wrong or on errors.
+    """
+    try:
+        salt, params = params_of(encrypted_data)
+
+        key = key_cache.get(salt, password) if key_cache is not None else None
+        if key is None:
+            key = derive_key(password, salt, params)
+            plaintext = decrypt_with_key(key, encrypted_data)
+            if key_cache is not None:
+                key_cache.put(salt, password, key, params)  # only keys that decrypted successfully are kept
+            return plaintext
+
+        return decrypt_with_key(key, encrypted_data)
+    except Exception as e:
+        logging.error(e)
+
+
+def decrypt_cached(encrypted_data: str, key_cache) -> str:
+    """
+    Decrypts a value without asking for the password, if its key is in the unlocked key_cache.
+    Returns None otherwise.
+    """
+    try:
+        salt, _ = params_of(encrypted_data)
+        key = key_cache.get(salt)
+        if key is None:
+            return None
+        return decrypt_with_key(key, encrypted_data)
+    except Exception as e:
+        logging.error(e)
+
+
+def encrypt_cached(plaintext: str, previous_data: str, key_cache, params: KdfParams = DEFAULT_PARAMS) -> str:
+    """
+    Encrypts plaintext without asking for the password, with a cached key that was derived with params from the
+    password of the value it replaces. The result is always in the current format. Returns None if no such key is
+    cached, e.g. for a legacy value or a value with an older cost, the password is needed to derive a new key then.
+    """
+    try:
+        previous_salt, _ = params_of(previous_data)
+        cached = key_cache.find_same_password(previous_salt, params)
+        if cached is None:
+            return None
+        salt, key = cached
+        return encrypt_with_key(key, salt, params, plaintext)
+    except Exception as e:
+        logging.error(e)
+
+
+class KeyCache(object):
+    """
+    Derived keys of an unlocked session, keyed by (salt, password fingerprint).
+
+    Passwords are never stored, only an HMAC of them with a secret that exists for this process only.
+    Keys are kept in bytearrays that are overwritten with zeros by lock(), after `idle_timeout` seconds
+    without use, or when the cache is disabled. A disabled cache does not keep anything.
+
+    get() and the find methods return the cached bytearray itself, not a copy, so wiping also reaches a key that is
+    still in use: encrypting or decrypting with it fails from then on. Wiping is best effort all the same, the key
+    derivation returns the key as bytes and the cryptography library keeps copies of its own while it runs.
+    """
+
+    def __init__(self, enabled=False, idle_timeout=300):
+        self.enabled = enabled
+        self.idle_timeout = idle_timeout
+
+        self._secret = os.urandom(32)
+        self._keys = {}  # (salt, password fingerprint) -> (bytearray key, KdfParams)
+        self._lock = threading.Lock()  # keys are used from crypto worker threads as well
+        self._last_used = time.monotonic()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _fingerprint(self, password):
+        return hmac.new(self._secret, password.encode(), hashlib.sha256).digest()
+
+    def _touch(self):
+        """
+        Wipes the keys if the session was idle for too long, otherwise restarts the idle time.
+        """
+        now = time.monotonic()
+        if now - self._last_used > self.idle_timeout:
+            self._wipe()
+        self._last_used = now
+
+    def set_enabled(self, enabled):
+        with self._lock:
+            self.enabled = enabled
+            if not enabled:
+                self._wipe()
+
+    def get(self, salt, password=None):
+        """
+        Returns the cached key (a bytearray) for salt, or None. If a password is given, it has to be the one the key
+        was derived from.
+        """
+        with self._lock:
+            if not self.enabled:
+                return None
+            self._touch()
+
+            if password is not None:
+                entry = self._keys.get((salt, self._fingerprint(password)))
+                return None if entry is None else entry[0]
+            for (key_salt, _), (key, _) in self._keys.items():
+                if key_salt == salt:
+                    return key
+            return None
+
+    def find_password(self, password, params):
+        """
+        Returns (salt, key) of a key derived from password with params, or None. The key is a bytearray.
+        """
+        with self._lock:
+            if not self.enabled:
+                return None
+            self._touch()
+
+            fingerprint = self._fingerprint(password)
+            for (salt, key_fingerprint), (key, key_params) in self._keys.items():
+                if key_params == params and hmac.compare_digest(fingerprint, key_fingerprint):
+                    return salt, key
+            return None
+
+    def find_same_password(self, salt, params):
+        """
+        Returns (salt, key) of a key derived with params from the same password as the cached key for salt, or None.
+        The key is a bytearray.
+        """
+        with self._lock:
+            if not self.enabled:
+                return None
+            self._touch()
+
+            fingerprints = [fingerprint for key_salt, fingerprint in self._keys if key_salt == salt]
+            for (key_salt, fingerprint), (key, key_params) in self._keys.items():
+                if key_params == params and fingerprint in fingerprints:
+                    return key_salt, key
+            return None
+
+    def put(self, salt, password, key, params=LEGACY_PARAMS):
+        with self._lock:
+            if not self.enabled:
+                return
+            self._touch()
+
+            entry_key = (salt, self._fingerprint(password))
+            old_entry = self._keys.get(entry_key)
+            if old_entry is not None:
+                self._zero(old_entry[0])
+            self._keys[entry_key] = (bytearray(key), params)
+
+    def expire(self):
+        """
+        Wipes the keys if the idle timeout has passed. Called regularly by the UI.
+        """
+        with self._lock:
+            if self._keys and time.monotonic() - self._last_used > self.idle_timeout:
+                self._wipe()
+                logging.info("Unlocked session expired")
+
+    def lock(self):
+        """
+        Wipes all keys, every encrypted value needs its password again.
+        """
+        with self._lock:
+            self._wipe()
+
+    def _wipe(self):
+        for key, _ in self._keys.values():
+            self._zero(key)
+        self._keys.clear()
+
+    @staticmethod
+    def _zero(key):
+        key[:] = bytes(len(key))
@@ -0,0 +1,179 @@
+# Opt-in timing of the hot paths (setting "Debug/instrumentation" in settings.ini).
+# Functions decorated with @timed and blocks in `with measure(...)` record their latency into a histogram per name.
+# While instrumentation is off, a decorated call only checks one flag.
+#
+# The histograms are exported to FastFill_perf.json on exit, the last minute of calls is kept exactly
+# for the p50 / p99 of the performance overlay.
+import bisect
+import functools
+import inspect
+import json
+import math
+import threading
+import time
+from collections import deque
+
+from fastfill.core.persistence import write_atomic
+
+RECENT_SECONDS = 60
+MAX_RECENT = 10000  # per name, calls beyond that in the last minute are only in the histogram
+
+# Upper bounds of the histogram buckets in seconds, 4 buckets per power of two from 1 µs to about 70 s
+BUCKETS = [2 ** (i / 4) / 1000000 for i in range(105)]
+
+_enabled = False
+_lock = threading.Lock()
+_stats = {}  # name -> _Stats
+
+
+class _Stats(object):
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)  # the last one counts everything slower than BUCKETS[-1]
+        self.recent = deque(maxlen=MAX_RECENT)  # (time.monotonic() at the end, seconds)
+
+    def add(self, seconds, now):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.recent.append((now, seconds))
+
+    def percentile(self, fraction):
+        """
+        Upper bound of the bucket that holds the given fraction of all calls (at most the slowest call).
+        """
+        rank = math.ceil(self.count * fraction)
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(BUCKETS[i], self.max) if i < len(BUCKETS) else self.max
+        return self.max
+
+
+def enable(enabled=True):
+    global _enabled
+    _enabled = enabled
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+
+
+def record(name, seconds):
+    now = time.monotonic()
+    with _lock:
+        stats = _stats.get(name)
+        if stats is None:
+            stats = _stats[name] = _Stats()
+        stats.add(seconds, now)
+
+
+class measure(object):
+    """
+    Context manager that records how long its block took, e.g. `with measure("config.write"):`.
+    """
+
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        if _enabled:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.start is not None:
+            record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def timed(name):
+    """
+    Decorator that records the latency of every call.
+    Like a Qt slot, the wrapper drops positional arguments the function does not take, so decorated methods
+    can stay connected to signals that pass more arguments (e.g. rowsMoved to save_title_order).
+    """
+    def decorator(function):
+        parameters = inspect.signature(function).parameters.values()
+        if any(p.kind == p.VAR_POSITIONAL for p in parameters):
+            max_args = None
+        else:
+            max_args = sum(p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD) for p in parameters)
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if max_args is not None:
+                args = args[:max_args]
+            if not _enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+def recent(seconds=RECENT_SECONDS):
+    """
+    Returns {name: (calls, p50, p99)} of the calls in the last `seconds`, latencies in seconds.
+    """
+    since = time.monotonic() - seconds
+    result = {}
+    with _lock:
+        for name, stats in _stats.items():
+            latencies = sorted(latency for end, latency in stats.recent if end >= since)
+            if latencies:
+                result[name] = (len(latencies), _nearest_rank(latencies, 0.5), _nearest_rank(latencies, 0.99))
+    return result
+
+
+def _nearest_rank(sorted_values, fraction):
+    return sorted_values[max(0, math.ceil(len(sorted_values) * fraction) - 1)]
+
+
+def snapshot():
+    """
+    Returns the statistics of every name since the start (or the last reset), latencies in milliseconds.
+    """
+    with _lock:
+        return {
+            name: {
+                "count": stats.count,
+                "total_ms": stats.total * 1000,
+                "mean_ms": stats.total / stats.count * 1000,
+                "p50_ms": stats.percentile(0.5) * 1000,
+                "p90_ms": stats.percentile(0.9) * 1000,
+                "p99_ms": stats.percentile(0.99) * 1000,
+                "max_ms": stats.max * 1000,
+                # upper bound of the bucket in ms -> calls, empty buckets left out
+                "histogram": {("inf" if i == len(BUCKETS) else f"{BUCKETS[i] * 1000:.4g}"): count
+                              for i, count in enumerate(stats.buckets) if count},
+            }
+            for name, stats in _stats.items()
+        }
+
+
+def export(path):
+    """
+    Writes the snapshot to a JSON file. Does nothing if nothing was recorded.
+    """
+    data = snapshot()
+    if data:
+        write_atomic(path, json.dumps({"created": time.time(), "timings": data}, indent=2))
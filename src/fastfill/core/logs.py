@@ -0,0 +1,51 @@
+# Logging to FastFill_app.log.
+# Records are put on a queue by the thread that logs (usually the GUI thread) and written to the file by a
+# background thread, so no click waits for the disk. The file is rotated by size instead of being emptied
+# on every start, the history of the last launches stays available for bug reports.
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+LOG_FORMAT = '%(asctime)s - %(funcName)s - Line: %(lineno)d ---- %(levelname)s - %(message)s'
+MAX_BYTES = 1024 * 1024  # size of one log file
+BACKUP_COUNT = 3  # FastFill_app.log.1 ... .3
+
+LEVELS = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+}
+DEFAULT_LEVEL = "info"
+
+
+def parse_level(name):
+    """
+    Returns the logging level for a name from the settings ("debug", "info", ...), the default for unknown
+    or empty names.
+    """
+    return LEVELS.get(str(name).strip().lower(), LEVELS[DEFAULT_LEVEL])
+
+
+def setup_logging(log_file, level=DEFAULT_LEVEL):
+    """
+    Sends all log records of the application through a queue to a rotating log file.
+    Returns the QueueListener, it is stopped (and the queue written) when the interpreter exits.
+    """
+    file_handler = RotatingFileHandler(log_file, maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT,
+                                       encoding='utf-8', delay=True)
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    records = queue.SimpleQueue()
+    listener = QueueListener(records, file_handler)
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(records))
+    root.setLevel(parse_level(level))
+
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
@@ -0,0 +1,587 @@
+# Packed storage of FastFill for libraries with large snippet bodies, selected with "Storage/backend = packed"
+# in settings.ini. Titles, encryption flags and order are kept in a small index file (FastFill.idx, JSON) that is
+# loaded at start. The bodies are in an append-only data file next to it, which is memory-mapped and only read
+# when a body is shown, so the memory use does not grow with the size of the bodies. Recently shown bodies are
+# kept decoded in an LRU cache.
+#
+# A changed body is appended to the data file and the index points to the new copy. Once the old copies take up
+# more than half of the data file, the bodies are written to a new data file and the index switches to it in one
+# atomic write, so a crash leaves either the old or the new pair of files behind.
+#
+# PackedStore has the methods and change notifications of ConfigStore. Like SqliteStore, it imports
+# FastFillConfig.ini when it is created, again when it was changed since the last export, and exports it in flush().
+import functools
+import itertools
+import json
+import logging
+import mmap
+import os
+import shutil
+import threading
+from collections import namedtuple
+
+from fastfill.core.instrumentation import timed
+from fastfill.core.persistence import DebouncedWriter, write_atomic
+from fastfill.core.store import (ConfigStore, SnippetRef, _synchronized, batch_events, config_changed, config_stamp,
+                                 conflict_copy_path, export_config)
+
+FORMAT_VERSION = 1
+BODY_CACHE_SIZE = 64  # decoded bodies kept in memory
+MIN_COMPACT_BYTES = 1048576  # old copies in the data file are only dropped once they are more than this
+
+# Where the body of a title is in the data file
+Body = namedtuple("Body", ["encrypted", "offset", "length"])
+
+
+class PackedStore(object):
+    """
+    Keeps the titles of FastFill in memory and their bodies in a memory-mapped data file, see the module comment.
+    Like ConfigStore, save() schedules writing the index in the background. Reads do not check the index file,
+    it is loaded again before a change and by the StoreRefresher timer when another process changed it.
+    """
+
+    def __init__(self, path, ini_path=None, save_delay=0.3):
+        self.path = str(path)
+        self.ini_path = ini_path  # FastFillConfig.ini, imported once and kept up to date by flush()
+
+        self._lock = threading.RLock()
+        self._listeners = []
+        self._sections = {}  # section -> {title: Body} in display order
+        self._generation = 1  # number in the name of the current data file
+        self._garbage = 0  # bytes of old copies in the data file
+        self._map = None  # mmap of the data file, None while it is empty
+        self._stamp = None  # (mtime_ns, size) of the index as it was last read or written
+        self._changed = False  # changes since the last export to ini_path, kept in the index
+        self._ini_stamp = None  # config_stamp of ini_path after the last import or export, kept in the index
+        self._writer = DebouncedWriter(self._write, delay=save_delay)
+        # (generation, offset, length) -> body. A data file is only appended to, so an offset stays valid.
+        self._read_body = functools.lru_cache(maxsize=BODY_CACHE_SIZE)(self._decode_generation)
+
+        if os.path.exists(self.path):
+            self.reload()
+            self._import_changed_ini()
+            self._writer.flush()
+        else:
+            open(self._data_path(), 'ab').close()
+            if ini_path is not None and os.path.exists(ini_path):
+                self.import_ini(ini_path)
+            self._exported()  # the config file has the same content
+            self._writer.flush()
+            logging.info(f"Packed store created: {self.path}")
+
+    def _file_stamp(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _data_path(self, generation=None):
+        stem = os.path.splitext(self.path)[0]
+        return f"{stem}-{self._generation if generation is None else generation}.dat"
+
+    def add_listener(self, listener):
+        """
+        Registers a function that is called on every change, see ConfigStore.add_listener.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, event, *args):
+        for listener in list(self._listeners):
+            try:
+                listener(event, *args)
+            except Exception as e:
+                logging.error(f"Error in config listener: {e}")
+
+    @timed("packed.read")
+    @_synchronized
+    def reload(self):
+        """
+        Loads the index file again. The index in memory is kept if the file cannot be read.
+        """
+        try:
+            with open(self.path, encoding='utf-8') as index_file:
+                index = json.load(index_file)
+            sections = {section: {title: Body(bool(encrypted), offset, length)
+                                  for title, encrypted, offset, length in snippets}
+                        for section, snippets in index["categories"]}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logging.error(f"Error reading the packed store index: {e}")
+            return False
+
+        self._sections = sections
+        self._generation = index["generation"]
+        self._garbage = index["garbage"]
+        self._changed = index.get("unexported", False)
+        self._ini_stamp = index.get("ini_stamp")
+        self._stamp = self._file_stamp()
+        self._read_body.cache_clear()
+        self._open_map()
+        self._remove_old_data_file()
+        logging.info("Packed store loaded")
+        self._notify("reloaded")
+        return True
+
+    @_synchronized
+    def refresh(self):
+        """
+        Loads the index again if it was changed since it was last read or written. Returns True if it was.
+        """
+        if self._writer.busy:
+            return False  # unsaved changes in memory are newer than the file
+        if self._file_stamp() != self._stamp:
+            return self.reload()
+        return False
+
+    def save(self):
+        """
+        Schedules writing the index, several saves in a short time end up in a single write.
+        The bodies are already in the data file.
+        """
+        self._changed = True
+        self._writer.schedule()
+
+    def flush(self):
+        """
+        Writes pending changes immediately and exports them to the config file (if there were any since the
+        last export), e.g. before the application exits.
+        """
+        self._writer.flush()
+        with self._lock:
+            if self._changed and self.ini_path is not None:
+                try:
+                    self._keep_changed_ini()
+                    self.export_ini(self.ini_path)
+                    self._exported()
+                except Exception as e:
+                    logging.error(f"Error exporting the packed store: {e}")
+        self._writer.flush()
+
+    # Data file
+
+    def _open_map(self):
+        """
+        Maps the current data file again, e.g. after bodies were appended.
+        """
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+        with open(self._data_path(), 'ab+') as data_file:  # created if it is missing
+            if os.fstat(data_file.fileno()).st_size:
+                self._map = mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @timed("packed.decode")
+    def _decode(self, offset, length):
+        if not length:
+            return ""
+        if self._map is None or offset + length > len(self._map):
+            self._open_map()  # appended after it was mapped
+            if self._map is None or offset + length > len(self._map):
+                logging.error(f"Body at {offset} is missing in {self._data_path()}")
+                return ""
+        return self._map[offset:offset + length].decode('utf-8')
+
+    def _decode_generation(self, generation, offset, length):
+        return self._decode(offset, length)
+
+    def _append(self, contents):
+        """
+        Appends bodies to the data file and returns their (offset, length). They are synced to disk before
+        the next index is written.
+        """
+        positions = []
+        with open(self._data_path(), 'ab') as data_file:
+            offset = data_file.seek(0, os.SEEK_END)
+            for content in contents:
+                data = content.encode('utf-8')
+                data_file.write(data)
+                positions.append((offset, len(data)))
+                offset += len(data)
+        return positions
+
+    def _compact(self):
+        """
+        Writes the current bodies to a new data file. Returns the path of the old one, which can be deleted
+        once the index points to the new one.
+        """
+        old_path = self._data_path()
+        new_path = self._data_path(self._generation + 1)
+        self._open_map()  # with the bodies appended since it was mapped
+
+        sections = {}
+        with open(new_path, 'wb') as data_file:
+            offset = 0
+            for section, snippets in self._sections.items():
+                sections[section] = {}
+                for title, body in snippets.items():
+                    data = self._map[body.offset:body.offset + body.length] if body.length else b""
+                    data_file.write(data)
+                    sections[section][title] = Body(body.encrypted, offset, len(data))
+                    offset += len(data)
+            data_file.flush()
+            os.fsync(data_file.fileno())
+
+        self._read_body.cache_clear()
+        logging.info(f"Packed store compacted, {self._garbage} bytes of old bodies dropped")
+        self._sections = sections
+        self._generation += 1
+        self._garbage = 0
+        self._open_map()
+        return old_path
+
+    @timed("packed.write")
+    def _write(self):
+        """
+        Writes the index atomically after the bodies it points to are on disk, called by the DebouncedWriter.
+        """
+        old_data_path = None
+        with self._lock:
+            live = sum(body.length for snippets in self._sections.values() for body in snippets.values())
+            if self._garbage > max(MIN_COMPACT_BYTES, live):
+                old_data_path = self._compact()
+
+            index = {"version": FORMAT_VERSION, "generation": self._generation, "garbage": self._garbage,
+                     "unexported": self._changed, "ini_stamp": self._ini_stamp,
+                     "categories": [[section, [[title, int(body.encrypted), body.offset, body.length]
+                                               for title, body in snippets.items()]]
+                                    for section, snippets in self._sections.items()]}
+            data_path = self._data_path()
+
+        with open(data_path, 'ab') as data_file:
+            os.fsync(data_file.fileno())
+        write_atomic(self.path, json.dumps(index, ensure_ascii=False, separators=(",", ":")))
+
+        with self._lock:
+            self._stamp = self._file_stamp()
+        if old_data_path is not None:
+            self._remove_old_data_file()
+
+    def _remove_old_data_file(self):
+        """
+        Removes the data file before the last compaction. On Windows it stays while another FastFill still
+        has it mapped, the next start removes it.
+        """
+        old_path = self._data_path(self._generation - 1)
+        if os.path.exists(old_path):
+            try:
+                os.unlink(old_path)
+            except OSError as e:
+                logging.warning(f"Old data file not removed yet: {e}")
+
+    # Import and export of the config file
+
+    def _exported(self):
+        """
+        Remembers that the config file has the content of the store, as it is now, and schedules writing that to
+        the index. The caller flushes the writer without holding the lock, it is taken by the write.
+        """
+        self._ini_stamp = None if self.ini_path is None else config_stamp(self.ini_path)
+        self._changed = False
+        self._writer.schedule()
+
+    def _import_changed_ini(self):
+        """
+        Imports the config file again if it was changed since the last import or export, replacing the content of
+        the store. If the store has changes that were not exported, they are kept instead (see flush).
+        """
+        if self.ini_path is None or self._changed:
+            return
+        if config_changed(self.ini_path, self._ini_stamp):
+            logging.info(f"{self.ini_path} was changed since the last export, importing it again")
+            self.import_ini(self.ini_path, replace=True)
+            self._exported()
+
+    def _keep_changed_ini(self):
+        """
+        Before the config file is overwritten by the changes of the store: keeps it as a conflict copy if it was
+        changed since the last import or export too.
+        """
+        if config_changed(self.ini_path, self._ini_stamp):
+            conflict_path = conflict_copy_path(self.ini_path)
+            shutil.copyfile(self.ini_path, conflict_path)
+            logging.warning(f"{self.ini_path} was changed here and in the packed store, kept the packed store, "
+                            f"the other version is in {conflict_path}")
+
+    @_synchronized
+    def import_ini(self, ini_path, replace=False):
+        """
+        Adds the categories and titles of a FastFill config file, titles that already exist are skipped.
+        With replace, the current categories and titles are removed first. Returns the number of imported titles.
+        """
+        config = ConfigStore(ini_path, save_delay=0)
+        imported = 0
+        if replace:
+            self._garbage += sum(body.length for snippets in self._sections.values() for body in snippets.values())
+            self._sections = {}
+        for section in config.sections():
+            snippets = self._sections.setdefault(section, {})
+            new_titles = [(title, encrypted) for title, encrypted in config.titles(section) if title not in snippets]
+            positions = self._append(config.get_content(section, title) for title, _ in new_titles)
+            for (title, encrypted), (offset, length) in zip(new_titles, positions):
+                snippets[title] = Body(encrypted, offset, length)
+            imported += len(new_titles)
+        config.flush()  # the config file may have been updated to the current layout when it was read
+
+        logging.info(f"Imported {imported} titles from {ini_path}")
+        self.save()
+        self._notify("reloaded")
+        return imported
+
+    @timed("packed.export")
+    @_synchronized
+    def export_ini(self, ini_path):
+        """
+        Writes all categories and titles to a FastFill config file, in the layout ConfigStore writes.
+        """
+        export_config(ini_path, [(section, [(title, self._decode(body.offset, body.length), body.encrypted)
+                                            for title, body in snippets.items()])
+                                 for section, snippets in self._sections.items()])
+        logging.info(f"Exported the packed store to {ini_path}")
+
+    # Sections (categories)
+
+    def _snippets(self, section):
+        return self._sections[section]  # KeyError like the missing section of a ConfigStore
+
+    @_synchronized
+    def sections(self):
+        return list(self._sections)
+
+    @_synchronized
+    def has_section(self, section):
+        return section in self._sections
+
+    @_synchronized
+    def is_section_empty(self, section):
+        """
+        Returns True if the section has no titles. Raises ValueError if the section does not exist.
+        """
+        if not self.has_section(section):
+            raise ValueError("Section is empty")
+        return not self._sections[section]
+
+    @_synchronized
+    def add_section(self, section):
+        self.refresh()
+        self._sections[section] = {}
+        self._notify("section_added", section)
+
+    @_synchronized
+    def remove_section(self, section):
+        self.refresh()
+        snippets = self._sections.pop(section, None)
+        if snippets is None:
+            return False
+        self._garbage += sum(body.length for body in snippets.values())
+        self._notify("section_removed", section)
+        return True
+
+    @_synchronized
+    def rename_section(self, old_section, new_section):
+        self.refresh()
+        self._snippets(old_section)
+        self._sections = {(new_section if section == old_section else section): snippets
+                          for section, snippets in self._sections.items()}
+        self._notify("section_renamed", old_section, new_section)
+
+    @_synchronized
+    def reorder_sections(self, new_order):
+        """
+        Puts the sections in the given order, sections missing in new_order keep their relative order at the end.
+        """
+        self.refresh()
+        order = [section for section in new_order if section in self._sections]
+        ordered_set = set(order)
+        order += [section for section in self._sections if section not in ordered_set]
+        self._sections = {section: self._sections[section] for section in order}
+
+    # Titles of a section
+
+    @_synchronized
+    def titles(self, section, start=0, stop=None):
+        """
+        Returns (title, encrypted) for every title of a section in display order, or for the titles start to stop.
+        """
+        items = self._snippets(section).items()
+        if start or stop is not None:
+            items = itertools.islice(items, start, stop)
+        return [(title, body.encrypted) for title, body in items]
+
+    @_synchronized
+    def title_count(self, section):
+        return len(self._snippets(section))
+
+    @_synchronized
+    def snippets(self):
+        """
+        Returns (section, title, encrypted, content) for every title of every section. The bodies are read
+        without going through the cache of recently shown bodies.
+        """
+        return [(section, title, body.encrypted, self._decode(body.offset, body.length))
+                for section, snippets in self._sections.items() for title, body in snippets.items()]
+
+    @_synchronized
+    def find(self, section, title):
+        """
+        Returns the SnippetRef of a title (without an index or config keys), or None if there is no such title.
+        """
+        body = self._snippets(section).get(title)
+        if body is None:
+            return None
+        return SnippetRef(None, body.encrypted, None, None)
+
+    @_synchronized
+    def has_title(self, section, title):
+        return title in self._snippets(section)
+
+    @_synchronized
+    def get_content(self, section, title, fallback=""):
+        body = self._snippets(section).get(title)
+        if body is None:
+            return fallback
+        return self._read_body(self._generation, body.offset, body.length)
+
+    @_synchronized
+    def set_content(self, section, title, content):
+        """
+        Sets the content of an existing title. Returns False if the title does not exist.
+        """
+        self.refresh()
+        snippets = self._snippets(section)
+        body = snippets.get(title)
+        if body is None:
+            return False
+        (offset, length), = self._append([content])
+        snippets[title] = Body(body.encrypted, offset, length)
+        self._garbage += body.length
+        self._notify("content_changed", section, title)
+        return True
+
+    @_synchronized
+    def replace_contents(self, changes):
+        """
+        Sets the contents of many titles in one step, see ConfigStore.replace_contents.
+        Returns the number of replaced contents.
+        """
+        self.refresh()
+        replaced = [(section, title, content) for section, title, expected_content, content in changes
+                    if section in self._sections and self.get_content(section, title, None) == expected_content]
+        positions = self._append(content for _, _, content in replaced)
+
+        for (section, title, _), (offset, length) in zip(replaced, positions):
+            body = self._sections[section][title]
+            self._sections[section][title] = Body(body.encrypted, offset, length)
+            self._garbage += body.length
+        for section, title, _ in replaced:
+            self._notify("content_changed", section, title)
+        return len(replaced)
+
+    @_synchronized
+    def add_snippet(self, section, title, content, encrypted=False):
+        """
+        Appends a new title with its content to a section and returns its SnippetRef.
+        """
+        return self.add_snippets(section, [(title, content, encrypted)])[0]
+
+    @_synchronized
+    def add_snippets(self, section, snippets):
+        """
+        Appends (title, content, encrypted) entries to a section in one step and returns their SnippetRefs.
+        """
+        self.refresh()
+        section_snippets = self._snippets(section)
+        positions = self._append(content for _, content, _ in snippets)
+
+        refs = []
+        for (title, _, encrypted), (offset, length) in zip(snippets, positions):
+            section_snippets[title] = Body(encrypted, offset, length)
+            refs.append(SnippetRef(None, encrypted, None, None))
+        for title, _, _ in snippets:
+            self._notify("snippet_added", section, title)
+        return refs
+
+    @_synchronized
+    def add_batch(self, batch):
+        """
+        Adds [(section, [(title, content, encrypted), ...]), ...] in one step, see ConfigStore.add_batch.
+        All bodies are appended first, they only become visible with the next index that is written.
+        Returns the number of added titles.
+        """
+        self.refresh()
+        if callable(batch):
+            batch = batch()
+        positions = iter(self._append(content for _, snippets in batch for _, content, _ in snippets))
+
+        events = []
+        for section, snippets in batch:
+            if section not in self._sections:
+                self._sections[section] = {}
+                events.append(("section_added", section))
+            section_snippets = self._sections[section]
+            for title, _, encrypted in snippets:
+                offset, length = next(positions)
+                section_snippets[title] = Body(encrypted, offset, length)
+                events.append(("snippet_added", section, title))
+
+        for event in batch_events(events):
+            self._notify(*event)
+        return sum(event[0] == "snippet_added" for event in events)
+
+    @_synchronized
+    def rename_snippet(self, section, old_title, new_title):
+        """
+        Renames a title and keeps its encryption flag and position. Returns False if the title does not exist.
+        """
+        self.refresh()
+        snippets = self._snippets(section)
+        if old_title not in snippets:
+            return False
+        self._sections[section] = {(new_title if title == old_title else title): body
+                                   for title, body in snippets.items()}
+        self._notify("snippet_renamed", section, old_title, new_title)
+        return True
+
+    @_synchronized
+    def remove_snippet(self, section, title):
+        """
+        Removes a title with its content. Returns False if the title does not exist.
+        """
+        return self.remove_snippets(section, [title]) == 1
+
+    @_synchronized
+    def remove_snippets(self, section, titles):
+        """
+        Removes many titles with their contents. Titles that do not exist are ignored.
+        Returns the number of removed titles.
+        """
+        self.refresh()
+        snippets = self._snippets(section)
+
+        removed = []
+        for title in titles:
+            body = snippets.pop(title, None)
+            if body is not None:
+                self._garbage += body.length
+                removed.append(title)
+
+        for title in removed:
+            self._notify("snippet_removed", section, title)
+        return len(removed)
+
+    @_synchronized
+    def reorder_snippets(self, section, new_order):
+        """
+        Puts the titles of a section in the given order, titles missing in new_order keep their relative
+        order at the end.
+        """
+        self.refresh()
+        snippets = self._snippets(section)
+        order = [title for title in new_order if title in snippets]
+        ordered_set = set(order)
+        order += [title for title in snippets if title not in ordered_set]
+        self._sections[section] = {title: snippets[title] for title in order}
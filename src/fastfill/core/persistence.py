@@ -0,0 +1,126 @@
+# Write-behind persistence for the FastFill config.
+# Changes are not written on the GUI thread anymore: a burst of changes (e.g. drag-reordering many rows)
+# is coalesced into one write after a short delay, and every write replaces the file atomically,
+# so a crash or power loss in the middle of a write cannot leave a truncated config behind.
+import contextlib
+import logging
+import os
+import tempfile
+import threading
+import time
+
+
+def write_atomic(path, text):
+    """
+    Writes text to a temporary file next to path, flushes it to disk and renames it over path.
+    """
+    with atomic_file(path) as temp_file:
+        temp_file.write(text)
+
+
+@contextlib.contextmanager
+def atomic_file(path, **open_args):
+    """
+    Opens a temporary text file next to path for writing (open_args like encoding or newline are passed on).
+    When the with block is done, the file is flushed to disk and renamed over path. If the block fails,
+    the temporary file is removed and path is left as it was. Lets large files be written piece by piece.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+
+    try:
+        with os.fdopen(fd, 'w', **open_args) as temp_file:
+            yield temp_file
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+
+        os.replace(temp_path, path)  # atomic on Windows and POSIX
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+    # Make the rename itself durable (not possible / not needed on Windows)
+    if hasattr(os, "O_DIRECTORY"):
+        try:
+            dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        except OSError:
+            pass
+
+
+class DebouncedWriter(object):
+    """
+    Calls a write function on a background thread once changes have been quiet for `delay` seconds.
+    While changes keep coming in, a write happens at the latest `max_delay` seconds after the first one.
+    """
+
+    def __init__(self, write, delay=0.3, max_delay=2.0):
+        self._write = write  # performs the actual write, called on the timer thread or in flush()
+        self.delay = delay
+        self.max_delay = max_delay
+
+        self._lock = threading.Lock()  # guards the state below
+        self._write_lock = threading.Lock()  # only one write at a time
+        self._timer = None
+        self._dirty = False
+        self._writing = False
+        self._first_change = None  # time.monotonic() of the first change since the last write
+
+        self.write_count = 0
+
+    @property
+    def busy(self):
+        """
+        True while there are changes that are not on disk yet.
+        """
+        with self._lock:
+            return self._dirty or self._writing
+
+    def schedule(self):
+        """
+        Marks the data as changed and (re)starts the debounce timer.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not self._dirty:
+                self._first_change = now
+            self._dirty = True
+
+            if self._timer is not None:
+                self._timer.cancel()
+
+            wait = min(self.delay, max(0.0, self._first_change + self.max_delay - now))
+            self._timer = threading.Timer(wait, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """
+        Writes pending changes now. Called by the timer and on exit / restart.
+        """
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return
+                self._dirty = False
+                self._writing = True
+
+            try:
+                self._write()
+                self.write_count += 1
+            except Exception as e:
+                logging.error(f"Error writing config: {e}")
+                with self._lock:
+                    self._dirty = True  # try again with the next flush
+            finally:
+                with self._lock:
+                    self._writing = False
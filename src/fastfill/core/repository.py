@@ -0,0 +1,304 @@
+# Snippet operations of FastFill without any GUI.
+# SnippetRepository checks every operation (names, duplicates, the "_encrypted" title convention, the last category)
+# and raises a RepositoryError instead of showing a message box, so the same operations can be used by the main
+# window, scripts, tests and benchmarks. Every change is saved through the store's debounced writer.
+from collections import namedtuple
+
+from fastfill.core.store import ENCRYPTED_SUFFIX
+
+Snippet = namedtuple("Snippet", ["section", "title", "content", "encrypted"])
+
+# Result of add_batch: numbers of added, renamed, skipped (duplicate) and invalid rows,
+# and messages like "Row 7: The name is empty" for the first MAX_PROBLEMS renamed, skipped and invalid rows
+BatchResult = namedtuple("BatchResult", ["added", "renamed", "skipped", "invalid", "problems"])
+MAX_PROBLEMS = 20
+DUPLICATE_ACTIONS = ("skip", "rename", "error")
+
+
+class RepositoryError(Exception):
+    """
+    Base class of the errors of SnippetRepository.
+    """
+
+
+class CategoryNotFoundError(RepositoryError):
+    pass
+
+
+class CategoryExistsError(RepositoryError):
+    pass
+
+
+class LastCategoryError(RepositoryError):
+    """
+    The last category cannot be removed.
+    """
+
+
+class TitleNotFoundError(RepositoryError):
+    pass
+
+
+class TitleExistsError(RepositoryError):
+    pass
+
+
+class InvalidNameError(RepositoryError):
+    """
+    The name is empty, or a title ends with "_encrypted" and would be read back as an encrypted value.
+    """
+
+
+class SnippetRepository(object):
+    """
+    Typed operations on the categories and titles of a ConfigStore.
+    Names are stripped of leading and trailing spaces, contents are stored as they are.
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    # Validation
+
+    @staticmethod
+    def _name(name):
+        name = (name or "").strip()
+        if not name:
+            raise InvalidNameError("The name is empty")
+        if "\n" in name or "\r" in name:
+            raise InvalidNameError("A name cannot contain line breaks")
+        return name
+
+    def _title(self, title):
+        title = self._name(title)
+        if title.endswith(ENCRYPTED_SUFFIX):
+            raise InvalidNameError(f"A title cannot end with {ENCRYPTED_SUFFIX}")
+        return title
+
+    def _require_category(self, section):
+        if not self.store.has_section(section):
+            raise CategoryNotFoundError(section)
+
+    def _require_title(self, section, title):
+        self._require_category(section)
+        if not self.store.has_title(section, title):
+            raise TitleNotFoundError(title)
+
+    # Categories
+
+    def categories(self):
+        return self.store.sections()
+
+    def has_category(self, section):
+        return self.store.has_section(section)
+
+    def add_category(self, section):
+        section = self._name(section)
+        if self.store.has_section(section):
+            raise CategoryExistsError(section)
+        self.store.add_section(section)
+        self.store.save()
+        return section
+
+    def rename_category(self, old_section, new_section):
+        self._require_category(old_section)
+        new_section = self._name(new_section)
+        if new_section == old_section:
+            return new_section
+        if self.store.has_section(new_section):
+            raise CategoryExistsError(new_section)
+        self.store.rename_section(old_section, new_section)
+        self.store.save()
+        return new_section
+
+    def remove_category(self, section):
+        self._require_category(section)
+        if len(self.store.sections()) == 1:
+            raise LastCategoryError(section)
+        self.store.remove_section(section)
+        self.store.save()
+
+    def reorder_categories(self, sections):
+        self.store.reorder_sections(sections)
+        self.store.save()
+
+    # Titles
+
+    def titles(self, section):
+        """
+        Returns (title, encrypted) for every title of a category in order.
+        """
+        self._require_category(section)
+        return self.store.titles(section)
+
+    def has_title(self, section, title):
+        return self.store.has_section(section) and self.store.has_title(section, title)
+
+    def get(self, section, title):
+        self._require_title(section, title)
+        ref = self.store.find(section, title)
+        return Snippet(section, title, self.store.get_content(section, title), ref.encrypted)
+
+    def add(self, section, title, content, encrypted=False):
+        """
+        Appends a title to a category. An encrypted value must already be encrypted.
+        """
+        return self.add_many(section, [(title, content, encrypted)])[0]
+
+    def add_many(self, section, snippets):
+        """
+        Appends (title, content) or (title, content, encrypted) entries to a category. Nothing is added if one
+        of them is invalid or already exists. Returns the added Snippets.
+        """
+        self._require_category(section)
+
+        entries = []
+        new_titles = set()
+        for snippet in snippets:
+            title, content, encrypted = (tuple(snippet) + (False,))[:3]
+            title = self._title(title)
+            if title in new_titles or self.store.has_title(section, title):
+                raise TitleExistsError(title)
+            new_titles.add(title)
+            entries.append((title, content, encrypted))
+
+        self.store.add_snippets(section, entries)
+        self.store.save()
+        return [Snippet(section, title, content, encrypted) for title, content, encrypted in entries]
+
+    def add_batch(self, rows, on_duplicate="skip"):
+        """
+        Adds (section, title, content, encrypted) rows to any categories in one step, e.g. an import.
+        Missing categories are created. Invalid rows (empty names, titles ending with "_encrypted") are left out.
+        A title that exists in its category, or came earlier in rows, is skipped ("skip"), added as "Title (2)"
+        ("rename") or fails the whole batch with TitleExistsError ("error").
+
+        rows can be a generator, it is read once. The checked rows are kept until the last one was read, then the
+        duplicates are resolved and everything is added in one store call (see ConfigStore.add_batch), so a batch
+        is added completely or not at all. Returns a BatchResult.
+        """
+        if on_duplicate not in DUPLICATE_ACTIONS:
+            raise ValueError(f"on_duplicate must be one of {DUPLICATE_ACTIONS}")
+
+        checked = []  # (row number, section, title, content, encrypted)
+        renamed = skipped = invalid = 0
+        problems = []
+
+        def note(number, message):
+            if len(problems) < MAX_PROBLEMS:
+                problems.append((number, message))
+
+        for number, (section, title, content, encrypted) in enumerate(rows, start=1):
+            try:
+                field = "category"
+                section = self._name(section)
+                field = "title"
+                title = self._title(title)
+            except InvalidNameError as e:
+                invalid += 1
+                note(number, f"{e} ({field})")
+                continue
+            checked.append((number, section, title, "" if content is None else str(content), bool(encrypted)))
+
+        def stage():
+            # Called by the store with its lock held, no title can be added in between the check and the insert
+            nonlocal renamed, skipped
+            staged = {}  # section -> [(title, content, encrypted)]
+            taken = {}  # section -> titles in the store and in staged
+
+            for number, section, title, content, encrypted in checked:
+                titles = taken.get(section)
+                if titles is None:
+                    exists = self.store.has_section(section)
+                    titles = taken[section] = {title for title, _ in self.store.titles(section)} if exists else set()
+
+                if title in titles:
+                    if on_duplicate == "error":
+                        raise TitleExistsError(title)
+                    if on_duplicate == "skip":
+                        skipped += 1
+                        note(number, f"{title} ({section}) already exists, skipped")
+                        continue
+                    n = 2
+                    while f"{title} ({n})" in titles:
+                        n += 1
+                    renamed += 1
+                    note(number, f"{title} ({section}) already exists, added as {title} ({n})")
+                    title = f"{title} ({n})"
+
+                titles.add(title)
+                staged.setdefault(section, []).append((title, content, encrypted))
+            return list(staged.items())
+
+        added = 0
+        if checked:
+            added = self.store.add_batch(stage)
+            if added:
+                self.store.save()
+        problems = [f"Row {number}: {message}" for number, message in sorted(problems)]
+        return BatchResult(added, renamed, skipped, invalid, problems)
+
+    def rename(self, section, old_title, new_title):
+        """
+        Renames a title, an encrypted value stays encrypted. Returns the new title.
+        """
+        self._require_title(section, old_title)
+        new_title = self._title(new_title)
+        if new_title == old_title:
+            return new_title
+        if self.store.has_title(section, new_title):
+            raise TitleExistsError(new_title)
+        self.store.rename_snippet(section, old_title, new_title)
+        self.store.save()
+        return new_title
+
+    def set_content(self, section, title, content):
+        self._require_title(section, title)
+        self.store.set_content(section, title, content)
+        self.store.save()
+
+    def remove(self, section, title):
+        self._require_title(section, title)
+        self.store.remove_snippet(section, title)
+        self.store.save()
+
+    def remove_many(self, section, titles):
+        """
+        Removes many titles of a category in one step, with one update of the order key and one save.
+        Titles that do not exist are ignored. Returns the number of removed titles.
+        """
+        self._require_category(section)
+        removed = self.store.remove_snippets(section, titles)
+        if removed:
+            self.store.save()
+        return removed
+
+    def reorder(self, section, titles):
+        """
+        Puts the titles of a category in the given order, missing titles keep their order at the end.
+        """
+        self._require_category(section)
+        self.store.reorder_snippets(section, titles)
+        self.store.save()
+
+    def move(self, section, title, row=None, to_section=None):
+        """
+        Moves a title to position `row` (None: the end) of its category, or of `to_section`.
+        """
+        self._require_title(section, title)
+        to_section = section if to_section is None else to_section
+
+        if to_section == section:
+            titles = [other for other, _ in self.store.titles(section) if other != title]
+        else:
+            self._require_category(to_section)
+            if self.store.has_title(to_section, title):
+                raise TitleExistsError(title)
+            snippet = self.get(section, title)
+            self.store.add_snippet(to_section, title, snippet.content, snippet.encrypted)
+            self.store.remove_snippet(section, title)
+            titles = [other for other, _ in self.store.titles(to_section) if other != title]
+
+        titles.insert(len(titles) if row is None else max(0, min(row, len(titles))), title)
+        self.store.reorder_snippets(to_section, titles)
+        self.store.save()
@@ -0,0 +1,80 @@
+# Changing the password of all encrypted values at once.
+# Values that were encrypted with the same key share a salt, so every old key is derived only once per salt,
+# and all values get one new key. The store is not touched here: the caller commits all new values
+# together, so the config never contains a mix of rotated and not yet rotated values.
+import logging
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from fastfill.core import crypto
+
+# changes: [(section, title, old value, new value)]
+# skipped: [(section, title)] of values that could not be decrypted with the old password and stay unchanged
+RotationResult = namedtuple("RotationResult", ["changes", "skipped"])
+
+
+def rotate_password(entries, old_password, new_password, params=crypto.DEFAULT_PARAMS,
+                    progress=None, is_cancelled=None, max_workers=None):
+    """
+    Re-encrypts (section, title, encrypted value) entries from old_password to new_password.
+    The old keys are derived in parallel on a thread pool. progress(done, total) is called after every
+    derived key. Returns a RotationResult, or None if is_cancelled() became True.
+    """
+    is_cancelled = is_cancelled or (lambda: False)
+    max_workers = max_workers or min(4, os.cpu_count() or 1)
+
+    groups = {}  # (salt, KdfParams) -> entries encrypted with that key
+    skipped = []
+    for section, title, value in entries:
+        try:
+            groups.setdefault(crypto.params_of(value), []).append((section, title, value))
+        except Exception as e:
+            logging.error(f"Unreadable encrypted value: {e}")
+            skipped.append((section, title))
+
+    total = len(groups) + 1  # every old key and the new one
+    new_salt = os.urandom(crypto.SALT_SIZE)
+    new_key = crypto.derive_key(new_password, new_salt, params)
+    if progress is not None:
+        progress(1, total)
+
+    def rotate_group(salt, old_params, group):
+        if is_cancelled():
+            return [], []
+        try:
+            old_key = crypto.derive_key(old_password, salt, old_params)
+        except Exception as e:
+            logging.error(e)
+            return [], [(section, title) for section, title, _ in group]
+
+        changes, not_decrypted = [], []
+        for section, title, value in group:
+            try:
+                plaintext = crypto.decrypt_with_key(old_key, value)
+            except (ValueError, UnicodeDecodeError):
+                not_decrypted.append((section, title))  # encrypted with another password
+                continue
+            changes.append((section, title, value, crypto.encrypt_with_key(new_key, new_salt, params, plaintext)))
+        return changes, not_decrypted
+
+    changes = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(rotate_group, salt, old_params, group)
+                   for (salt, old_params), group in groups.items()]
+
+        for done, future in enumerate(as_completed(futures), start=2):
+            if is_cancelled():
+                for pending in futures:
+                    pending.cancel()
+                return None
+
+            group_changes, group_skipped = future.result()
+            changes.extend(group_changes)
+            skipped.extend(group_skipped)
+            if progress is not None:
+                progress(done, total)
+
+    if is_cancelled():
+        return None
+    return RotationResult(changes, skipped)
@@ -0,0 +1,541 @@
+# Search over the titles and contents of all categories.
+# The words of all titles and non-encrypted contents are indexed by their trigrams (pieces of three characters),
+# a search only looks up the trigrams of the query instead of reading every value of the config.
+# The index follows the changes of the ConfigStore, so it is not rebuilt when a value is added, renamed or removed.
+import itertools
+import logging
+import math
+import re
+import threading
+from array import array
+from bisect import bisect_right
+from collections import Counter, namedtuple
+
+MIN_QUERY_LENGTH = 2
+MIN_FUZZY_LENGTH = 4  # shorter query words are only matched exactly
+MIN_MATCH = 0.5  # share of the trigrams a misspelled word must have in common with the query word
+MAX_CONTENT_LENGTH = 2000  # only the beginning of long contents is indexed
+MAX_REMOVED = 20000  # removed entries left in the postings before the index is rebuilt
+
+SearchResult = namedtuple("SearchResult", ["section", "title"])
+
+
+def normalize(text):
+    """
+    Lower case with single spaces, so "Mail  Address" and "mail address" are the same.
+    """
+    return " ".join(text.casefold().split())
+
+
+def trigrams(word):
+    """
+    Returns the trigrams of a query word. Shorter words are looked up as " xy", the start of a word.
+    """
+    if len(word) < 3:
+        return {" " + word}
+    return {word[i:i + 3] for i in range(len(word) - 2)}
+
+
+def word_trigrams(word):
+    """
+    Returns the trigrams a word is indexed with, including " xy" for its first two letters.
+    """
+    grams = trigrams(word)
+    grams.add(" " + word[:2])
+    return grams
+
+
+class TrigramIndex(object):
+    """
+    Two-level index over titles and contents. Every distinct word is split into trigrams once
+    (trigram -> words) and points to the ids of the titles that contain it, once for the titles and
+    once for the contents (word -> ids). A query word is looked up through its trigrams, so it also
+    finds the longer words it is part of, and misspelled words that share enough trigrams.
+
+    Not thread-safe, SearchIndex takes care of locking. Removed titles stay in the postings and are
+    filtered out with the set of removed ids until the whole index is rebuilt.
+    """
+
+    def __init__(self):
+        self._word_grams = {}  # trigram -> set of words
+        self._title_postings = {}  # word -> array of ids
+        self._content_postings = {}
+        self._docs = {}  # id -> [section, title]
+        self._sections = {}  # section -> {title: id}
+        self._removed = set()  # ids that are still in the postings
+        self._next_id = 0
+        self._cache = {}  # (kind, query word) -> set of ids, cleared on every change
+
+    def __len__(self):
+        return len(self._docs)
+
+    @property
+    def removed_count(self):
+        return len(self._removed)
+
+    def add(self, section, title, content):
+        """
+        Adds a title, or replaces it if the section already has it. content is None for encrypted values.
+        """
+        self.remove(section, title)
+
+        doc_id = self._next_id
+        self._next_id += 1
+        self._docs[doc_id] = [section, title]
+        self._sections.setdefault(section, {})[title] = doc_id
+
+        self._post(self._title_postings, title, doc_id)
+        if content:
+            self._post(self._content_postings, content[:MAX_CONTENT_LENGTH], doc_id)
+
+        self._cache.clear()
+
+    def _post(self, postings, text, doc_id):
+        other_postings = self._content_postings if postings is self._title_postings else self._title_postings
+
+        for word in set(text.casefold().split()):
+            posting = postings.get(word)
+            if posting is not None:
+                posting.append(doc_id)
+                continue
+
+            postings[word] = array('I', (doc_id,))
+            if word not in other_postings:
+                # First time the word is seen, make it findable by its trigrams
+                for gram in word_trigrams(word):
+                    words = self._word_grams.get(gram)
+                    if words is None:
+                        self._word_grams[gram] = {word}
+                    else:
+                        words.add(word)
+
+    def remove(self, section, title):
+        titles = self._sections.get(section)
+        doc_id = titles.pop(title, None) if titles else None
+        if doc_id is None:
+            return False
+
+        del self._docs[doc_id]
+        self._removed.add(doc_id)
+        self._cache.clear()
+        return True
+
+    def remove_section(self, section):
+        for doc_id in self._sections.pop(section, {}).values():
+            del self._docs[doc_id]
+            self._removed.add(doc_id)
+        self._cache.clear()
+
+    def rename_section(self, old_section, new_section):
+        titles = self._sections.pop(old_section, None)
+        if titles is None or new_section in self._sections:
+            return
+        for doc_id in titles.values():
+            self._docs[doc_id][0] = new_section
+        self._sections[new_section] = titles
+
+    def _words(self, query_word):
+        """
+        Returns the indexed words that contain all trigrams of query_word.
+        """
+        word_sets = sorted((self._word_grams.get(gram, set()) for gram in trigrams(query_word)), key=len)
+        return word_sets[0].intersection(*word_sets[1:])
+
+    def _similar_words(self, query_word):
+        """
+        Returns the indexed words that share at least MIN_MATCH of the trigrams of query_word (typos).
+        """
+        grams = trigrams(query_word)
+        need = max(2, math.ceil(len(grams) * MIN_MATCH))
+        hits = Counter()
+        for gram in grams:
+            hits.update(self._word_grams.get(gram, ()))
+        return [word for word, count in hits.items() if count >= need]
+
+    def _ids(self, kind, query_word, fuzzy=False):
+        """
+        Returns the ids of the titles whose title ("title"), content ("content") or either ("any") contains
+        a word matching query_word. The sets are cached until the index changes, while typing only
+        the word that is being typed has to be looked up again.
+        """
+        key = (kind, query_word, fuzzy)
+        ids = self._cache.get(key)
+        if ids is None:
+            if kind == "any":
+                ids = self._ids("title", query_word, fuzzy) | self._ids("content", query_word, fuzzy)
+            else:
+                postings = self._title_postings if kind == "title" else self._content_postings
+                words = self._similar_words(query_word) if fuzzy else self._words(query_word)
+                ids = set().union(*(postings[word] for word in words if word in postings))
+                if self._removed:
+                    ids.difference_update(self._removed)
+            if len(self._cache) > 1000:
+                self._cache.clear()
+            self._cache[key] = ids
+        return ids
+
+    @staticmethod
+    def _intersect(id_sets):
+        id_sets = sorted(id_sets, key=len)  # start with the smallest set, frequent words cost little
+        return id_sets[0].intersection(*id_sets[1:])
+
+    def _boosted_ids(self, boost):
+        """
+        Returns {id: score} for the (section, title) keys of boost that are in the index.
+        """
+        ids = {}
+        for (section, title), score in boost.items():
+            doc_id = self._sections.get(section, {}).get(title)
+            if doc_id is not None:
+                ids[doc_id] = score
+        return ids
+
+    @staticmethod
+    def _ordered(ids, boosted_ids):
+        """
+        Returns the ids with a boost first (highest first), then the rest in the order of the config.
+        """
+        if not boosted_ids:
+            return sorted(ids)
+        boosted = sorted(ids.intersection(boosted_ids), key=lambda doc_id: -boosted_ids[doc_id])
+        return boosted + sorted(ids.difference(boosted_ids))
+
+    def search(self, query, limit=50, boost=None):
+        """
+        Returns up to `limit` SearchResults, best matches first: titles containing every query word,
+        then titles whose title and content together contain every query word, then the same with
+        misspelled words. Within a rank, titles with a score in `boost` ({(section, title): score}, e.g. the
+        frecency of fastfill.core.usage) come first, the others keep the order of the config.
+        """
+        text = normalize(query)
+        if len(text) < MIN_QUERY_LENGTH:
+            return []
+
+        query_words = [word for word in text.split() if len(word) >= 2]  # a single letter is still being typed
+        if not query_words:
+            return []
+
+        boosted_ids = self._boosted_ids(boost) if boost else None
+        in_title = self._intersect(self._ids("title", word) for word in query_words)
+        in_any = self._intersect(self._ids("any", word) for word in query_words)
+        in_any.difference_update(in_title)
+
+        ranked = self._ordered(in_title, boosted_ids)[:limit]
+        if len(ranked) < limit:
+            ranked += self._ordered(in_any, boosted_ids)[:limit - len(ranked)]
+
+        if len(ranked) < limit and any(len(word) >= MIN_FUZZY_LENGTH for word in query_words):
+            fuzzy = self._intersect(self._ids("any", word, fuzzy=len(word) >= MIN_FUZZY_LENGTH)
+                                    for word in query_words)
+            fuzzy.difference_update(in_title)
+            fuzzy.difference_update(in_any)
+            ranked += self._ordered(fuzzy, boosted_ids)[:limit - len(ranked)]
+
+        return [SearchResult(*self._docs[doc_id]) for doc_id in ranked]
+
+
+class SearchIndex(object):
+    """
+    Search index over every title of a ConfigStore, kept up to date through the store's change notifications.
+    The index is built on a background thread when it is created (or when rebuild() is called first, with
+    build=False) and when the config file was reloaded, `ready` is False until the first build is done.
+    """
+
+    def __init__(self, store, build=True):
+        self.store = store
+        self._index = TrigramIndex()
+        self._lock = threading.Lock()
+        self._ready = False
+        self._build_id = 0
+        self._pending = None  # changes received during a build, applied to the new index when it is done
+
+        store.add_listener(self._on_store_changed)
+        if build:
+            self.rebuild()
+
+    @property
+    def ready(self):
+        return self._ready
+
+    def search(self, query, limit=50, boost=None):
+        with self._lock:
+            return self._index.search(query, limit, boost)
+
+    def rebuild(self):
+        """
+        Builds a new index from the store in the background. The current index is used until it is done.
+        """
+        with self._lock:
+            self._build_id += 1
+            self._pending = []  # changes made from now on may be missing in the snapshot
+            build_id = self._build_id
+
+        thread = threading.Thread(target=self._build, args=(build_id,), name="SearchIndexBuild", daemon=True)
+        thread.start()
+
+    def _build(self, build_id):
+        try:
+            index = TrigramIndex()
+            for section, title, encrypted, content in self.store.snippets():
+                index.add(section, title, None if encrypted else content)
+        except Exception as e:
+            logging.error(f"Error building search index: {e}")
+            return
+
+        with self._lock:
+            if build_id != self._build_id:
+                return  # a newer build was started in the meantime
+
+            # Changes made after the build started. Applying a change that is already in the snapshot again
+            # leads to the same result, so it does not matter which of them the snapshot contains.
+            for change in self._pending:
+                self._apply(index, change)
+            self._pending = None
+            self._index = index
+            self._ready = True
+
+        logging.info(f"Search index built with {len(index)} titles")
+
+    def _on_store_changed(self, event, *args):
+        """
+        Called by the store after every change, on the thread that made it and while the store lock is held.
+        """
+        if event == "reloaded":
+            self.rebuild()
+            return
+
+        changes = []
+        if event in ("snippet_added", "content_changed"):
+            section, title = args
+            changes.append(("add", section, title, self._content(section, title)))
+        elif event == "snippet_renamed":
+            section, old_title, new_title = args
+            changes.append(("remove", section, old_title))
+            changes.append(("add", section, new_title, self._content(section, new_title)))
+        elif event == "snippet_removed":
+            changes.append(("remove",) + args)
+        elif event == "section_removed":
+            changes.append(("remove_section",) + args)
+        elif event == "section_renamed":
+            changes.append(("rename_section",) + args)
+        elif event == "section_changed":
+            # Keys were changed directly, index the whole section again
+            section = args[0]
+            changes.append(("remove_section", section))
+            for title, _ in self.store.titles(section):
+                changes.append(("add", section, title, self._content(section, title)))
+
+        with self._lock:
+            for change in changes:
+                self._apply(self._index, change)
+            if self._pending is not None:
+                self._pending.extend(changes)
+            compact = self._pending is None and self._index.removed_count > MAX_REMOVED
+
+        if compact:
+            self.rebuild()
+
+    def _content(self, section, title):
+        ref = self.store.find(section, title)
+        if ref is None or ref.encrypted:
+            return None  # encrypted contents are never indexed
+        return self.store.get_content(section, title)
+
+    @staticmethod
+    def _apply(index, change):
+        action, *args = change
+        if action == "add":
+            index.add(*args)
+        elif action == "remove":
+            index.remove(*args)
+        elif action == "remove_section":
+            index.remove_section(*args)
+        elif action == "rename_section":
+            index.rename_section(*args)
+
+
+class FullTextSearch(object):
+    """
+    Search through the full-text index of the store itself (SqliteStore), with the interface of SearchIndex.
+    The store keeps its index up to date, there is nothing to build.
+    """
+
+    ready = True
+
+    def __init__(self, store):
+        self.store = store
+
+    def search(self, query, limit=50, boost=None):
+        return self.store.search(query, limit, boost)
+
+    def rebuild(self):
+        pass
+
+
+class TitleIndex(object):
+    """
+    Index of every title for the quick paste palette, built in the background before the palette is first
+    opened and kept up to date through the store's change notifications like SearchIndex. A query matches titles that contain its
+    characters in order ("exte" and "extxt" both find "Example Text"), titles starting with the query come first,
+    then titles with a word starting with it, then titles containing it, then the rest. Results of the same rank
+    keep the order of the config.
+
+    The casefolded titles are kept in one string, one title per line, so every rank is a single string or
+    regular expression search in C that stops as soon as there are enough results. Even the first typed character,
+    which matches almost every title, is answered well within a frame.
+    """
+
+    def __init__(self, store, build=True):
+        self.store = store
+        self._entries = {}  # (section, title) -> casefolded title, in the order of the config
+        self._lock = threading.Lock()
+        self._ready = False
+        self._build_id = 0
+        self._pending = None  # changes received during a build, applied to the new titles when it is done
+        self._text = None  # the casefolded titles, one per line, joined again after a change
+        self._keys = []  # (section, title) of every line
+        self._starts = array('I')  # offset of every line in _text
+
+        store.add_listener(self._on_store_changed)
+        if build:
+            self.rebuild()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def ready(self):
+        return self._ready
+
+    def rebuild(self):
+        """
+        Reads the titles of all categories in the background. The current titles are used until it is done.
+        """
+        with self._lock:
+            self._build_id += 1
+            self._pending = []
+            build_id = self._build_id
+
+        thread = threading.Thread(target=self._build, args=(build_id,), name="TitleIndexBuild", daemon=True)
+        thread.start()
+
+    def _build(self, build_id):
+        try:
+            entries = {(section, title): normalize(title)
+                       for section in self.store.sections() for title, _ in self.store.titles(section)}
+        except Exception as e:
+            logging.error(f"Error building title index: {e}")
+            return
+
+        with self._lock:
+            if build_id != self._build_id:
+                return  # a newer build was started in the meantime
+
+            for change in self._pending:
+                self._apply(entries, change)
+            self._pending = None
+            self._entries = entries
+            self._join()  # joined here, not on the first keystroke
+            self._ready = True
+
+    def _join(self):
+        self._keys = list(self._entries)
+        self._starts = array('I')
+        offset = 1
+        for folded in self._entries.values():
+            self._starts.append(offset)
+            offset += len(folded) + 1
+        self._text = "\n" + "\n".join(self._entries.values())  # every line starts after a line break
+
+    def _find(self, part):
+        offset = self._text.find(part)
+        while offset >= 0:
+            yield offset + 1  # past the line break or space the part may start with
+            offset = self._text.find(part, offset + 1)
+
+    def _find_in_order(self, text):
+        # "abc" as a[^\nb]*b[^\nc]*c, the pattern never backtracks within a line
+        pattern = re.escape(text[0]) + "".join(f"[^\\n{re.escape(char)}]*{re.escape(char)}" for char in text[1:])
+        for match in re.finditer(pattern, self._text):
+            yield match.start()
+
+    def search(self, query, limit=50, boost=None):
+        """
+        Returns up to `limit` SearchResults for `query`, the first titles of the config if it is empty.
+        Within a rank, titles with a score in `boost` ({(section, title): score}, e.g. the frecency of
+        fastfill.core.usage) come first, highest first. With an empty query these are all titles with a score.
+        """
+        text = normalize(query)
+        with self._lock:
+            if self._text is None:
+                self._join()
+
+            # Titles with a score are few, their ranks are checked one by one
+            boosted = ([], [], [], [])
+            if boost:
+                in_order = re.compile(".*?".join(map(re.escape, text)))
+                for key, _ in sorted(boost.items(), key=lambda item: -item[1]):
+                    folded = self._entries.get(key)
+                    if folded is None:
+                        continue
+                    if folded.startswith(text):
+                        boosted[0].append(key)
+                    elif " " + text in folded:
+                        boosted[1].append(key)
+                    elif text in folded:
+                        boosted[2].append(key)
+                    elif in_order.search(folded):
+                        boosted[3].append(key)
+
+            if not text:
+                keys = boosted[0] + [key for key in self._keys[:limit + len(boosted[0])] if key not in (boost or ())]
+                return [SearchResult(*key) for key in keys[:limit]]
+
+            keys = []
+            seen = set()
+            for rank, offsets in enumerate((self._find("\n" + text),  # title starts with the query
+                                            self._find(" " + text),  # a word starts with it
+                                            self._find(text),  # contains it
+                                            self._find_in_order(text))):  # contains its characters in order
+                for key in itertools.chain(boosted[rank], (self._keys[bisect_right(self._starts, offset) - 1]
+                                                           for offset in offsets)):
+                    if key not in seen:
+                        seen.add(key)
+                        keys.append(key)
+                        if len(keys) == limit:
+                            return [SearchResult(*key) for key in keys]
+
+            return [SearchResult(*key) for key in keys]
+
+    def _on_store_changed(self, event, *args):
+        """
+        Called by the store after every change, on the thread that made it and while the store lock is held.
+        """
+        if event in ("reloaded", "section_changed", "section_renamed"):
+            self.rebuild()  # the order of the categories or of their titles changed
+            return
+        if event not in ("snippet_added", "snippet_renamed", "snippet_removed", "section_removed"):
+            return
+
+        change = (event,) + args
+        with self._lock:
+            self._apply(self._entries, change)
+            if self._pending is not None:
+                self._pending.append(change)
+            self._text = None
+
+    @staticmethod
+    def _apply(entries, change):
+        event, *args = change
+        if event == "snippet_added":
+            section, title = args
+            entries[(section, title)] = normalize(title)
+        elif event == "snippet_renamed":
+            section, old_title, new_title = args
+            entries.pop((section, old_title), None)
+            entries[(section, new_title)] = normalize(new_title)
+        elif event == "snippet_removed":
+            entries.pop(tuple(args), None)
+        elif event == "section_removed":
+            for key in [key for key in entries if key[0] == args[0]]:
+                del entries[key]
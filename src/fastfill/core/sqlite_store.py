@@ -0,0 +1,720 @@
+# SQLite storage of FastFill for large snippet libraries, selected with "Storage/backend = sqlite" in settings.ini.
+# Every change is a small transaction on the rows it touches instead of a rewrite of the whole config file.
+# The database runs in WAL mode, so reading never waits for a write, and an FTS5 table indexes the titles and
+# non-encrypted contents for the search.
+#
+# SqliteStore has the methods and change notifications of ConfigStore, so SnippetRepository, the list models and
+# the search work with both. FastFillConfig.ini is imported when the database is created and exported by flush(),
+# so the config file stays a readable backup and the INI backend can be selected again. If the config file was
+# changed since the last export (edited, or written by the INI backend), it is imported again when the database is
+# opened. If the database has changes that were not exported at the same time, they win and the config file is
+# kept as a conflict copy before it is overwritten, like a conflict of ConfigStore.
+import contextlib
+import json
+import logging
+import math
+import os
+import shutil
+import sqlite3
+import threading
+from bisect import bisect_left
+
+from fastfill.core.instrumentation import timed
+from fastfill.core.search import MIN_QUERY_LENGTH, SearchResult, normalize
+from fastfill.core.store import (ConfigStore, SnippetRef, _synchronized, batch_events, config_changed, config_stamp,
+                                 conflict_copy_path, export_config)
+
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE categories (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    position REAL NOT NULL
+);
+CREATE TABLE snippets (
+    id INTEGER PRIMARY KEY,
+    category_id INTEGER NOT NULL REFERENCES categories (id) ON DELETE CASCADE,
+    title TEXT NOT NULL,
+    content TEXT NOT NULL DEFAULT '',
+    encrypted INTEGER NOT NULL DEFAULT 0,
+    position REAL NOT NULL,
+    UNIQUE (category_id, title)
+);
+CREATE INDEX snippets_order ON snippets (category_id, position);
+"""
+
+# Added in version 2: "ini_stamp" (config_stamp of the last import or export) and "unexported" ("1" while the
+# database has changes that are not in the config file)
+META_SCHEMA = """
+CREATE TABLE meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Contentless, so the ciphertext of encrypted values never ends up in the index. Moving a title does not touch it.
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE snippets_fts USING fts5 (
+    title, content, content = '', tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+);
+CREATE TRIGGER snippets_fts_insert AFTER INSERT ON snippets BEGIN
+    INSERT INTO snippets_fts (rowid, title, content)
+    VALUES (new.id, new.title, CASE WHEN new.encrypted THEN '' ELSE new.content END);
+END;
+CREATE TRIGGER snippets_fts_delete AFTER DELETE ON snippets BEGIN
+    INSERT INTO snippets_fts (snippets_fts, rowid, title, content)
+    VALUES ('delete', old.id, old.title, CASE WHEN old.encrypted THEN '' ELSE old.content END);
+END;
+CREATE TRIGGER snippets_fts_update AFTER UPDATE OF title, content, encrypted ON snippets BEGIN
+    INSERT INTO snippets_fts (snippets_fts, rowid, title, content)
+    VALUES ('delete', old.id, old.title, CASE WHEN old.encrypted THEN '' ELSE old.content END);
+    INSERT INTO snippets_fts (rowid, title, content)
+    VALUES (new.id, new.title, CASE WHEN new.encrypted THEN '' ELSE new.content END);
+END;
+"""
+
+def fts_query(query):
+    """
+    Returns the FTS5 query for a search: every query word as the start of a word, so "mai add" finds
+    "Mail address". Returns None if the query is too short.
+    """
+    query = normalize(query)
+    if len(query) < MIN_QUERY_LENGTH:
+        return None
+    return " AND ".join('"' + word.replace('"', '""') + '"*' for word in query.split())
+
+
+def moved_positions(positions, order):
+    """
+    Returns {key: new position} for the fewest keys that need a new position, so that sorting by position
+    gives `order`. positions has the current position of every key of order. The keys that are already in the
+    right order (the longest increasing run of positions) keep theirs, the others get positions in between,
+    e.g. moving one title changes a single row.
+    """
+    values = [positions[key] for key in order]
+
+    # Longest strictly increasing subsequence of the current positions
+    tails = []  # tails[k]: index of the smallest last value of an increasing run of length k + 1
+    tail_values = []
+    previous = [-1] * len(values)
+    for i, value in enumerate(values):
+        k = bisect_left(tail_values, value)
+        if k:
+            previous[i] = tails[k - 1]
+        if k == len(tails):
+            tails.append(i)
+            tail_values.append(value)
+        else:
+            tails[k] = i
+            tail_values[k] = value
+    kept = set()
+    i = tails[-1] if tails else -1
+    while i != -1:
+        kept.add(i)
+        i = previous[i]
+
+    # Every run of keys that are not kept goes between its kept neighbours
+    new_values = list(values)
+    start = 0
+    while start < len(values):
+        if start in kept:
+            start += 1
+            continue
+        end = start
+        while end < len(values) and end not in kept:
+            end += 1
+        low = new_values[start - 1] if start else None
+        high = values[end] if end < len(values) else None
+        count = end - start
+        for n in range(count):
+            if low is None and high is None:
+                new_values[start + n] = float(n + 1)
+            elif low is None:
+                new_values[start + n] = high - count + n
+            elif high is None:
+                new_values[start + n] = low + n + 1
+            else:
+                new_values[start + n] = low + (high - low) * (n + 1) / (count + 1)
+        start = end
+
+    # After many moves into the same gap the positions run out of precision, then all of them are renumbered
+    if any(a >= b for a, b in zip(new_values, new_values[1:])):
+        new_values = [float(n + 1) for n in range(len(values))]
+
+    return {key: new for key, old, new in zip(order, values, new_values) if new != old}
+
+
+class SqliteStore(object):
+    """
+    Keeps the categories and titles of FastFill in an SQLite database, see the module comment.
+    Changes are committed right away, so save() has nothing left to do. A change that another process
+    committed is noticed by refresh() and reported to the listeners as "reloaded". Like ConfigStore, reads never
+    refresh, it is called before every change and regularly by the main window (see StoreRefresher).
+    """
+
+    def __init__(self, path, ini_path=None):
+        self.path = path
+        self.ini_path = ini_path  # FastFillConfig.ini, imported once and kept up to date by flush()
+        self.has_full_text_search = True
+
+        self._lock = threading.RLock()
+        self._listeners = []
+        self._category_ids = {}  # category name -> id, filled on first use
+        self._changed = False  # changes since the last export to ini_path
+
+        self._connection = sqlite3.connect(str(path), isolation_level=None, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")  # a commit does not wait for fsync in WAL mode
+        self._connection.execute("PRAGMA foreign_keys = ON")
+
+        version = self._connection.execute("PRAGMA user_version").fetchone()[0]
+        if version == 0:
+            self._create()
+            if ini_path is not None and os.path.exists(ini_path):
+                self.import_ini(ini_path)
+                self._exported()  # the config file has the same content
+        else:
+            if version < 2:
+                self._connection.executescript(f"BEGIN; {META_SCHEMA} PRAGMA user_version = 2; COMMIT;")
+            self.has_full_text_search = self._connection.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'snippets_fts'").fetchone() is not None
+            self._changed = self._meta("unexported") == "1"
+            self._import_changed_ini()
+        self._data_version = self._query_data_version()
+        logging.info(f"Database opened: {path}")
+
+    def _create(self):
+        try:
+            self._connection.executescript(f"BEGIN; {SCHEMA} {META_SCHEMA} {FTS_SCHEMA} "
+                                           f"PRAGMA user_version = {SCHEMA_VERSION}; COMMIT;")
+        except sqlite3.OperationalError as e:
+            # SQLite without FTS5, the search builds its own index instead
+            logging.warning(f"Full-text search not available: {e}")
+            self._connection.execute("ROLLBACK")
+            self._connection.executescript(f"BEGIN; {SCHEMA} {META_SCHEMA} PRAGMA user_version = {SCHEMA_VERSION}; "
+                                           f"COMMIT;")
+            self.has_full_text_search = False
+        logging.info("Database created")
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        """
+        Runs the statements of the with block in one transaction, nothing is changed if one of them fails.
+        """
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._connection
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        self._connection.execute("COMMIT")
+        self._mark_changed()
+
+    def _execute(self, sql, parameters=()):
+        """
+        Runs a single statement that changes the database, it is a transaction on its own.
+        """
+        cursor = self._connection.execute(sql, parameters)
+        self._mark_changed()
+        return cursor
+
+    def _mark_changed(self):
+        """
+        Notes that the database has changes that are not exported yet, in the database on the first one.
+        """
+        if not self._changed:
+            self._set_meta("unexported", "1")
+        self._changed = True
+
+    def _meta(self, key):
+        row = self._connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def _set_meta(self, key, value):
+        self._connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def _query_data_version(self):
+        return self._connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def add_listener(self, listener):
+        """
+        Registers a function that is called on every change, see ConfigStore.add_listener.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, event, *args):
+        for listener in list(self._listeners):
+            try:
+                listener(event, *args)
+            except Exception as e:
+                logging.error(f"Error in config listener: {e}")
+
+    @_synchronized
+    def reload(self):
+        """
+        Forgets what is cached about the database and tells the listeners to read it again.
+        """
+        self._category_ids.clear()
+        self._data_version = self._query_data_version()
+        self._notify("reloaded")
+        return True
+
+    @_synchronized
+    def refresh(self):
+        """
+        Reloads if another process changed the database since it was last read. Returns True if it did.
+        """
+        if self._query_data_version() != self._data_version:
+            logging.info("Database changed by another process")
+            return self.reload()
+        return False
+
+    def save(self):
+        """
+        Nothing to do, every change is committed right away.
+        """
+
+    @_synchronized
+    def flush(self):
+        """
+        Exports the changes to the config file (if there were any since the last export) and moves the
+        committed changes from the WAL file into the database, e.g. before the application exits.
+        """
+        if self._changed and self.ini_path is not None:
+            try:
+                self._keep_changed_ini()
+                self.export_ini(self.ini_path)
+                self._exported()
+            except Exception as e:
+                logging.error(f"Error exporting the database: {e}")
+        self._connection.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    # Import and export of the config file
+
+    def _exported(self):
+        """
+        Remembers that the config file has the content of the database, as it is now.
+        """
+        self._connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('ini_stamp', ?), ('unexported', '0')",
+                                 (json.dumps(config_stamp(self.ini_path)),))
+        self._changed = False
+
+    def _import_changed_ini(self):
+        """
+        Imports the config file again if it was changed since the last import or export, replacing the content of
+        the database. If the database has changes that were not exported, they are kept instead (see flush).
+        """
+        if self.ini_path is None or self._changed:
+            return
+        stamp = self._meta("ini_stamp")
+        if config_changed(self.ini_path, stamp and json.loads(stamp)):
+            logging.info(f"{self.ini_path} was changed since the last export, importing it again")
+            self.import_ini(self.ini_path, replace=True)
+            self._exported()
+
+    def _keep_changed_ini(self):
+        """
+        Before the config file is overwritten by the changes of the database: keeps it as a conflict copy if it was
+        changed since the last import or export too.
+        """
+        stamp = self._meta("ini_stamp")
+        if config_changed(self.ini_path, stamp and json.loads(stamp)):
+            conflict_path = conflict_copy_path(self.ini_path)
+            shutil.copyfile(self.ini_path, conflict_path)
+            logging.warning(f"{self.ini_path} was changed here and in the database, kept the database, "
+                            f"the other version is in {conflict_path}")
+
+    @timed("db.import")
+    @_synchronized
+    def import_ini(self, ini_path, replace=False):
+        """
+        Adds the categories and titles of a FastFill config file, titles that already exist are skipped.
+        With replace, the current categories and titles are removed first. Everything is imported in one
+        transaction. Returns the number of imported titles.
+        """
+        config = ConfigStore(ini_path, save_delay=0)
+        imported = 0
+        with self._transaction() as connection:
+            if replace:
+                connection.execute("DELETE FROM snippets")
+                connection.execute("DELETE FROM categories")
+                self._category_ids.clear()
+            for section in config.sections():
+                if self._category_id(section) is None:
+                    self._insert_category(section)
+                category_id = self._category_id(section)
+                position = self._next_position(category_id)
+                for title, encrypted in config.titles(section):
+                    cursor = connection.execute(
+                        "INSERT OR IGNORE INTO snippets (category_id, title, content, encrypted, position) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (category_id, title, config.get_content(section, title), int(encrypted), position))
+                    if cursor.rowcount:
+                        imported += 1
+                        position += 1
+        config.flush()  # the config file may have been updated to the current layout when it was read
+
+        logging.info(f"Imported {imported} titles from {ini_path}")
+        self._notify("reloaded")
+        return imported
+
+    @timed("db.export")
+    @_synchronized
+    def export_ini(self, ini_path):
+        """
+        Writes all categories and titles to a FastFill config file, in the layout ConfigStore writes.
+        """
+        export_config(ini_path, [(section, self._connection.execute(
+            "SELECT title, content, encrypted FROM snippets WHERE category_id = ? ORDER BY position",
+            (self._category_id(section),)).fetchall()) for section in self.sections()])
+        logging.info(f"Exported the database to {ini_path}")
+
+    # Sections (categories)
+
+    def _category_id(self, section):
+        category_id = self._category_ids.get(section)
+        if category_id is None:
+            row = self._connection.execute("SELECT id FROM categories WHERE name = ?", (section,)).fetchone()
+            if row is None:
+                return None
+            category_id = self._category_ids[section] = row[0]
+        return category_id
+
+    def _require_category_id(self, section):
+        category_id = self._category_id(section)
+        if category_id is None:
+            raise KeyError(section)  # like the missing section of a ConfigStore
+        return category_id
+
+    def _insert_category(self, section):
+        self._connection.execute(
+            "INSERT INTO categories (name, position) VALUES (?, (SELECT COALESCE(MAX(position), 0) + 1 FROM categories))",
+            (section,))
+
+    def _next_position(self, category_id):
+        return self._connection.execute("SELECT COALESCE(MAX(position), 0) + 1 FROM snippets WHERE category_id = ?",
+                                        (category_id,)).fetchone()[0]
+
+    @_synchronized
+    def sections(self):
+        return [row[0] for row in self._connection.execute("SELECT name FROM categories ORDER BY position")]
+
+    @_synchronized
+    def has_section(self, section):
+        return self._category_id(section) is not None
+
+    @_synchronized
+    def is_section_empty(self, section):
+        """
+        Returns True if the section has no titles. Raises ValueError if the section does not exist.
+        """
+        if not self.has_section(section):
+            raise ValueError("Section is empty")
+        return self._connection.execute("SELECT 1 FROM snippets WHERE category_id = ? LIMIT 1",
+                                        (self._category_id(section),)).fetchone() is None
+
+    @_synchronized
+    def add_section(self, section):
+        self.refresh()
+        self._insert_category(section)
+        self._mark_changed()
+        self._notify("section_added", section)
+
+    @_synchronized
+    def remove_section(self, section):
+        self.refresh()
+        category_id = self._category_id(section)
+        if category_id is None:
+            return False
+        self._execute("DELETE FROM categories WHERE id = ?", (category_id,))  # and its titles
+        self._category_ids.pop(section, None)
+        self._notify("section_removed", section)
+        return True
+
+    @_synchronized
+    def rename_section(self, old_section, new_section):
+        self.refresh()
+        category_id = self._require_category_id(old_section)
+        self._execute("UPDATE categories SET name = ? WHERE id = ?", (new_section, category_id))
+        self._category_ids.pop(old_section, None)
+        self._category_ids[new_section] = category_id
+        self._notify("section_renamed", old_section, new_section)
+
+    @_synchronized
+    def reorder_sections(self, new_order):
+        """
+        Puts the sections in the given order, only the sections that moved are updated.
+        Sections missing in new_order keep their relative order at the end.
+        """
+        self.refresh()
+        positions = dict(self._connection.execute("SELECT name, position FROM categories ORDER BY position"))
+        order = list(dict.fromkeys(section for section in new_order if section in positions))
+        ordered_set = set(order)
+        order += [section for section in positions if section not in ordered_set]
+
+        moved = moved_positions(positions, order)
+        if moved:
+            with self._transaction() as connection:
+                connection.executemany("UPDATE categories SET position = ? WHERE name = ?",
+                                       [(position, section) for section, position in moved.items()])
+
+    # Titles of a section
+
+    @_synchronized
+    def titles(self, section, start=0, stop=None):
+        """
+        Returns (title, encrypted) for every title of a section in display order, or for the titles start to stop.
+        """
+        limit = -1 if stop is None else max(0, stop - start)  # -1 is no limit
+        return [(title, bool(encrypted)) for title, encrypted in self._connection.execute(
+            "SELECT title, encrypted FROM snippets WHERE category_id = ? ORDER BY position LIMIT ? OFFSET ?",
+            (self._require_category_id(section), limit, start))]
+
+    @_synchronized
+    def title_count(self, section):
+        """
+        Returns the number of titles of a section, counted in the index of the positions.
+        """
+        return self._connection.execute("SELECT COUNT(*) FROM snippets WHERE category_id = ?",
+                                        (self._require_category_id(section),)).fetchone()[0]
+
+    @_synchronized
+    def snippets(self):
+        """
+        Returns (section, title, encrypted, content) for every title of every section.
+        """
+        return [(section, title, bool(encrypted), content) for section, title, encrypted, content in
+                self._connection.execute(
+                    "SELECT categories.name, snippets.title, snippets.encrypted, snippets.content "
+                    "FROM snippets JOIN categories ON categories.id = snippets.category_id "
+                    "ORDER BY categories.position, snippets.position")]
+
+    @_synchronized
+    def find(self, section, title):
+        """
+        Returns the SnippetRef of a title (its index is the row id, there are no config keys),
+        or None if the section has no such title.
+        """
+        row = self._connection.execute("SELECT id, encrypted FROM snippets WHERE category_id = ? AND title = ?",
+                                       (self._require_category_id(section), title)).fetchone()
+        if row is None:
+            return None
+        return SnippetRef(row[0], bool(row[1]), None, None)
+
+    @_synchronized
+    def has_title(self, section, title):
+        return self.find(section, title) is not None
+
+    @_synchronized
+    def get_content(self, section, title, fallback=""):
+        row = self._connection.execute("SELECT content FROM snippets WHERE category_id = ? AND title = ?",
+                                       (self._require_category_id(section), title)).fetchone()
+        return fallback if row is None else row[0]
+
+    @_synchronized
+    def set_content(self, section, title, content):
+        """
+        Sets the content of an existing title. Returns False if the title does not exist.
+        """
+        self.refresh()
+        cursor = self._execute("UPDATE snippets SET content = ? WHERE category_id = ? AND title = ?",
+                               (content, self._require_category_id(section), title))
+        if not cursor.rowcount:
+            return False
+        self._notify("content_changed", section, title)
+        return True
+
+    @_synchronized
+    def replace_contents(self, changes):
+        """
+        Sets the contents of many titles in one transaction, see ConfigStore.replace_contents.
+        Returns the number of replaced contents.
+        """
+        self.refresh()
+        replaced = []
+        with self._transaction() as connection:
+            for section, title, expected_content, content in changes:
+                category_id = self._category_id(section)
+                if category_id is None:
+                    continue
+                cursor = connection.execute(
+                    "UPDATE snippets SET content = ? WHERE category_id = ? AND title = ? AND content = ?",
+                    (content, category_id, title, expected_content))
+                if cursor.rowcount:
+                    replaced.append((section, title))
+
+        for section, title in replaced:
+            self._notify("content_changed", section, title)
+        return len(replaced)
+
+    @_synchronized
+    def add_snippet(self, section, title, content, encrypted=False):
+        """
+        Appends a new title with its content to a section and returns its SnippetRef.
+        """
+        return self.add_snippets(section, [(title, content, encrypted)])[0]
+
+    @_synchronized
+    def add_snippets(self, section, snippets):
+        """
+        Appends (title, content, encrypted) entries to a section in one transaction and returns their SnippetRefs.
+        """
+        self.refresh()
+        category_id = self._require_category_id(section)
+
+        refs = []
+        with self._transaction() as connection:
+            position = self._next_position(category_id)
+            for title, content, encrypted in snippets:
+                cursor = connection.execute(
+                    "INSERT INTO snippets (category_id, title, content, encrypted, position) VALUES (?, ?, ?, ?, ?)",
+                    (category_id, title, content, int(encrypted), position))
+                refs.append(SnippetRef(cursor.lastrowid, encrypted, None, None))
+                position += 1
+
+        for title, _, _ in snippets:
+            self._notify("snippet_added", section, title)
+        return refs
+
+    @_synchronized
+    def add_batch(self, batch):
+        """
+        Adds [(section, [(title, content, encrypted), ...]), ...] in one transaction, see ConfigStore.add_batch.
+        Returns the number of added titles.
+        """
+        self.refresh()
+        if callable(batch):
+            batch = batch()
+
+        events = []
+        try:
+            with self._transaction() as connection:
+                for section, snippets in batch:
+                    if self._category_id(section) is None:
+                        self._insert_category(section)
+                        events.append(("section_added", section))
+                    category_id = self._category_id(section)
+
+                    position = self._next_position(category_id)
+                    connection.executemany(
+                        "INSERT INTO snippets (category_id, title, content, encrypted, position) VALUES (?, ?, ?, ?, ?)",
+                        ((category_id, title, content, int(encrypted), position + n)
+                         for n, (title, content, encrypted) in enumerate(snippets)))
+                    events += [("snippet_added", section, title) for title, _, _ in snippets]
+        except BaseException:
+            self._category_ids.clear()  # may hold the ids of categories that were rolled back
+            raise
+
+        for event in batch_events(events):
+            self._notify(*event)
+        return sum(event[0] == "snippet_added" for event in events)
+
+    @_synchronized
+    def rename_snippet(self, section, old_title, new_title):
+        """
+        Renames a title and keeps its encryption flag. Returns False if the title does not exist.
+        """
+        self.refresh()
+        cursor = self._execute("UPDATE snippets SET title = ? WHERE category_id = ? AND title = ?",
+                               (new_title, self._require_category_id(section), old_title))
+        if not cursor.rowcount:
+            return False
+        self._notify("snippet_renamed", section, old_title, new_title)
+        return True
+
+    @_synchronized
+    def remove_snippet(self, section, title):
+        """
+        Removes a title with its content. Returns False if the title does not exist.
+        """
+        return self.remove_snippets(section, [title]) == 1
+
+    @_synchronized
+    def remove_snippets(self, section, titles):
+        """
+        Removes many titles with their contents in one transaction.
+        Titles that do not exist are ignored. Returns the number of removed titles.
+        """
+        self.refresh()
+        category_id = self._require_category_id(section)
+
+        removed = []
+        with self._transaction() as connection:
+            for title in titles:
+                if connection.execute("DELETE FROM snippets WHERE category_id = ? AND title = ?",
+                                      (category_id, title)).rowcount:
+                    removed.append(title)
+
+        for title in removed:
+            self._notify("snippet_removed", section, title)
+        return len(removed)
+
+    @_synchronized
+    def reorder_snippets(self, section, new_order):
+        """
+        Puts the titles of a section in the given order, only the titles that moved are updated.
+        Titles missing in new_order keep their relative order at the end.
+        """
+        self.refresh()
+        category_id = self._require_category_id(section)
+        positions = dict(self._connection.execute(
+            "SELECT title, position FROM snippets WHERE category_id = ? ORDER BY position", (category_id,)))
+
+        order = list(dict.fromkeys(title for title in new_order if title in positions))
+        ordered_set = set(order)
+        order += [title for title in positions if title not in ordered_set]
+
+        moved = moved_positions(positions, order)
+        if len(moved) == 1:
+            (title, position), = moved.items()
+            self._execute("UPDATE snippets SET position = ? WHERE category_id = ? AND title = ?",
+                          (position, category_id, title))
+        elif moved:
+            with self._transaction() as connection:
+                connection.executemany("UPDATE snippets SET position = ? WHERE category_id = ? AND title = ?",
+                                       [(position, category_id, title) for title, position in moved.items()])
+
+    # Search
+
+    @timed("db.search")
+    @_synchronized
+    def search(self, query, limit=50, boost=None):
+        """
+        Returns SearchResults for the titles whose title or non-encrypted content contains every query word
+        as the start of a word. Title matches come first, like in TrigramIndex.search.
+        Not ranked with bm25, which has to score every match and takes milliseconds for common words.
+        Titles with a score in `boost` ({(section, title): score}) come first among the title matches and among
+        the content matches that were found.
+        """
+        match = fts_query(query)
+        if match is None or not self.has_full_text_search:
+            return []
+
+        results = {}
+        try:
+            for column_match in (f"{{title}} : ({match})", match):
+                rows = self._connection.execute(
+                    "SELECT snippets.id, categories.name, snippets.title FROM snippets_fts "
+                    "JOIN snippets ON snippets.id = snippets_fts.rowid "
+                    "JOIN categories ON categories.id = snippets.category_id "
+                    "WHERE snippets_fts MATCH ? LIMIT ?", (column_match, limit + len(results)))
+                found = [(snippet_id, SearchResult(section, title)) for snippet_id, section, title in rows
+                         if snippet_id not in results]
+                if boost:
+                    found.sort(key=lambda item: -boost.get(item[1], -math.inf))  # stable, the rest keeps its order
+                results.update(found)
+                if len(results) >= limit:
+                    break
+        except sqlite3.OperationalError as e:
+            logging.error(f"Error searching: {e}")
+            return []
+        return list(results.values())[:limit]
@@ -0,0 +1,30 @@
+# Timing of the startup phases.
+# FastFill starts with Windows and sits in the tray, so the time until the tray icon exists is what users notice.
+# The summary with the duration of every phase is logged once the tray icon exists.
+import time
+
+
+class StartupTimer(object):
+    """
+    Records how long each startup phase took, counted from `started` (a time.perf_counter() value).
+    """
+
+    def __init__(self, started=None):
+        self.started = time.perf_counter() if started is None else started
+        self._last = self.started
+        self.phases = []  # [(phase, seconds)]
+
+    def mark(self, phase):
+        """
+        Ends the current phase. Nothing is logged here, the first phases end before logging is set up.
+        """
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def elapsed(self):
+        return self._last - self.started
+
+    def summary(self):
+        phases = ", ".join(f"{phase} {seconds * 1000:.0f} ms" for phase, seconds in self.phases)
+        return f"Startup took {self.elapsed() * 1000:.0f} ms ({phases})"
@@ -0,0 +1,787 @@
+# In-memory access to FastFillConfig.ini.
+# The config file is parsed once, every read is served from memory and the file is only parsed
+# again when its modification time or size changes on disk (e.g. when it was edited by hand). refresh() checks
+# that before every change and when ConfigWatcher noticed a change of the file. Reads never reload, so the config
+# cannot change under a caller in the middle of reading it piece by piece (e.g. a list model fetching its rows).
+#
+# Layout of a section: "itemN_title" / "itemN_content" for every title, where N is a stable ID of the title,
+# and "order = 3,1,2" with the IDs in the order the titles are shown. Adding, removing or moving a title only
+# touches its own keys and the order, the other items are never renumbered. Configs of older versions
+# (items numbered 1..n in file order, no order key) get their order key once when they are loaded.
+#
+# When the file is changed by someone else (a sync tool, a script), only the differences are applied: reload()
+# compares the titles and contents with the ones in memory and reports every added, removed or changed title.
+# If there are unsaved changes at the same time, the write merges both sides per title, and titles that were
+# changed on both sides keep the local value, the other version of the file is kept as a conflict copy.
+import configparser
+import functools
+import hashlib
+import io
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+
+from fastfill.core.instrumentation import timed
+from fastfill.core.persistence import DebouncedWriter, atomic_file, write_atomic
+
+# Titles of encrypted values are saved with this suffix, e.g. "item3_title = Password_encrypted"
+ENCRYPTED_SUFFIX = "_encrypted"
+
+# Key with the IDs of the titles of a section in display order
+ORDER_KEY = "order"
+
+# add_batch() sends the events of every added title up to this many titles, a single "reloaded" above
+BATCH_EVENTS = 1000
+
+# A title in a section: stable ID (the N of itemN), encryption flag and the config keys of title and content
+SnippetRef = namedtuple("SnippetRef", ["index", "encrypted", "title_key", "content_key"])
+
+
+def split_title(config_value):
+    """
+    Splits a title value from the config into the displayed title and its encryption flag.
+    """
+    if config_value.endswith(ENCRYPTED_SUFFIX):
+        return config_value[:-len(ENCRYPTED_SUFFIX)], True
+    return config_value, False
+
+
+def item_number(title_key):
+    """
+    Returns N for a key like "itemN_title", or None if the key does not follow that pattern.
+    """
+    try:
+        return int(title_key[len("item"):-len("_title")])
+    except ValueError:
+        return None
+
+
+def parse_order(value):
+    """
+    Returns the IDs of an order value like "3,1,2". Invalid parts are skipped.
+    """
+    return [int(part) for part in value.split(",") if part.strip().isdigit()]
+
+
+def new_config_parser():
+    """
+    Returns an empty parser for the FastFill config. Values are stored as they are,
+    without "%" interpolation, so texts like "50% off" can be saved.
+    """
+    return configparser.ConfigParser(interpolation=None)
+
+
+def build_index(section_data):
+    """
+    Returns the title index of a section of a parsed config and the ID for the next new title.
+    The index maps the displayed title (without "_encrypted") to its SnippetRef, in the order of the order key.
+    Titles missing in the order key (e.g. added by hand) follow in file order.
+    """
+    # The parser's items() with raw=True skips the lookup every value of the section proxy goes through,
+    # that is most of the time for large sections (the config has no interpolation anyway)
+    items = [(item_number(key), key, value) for key, value in section_data.parser.items(section_data.name, raw=True)
+             if key.endswith("_title")]
+
+    by_id = {item[0]: item for item in items if item[0] is not None}
+    ordered = []
+    for item_id in parse_order(section_data.get(ORDER_KEY, "")):
+        item = by_id.pop(item_id, None)
+        if item is not None:
+            ordered.append(item)
+    ordered += [item for item in items if item[0] is None or item[0] in by_id]
+
+    index = {}
+    for item_id, key, value in ordered:
+        title, encrypted = split_title(value)
+        # If a title exists twice (hand-edited config), the first one wins
+        index.setdefault(title, SnippetRef(item_id, encrypted, key, key[:-len("_title")] + "_content"))
+    return index, max((item[0] for item in items if item[0] is not None), default=0) + 1
+
+
+def config_view(config):
+    """
+    Returns {section: {title: (encrypted, content)}} of a parsed config, to compare it with another one.
+    """
+    view = {}
+    for section in config.sections():
+        section_data = config[section]
+        index, _ = build_index(section_data)
+        view[section] = {title: (ref.encrypted, section_data.get(ref.content_key, "")) for title, ref in index.items()}
+    return view
+
+
+def diff_views(old, new):
+    """
+    Returns the changes from one config_view to another as the events a ConfigStore sends, e.g.
+    ("section_added", section), ("snippet_removed", section, title) or ("content_changed", section, title).
+    A title that was encrypted or decrypted counts as a changed content. The order is not compared.
+    """
+    changes = [("section_removed", section) for section in old if section not in new]
+    for section, snippets in new.items():
+        old_snippets = old.get(section)
+        if old_snippets is None:
+            changes.append(("section_added", section))
+            old_snippets = {}
+        changes += [("snippet_removed", section, title) for title in old_snippets if title not in snippets]
+        for title, value in snippets.items():
+            if title not in old_snippets:
+                changes.append(("snippet_added", section, title))
+            elif old_snippets[title] != value:
+                changes.append(("content_changed", section, title))
+    return changes
+
+
+def write_config(config_file, sections):
+    """
+    Writes (section, [(title, content, encrypted), ...]) in display order to an open file in the format of the
+    FastFill config (as written by ConfigParser), one section at a time. The items of every section are
+    numbered in that order.
+    Raises ValueError for a section name with a line break, it can't be written as a section header.
+    """
+    for section, snippets in sections:
+        if "\n" in section or "\r" in section:
+            raise ValueError(f"A section name cannot contain line breaks: {section!r}")
+        config_file.write(f"[{section}]\n{ORDER_KEY} = {','.join(str(n) for n in range(1, len(snippets) + 1))}\n")
+        for n, (title, content, encrypted) in enumerate(snippets, start=1):
+            title = title + ENCRYPTED_SUFFIX if encrypted else title
+            config_file.write(f"item{n}_title = {_config_value(title)}\nitem{n}_content = {_config_value(content)}\n")
+        config_file.write("\n")
+
+
+def _config_value(value):
+    """
+    Returns a value as ConfigParser.write writes it: every further line is a continuation line (indented).
+    A CR is written as a line break too, it would end the line when the file is read.
+    """
+    return value.replace("\r\n", "\n").replace("\r", "\n").replace("\n", "\n\t")
+
+
+def export_config(path, sections):
+    """
+    Writes a FastFill config file from (section, [(title, content, encrypted), ...]) in display order,
+    e.g. to export another storage backend. Written piece by piece, sections can be a generator.
+    """
+    with atomic_file(path) as config_file:
+        write_config(config_file, sections)
+
+
+def config_stamp(path):
+    """
+    Returns [mtime_ns, size, sha256] of a config file, or None if it does not exist. SqliteStore and PackedStore
+    keep the stamp of FastFillConfig.ini from their last import or export, to notice when it was changed since.
+    """
+    try:
+        stat = os.stat(path)
+        digest = hashlib.sha256()
+        with open(path, 'rb') as config_file:
+            for chunk in iter(lambda: config_file.read(1048576), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size, digest.hexdigest()]
+
+
+def config_changed(path, stamp):
+    """
+    Returns True if the config file was changed since config_stamp returned stamp. The file is only hashed when
+    its modification time or size differ, so a file that was only touched is not changed. Without a stamp (e.g.
+    from an older version) or a file, nothing is known to have changed.
+    """
+    if stamp is None:
+        return False
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return False
+    if [stat.st_mtime_ns, stat.st_size] == list(stamp[:2]):
+        return False
+    current = config_stamp(path)
+    return current is not None and current[2] != stamp[2]
+
+
+def conflict_copy_path(path):
+    """
+    Returns the name of a conflict copy of a config file, e.g. FastFillConfig.conflict-20240131-120000.ini.
+    """
+    stem, extension = os.path.splitext(path)
+    return f"{stem}.conflict-{time.strftime('%Y%m%d-%H%M%S')}{extension}"
+
+
+def batch_events(events):
+    """
+    Returns the events add_batch() sends for the (event, *args) of the added sections and titles.
+    """
+    return events if len(events) <= BATCH_EVENTS else [("reloaded",)]
+
+
+def _synchronized(method):
+    """
+    Runs a ConfigStore method while holding the store lock, the config is written from a background thread.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class ConfigStore(object):
+    """
+    Keeps the parsed FastFill config in memory and reloads it only when the file changed.
+    save() does not write immediately, changes are written in the background by a DebouncedWriter.
+
+    Listeners registered with add_listener() are called as listener(event, *args) after every change:
+    "reloaded", "section_added", "section_removed", "section_renamed" (old, new), "section_changed",
+    "snippet_added", "snippet_renamed" (section, old, new), "snippet_removed" and "content_changed" (section, title).
+    Changes made by someone else are sent as these events as well, followed by "external_changes" with the list
+    of them as (event, *args), and "conflict" (path of the conflict copy, [(section, title)]) if both sides
+    changed the same titles. A title of None stands for a whole section.
+    """
+
+    def __init__(self, path, save_delay=0.3):
+        self.path = path
+        self._config = new_config_parser()
+        self._stamp = None  # (mtime_ns, size) of the file as it was last read or written
+        self._indexes = {}  # section -> {displayed title: SnippetRef} in display order, built on first use
+        self._next_ids = {}  # section -> ID of the next new title, known once the index is built
+        self._base = None  # config_view of the file as it was last read or written, to find external changes
+
+        self._lock = threading.RLock()
+        self._writer = DebouncedWriter(self._write, delay=save_delay)
+        self._listeners = []
+
+        self.reload()
+
+    def _file_stamp(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def add_listener(self, listener):
+        """
+        Registers a function that is called on every change of the in-memory config.
+        It is called on the thread that made the change, while the store lock is held.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, event, *args):
+        for listener in list(self._listeners):
+            try:
+                listener(event, *args)
+            except Exception as e:
+                logging.error(f"Error in config listener: {e}")
+
+    @timed("config.read")
+    @_synchronized
+    def reload(self):
+        """
+        Parses the config file again. The in-memory config is kept if the file cannot be read.
+        """
+        config = new_config_parser()
+
+        try:
+            config.read(self.path)
+        except Exception as e:
+            logging.error(f"Error reading config: {e}")
+            return False
+
+        old_base = self._base
+        self._config = config
+        self._stamp = self._file_stamp()
+        self._indexes.clear()
+        self._next_ids.clear()
+        self._base = config_view(config)
+        logging.info("Config loaded")
+
+        # One-time migration of older configs: the item numbers become the IDs, the file order the display order
+        migrated = [section for section in config.sections() if not config.has_option(section, ORDER_KEY)]
+        for section in migrated:
+            self._write_order(section)
+        if migrated:
+            logging.info(f"Added the title order to {len(migrated)} categories")
+            self.save()
+
+        if old_base is None:
+            self._notify("reloaded")
+        else:
+            # Changed by someone else, only report what is different
+            changes = diff_views(old_base, self._base)
+            logging.info(f"Config changed on disk: {len(changes)} changes")
+            for change in changes:
+                self._notify(*change)
+            self._notify("external_changes", changes)
+        return True
+
+    @_synchronized
+    def refresh(self):
+        """
+        Reloads the config if the file was changed since it was last read or written.
+        Returns True if the config was reloaded.
+        """
+        if self._writer.busy:
+            return False  # unsaved changes in memory are newer than the file
+        if self._file_stamp() != self._stamp:
+            return self.reload()
+        return False
+
+    def save(self):
+        """
+        Schedules writing the in-memory config to the config file.
+        Several saves in a short time end up in a single write.
+        """
+        self._writer.schedule()
+
+    def flush(self):
+        """
+        Writes pending changes immediately, e.g. before the application exits.
+        """
+        self._writer.flush()
+
+    @timed("config.write")
+    def _write(self):
+        """
+        Writes a snapshot of the config atomically, called by the DebouncedWriter.
+        If the file was changed by someone else since it was read, their changes are merged in first.
+        """
+        with self._lock:
+            if self._base is not None and self._file_stamp() not in (self._stamp, None):
+                self._merge_external()
+            buffer = io.StringIO()
+            self._config.write(buffer)
+            base = self._view()
+
+        write_atomic(self.path, buffer.getvalue())
+
+        with self._lock:
+            self._stamp = self._file_stamp()
+            self._base = base
+
+    def _view(self):
+        """
+        Returns the config_view of the in-memory config, using the title indexes.
+        """
+        view = {}
+        for section in self._config.sections():
+            section_data = self._config[section]
+            view[section] = {title: (ref.encrypted, section_data.get(ref.content_key, ""))
+                             for title, ref in self._index(section).items()}
+        return view
+
+    def _merge_external(self):
+        """
+        Applies the changes someone else made to the file since it was last read or written (the base) to the
+        in-memory config, which has unsaved changes of its own. Per title, the side that changed it wins.
+        Titles changed on both sides keep the local value, the file is then kept as a conflict copy.
+        """
+        try:
+            with open(self.path) as config_file:  # same encoding as ConfigParser.read and write_atomic
+                their_text = config_file.read()
+            theirs = new_config_parser()
+            theirs.read_string(their_text)
+        except Exception as e:
+            logging.error(f"Error reading the changed config, it is overwritten: {e}")
+            return
+
+        base, ours, their_view = self._base, self._view(), config_view(theirs)
+        changes = []
+        conflicts = []
+
+        for section in set(base) | set(ours) | set(their_view):
+            base_snippets = base.get(section)
+            our_snippets = ours.get(section)
+            their_snippets = their_view.get(section)
+
+            if our_snippets is None or their_snippets is None:
+                if base_snippets is None:
+                    # Added on one side
+                    if our_snippets is None:
+                        self.add_section(section)
+                        self.add_snippets(section, [(title, content, encrypted) for title, (encrypted, content)
+                                                    in their_snippets.items()])
+                        changes.append(("section_added", section))
+                        changes += [("snippet_added", section, title) for title in their_snippets]
+                elif our_snippets == base_snippets and their_snippets is None:
+                    self.remove_section(section)  # removed by them
+                    changes.append(("section_removed", section))
+                elif (our_snippets if their_snippets is None else their_snippets) != base_snippets:
+                    conflicts.append((section, None))  # removed on one side, changed on the other
+                continue
+
+            base_snippets = base_snippets or {}
+            for title in dict.fromkeys(list(our_snippets) + list(their_snippets) + list(base_snippets)):
+                base_value, our_value, their_value = (base_snippets.get(title), our_snippets.get(title),
+                                                      their_snippets.get(title))
+                if their_value == base_value or their_value == our_value:
+                    continue
+                if our_value != base_value:
+                    conflicts.append((section, title))
+                elif their_value is None:
+                    self.remove_snippet(section, title)
+                    changes.append(("snippet_removed", section, title))
+                elif our_value is None or our_value[0] != their_value[0]:
+                    if our_value is not None:
+                        self.remove_snippet(section, title)  # encrypted or decrypted by them
+                    self.add_snippet(section, title, their_value[1], their_value[0])
+                    changes.append(("snippet_added", section, title))
+                else:
+                    self.set_content(section, title, their_value[1])
+                    changes.append(("content_changed", section, title))
+
+        logging.info(f"Config changed on disk and here: {len(changes)} changes merged, {len(conflicts)} conflicts")
+        if changes:
+            self._notify("external_changes", changes)
+        if conflicts:
+            conflict_path = conflict_copy_path(self.path)
+            try:
+                write_atomic(conflict_path, their_text)
+            except OSError as e:
+                logging.error(f"Error saving the conflict copy: {e}")
+                conflict_path = None
+            logging.warning(f"Conflicting changes, kept the local ones, the other version is in {conflict_path}")
+            self._notify("conflict", conflict_path, conflicts)
+
+    # Sections (categories)
+
+    @_synchronized
+    def sections(self):
+        return self._config.sections()
+
+    @_synchronized
+    def has_section(self, section):
+        return self._config.has_section(section)
+
+    @_synchronized
+    def is_section_empty(self, section):
+        """
+        Returns True if the section has no keys. Raises ValueError if the section does not exist.
+        """
+        if not self.has_section(section):
+            raise ValueError("Section is empty")
+        return not self._index(section)
+
+    @_synchronized
+    def add_section(self, section):
+        self.refresh()
+        self._config.add_section(section)
+        self._config.set(section, ORDER_KEY, "")
+        self._notify("section_added", section)
+
+    @_synchronized
+    def remove_section(self, section):
+        self.refresh()
+        self._forget_index(section)
+        removed = self._config.remove_section(section)
+        if removed:
+            self._notify("section_removed", section)
+        return removed
+
+    @_synchronized
+    def rename_section(self, old_section, new_section):
+        """
+        Renames a section by copying its items to a new section and removing the old one.
+        """
+        self.refresh()
+        self._config.add_section(new_section)
+        for key, value in self._config[old_section].items():
+            self._config[new_section][key] = value
+        self._config.remove_section(old_section)
+
+        index = self._indexes.pop(old_section, None)
+        if index is not None:
+            self._indexes[new_section] = index
+            self._next_ids[new_section] = self._next_ids.pop(old_section)
+        self._notify("section_renamed", old_section, new_section)
+
+    @_synchronized
+    def reorder_sections(self, new_order):
+        """
+        Rebuilds the config with the sections in the given order.
+        """
+        self.refresh()
+        new_config = new_config_parser()
+        for section in new_order:
+            new_config.add_section(section)
+            for key, value in self._config[section].items():
+                new_config.set(section, key, value)
+        self._config = new_config
+
+    # Keys of a section
+
+    @_synchronized
+    def items(self, section):
+        """
+        Returns all (key, value) pairs of a section in file order.
+        """
+        return list(self._config[section].items())
+
+    @_synchronized
+    def get(self, section, key, fallback=None):
+        return self._config[section].get(key, fallback)
+
+    @_synchronized
+    def set(self, section, key, value):
+        self.refresh()
+        self._config.set(section, key, value)
+        self._forget_index(section)
+        self._notify("section_changed", section)
+
+    @_synchronized
+    def remove_option(self, section, key):
+        self.refresh()
+        self._forget_index(section)
+        removed = self._config.remove_option(section, key)
+        if removed:
+            self._notify("section_changed", section)
+        return removed
+
+    @_synchronized
+    def replace_section(self, section, new_section_data):
+        """
+        Replaces all keys of a section with the given (ordered) dictionary.
+        """
+        self.refresh()
+        self._config[section] = new_section_data
+        self._forget_index(section)
+        self._notify("section_changed", section)
+
+    # Titles (snippets) of a section, looked up through the title index
+
+    def _index(self, section):
+        """
+        Returns the title index of a section (see build_index) and builds it if needed.
+        """
+        index = self._indexes.get(section)
+        if index is None:
+            index, self._next_ids[section] = build_index(self._config[section])
+            self._indexes[section] = index
+
+        return index
+
+    def _forget_index(self, section):
+        self._indexes.pop(section, None)
+        self._next_ids.pop(section, None)
+
+    def _write_order(self, section):
+        """
+        Saves the display order of the title index into the order key of the section.
+        """
+        index = self._index(section)
+        self._config.set(section, ORDER_KEY, ",".join(str(ref.index) for ref in index.values() if ref.index is not None))
+
+    @_synchronized
+    def titles(self, section, start=0, stop=None):
+        """
+        Returns (title, encrypted) for every title of a section in display order,
+        or for the titles start to stop (like titles(section)[start:stop], without the titles before start).
+        """
+        items = self._index(section).items()
+        if start or stop is not None:
+            items = itertools.islice(items, start, stop)
+        return [(title, ref.encrypted) for title, ref in items]
+
+    @_synchronized
+    def title_count(self, section):
+        """
+        Returns the number of titles of a section.
+        """
+        return len(self._index(section))
+
+    @_synchronized
+    def snippets(self):
+        """
+        Returns (section, title, encrypted, content) for every title of every section, e.g. to build a search index.
+        """
+        snippets = []
+        for section in self.sections():
+            section_data = self._config[section]
+            for title, ref in self._index(section).items():
+                snippets.append((section, title, ref.encrypted, section_data.get(ref.content_key, "")))
+        return snippets
+
+    @_synchronized
+    def find(self, section, title):
+        """
+        Returns the SnippetRef of a displayed title, or None if the section has no such title.
+        """
+        return self._index(section).get(title)
+
+    @_synchronized
+    def has_title(self, section, title):
+        return title in self._index(section)
+
+    @_synchronized
+    def get_content(self, section, title, fallback=""):
+        ref = self.find(section, title)
+        if ref is None:
+            return fallback
+        return self._config[section].get(ref.content_key, fallback)
+
+    @_synchronized
+    def set_content(self, section, title, content):
+        """
+        Sets the content of an existing title. Returns False if the title does not exist.
+        """
+        self.refresh()
+        ref = self.find(section, title)
+        if ref is None:
+            return False
+        self._config.set(section, ref.content_key, content)  # title keys are unchanged, index stays valid
+        self._notify("content_changed", section, title)
+        return True
+
+    @_synchronized
+    def replace_contents(self, changes):
+        """
+        Sets the contents of many titles in one step, e.g. after re-encrypting them. A write in the background
+        sees either none or all of them. changes are (section, title, expected content, new content),
+        a title whose content is no longer the expected one is left alone. Returns the number of replaced contents.
+        """
+        self.refresh()
+        replaced = 0
+        for section, title, expected_content, content in changes:
+            if not self._config.has_section(section) or self.get_content(section, title, None) != expected_content:
+                continue
+            self.set_content(section, title, content)
+            replaced += 1
+        return replaced
+
+    @_synchronized
+    def add_snippet(self, section, title, content, encrypted=False):
+        """
+        Appends a new title with its content to a section and returns its SnippetRef.
+        """
+        return self.add_snippets(section, [(title, content, encrypted)])[0]
+
+    @_synchronized
+    def add_snippets(self, section, snippets):
+        """
+        Appends (title, content, encrypted) entries to a section in one step and returns their SnippetRefs.
+        """
+        self.refresh()
+        index = self._index(section)
+        refs = [self._add(section, index, title, content, encrypted) for title, content, encrypted in snippets]
+
+        self._write_order(section)
+        for title, _, _ in snippets:
+            self._notify("snippet_added", section, title)
+        return refs
+
+    def _add(self, section, index, title, content, encrypted):
+        new_id = self._next_ids[section]
+        self._next_ids[section] = new_id + 1
+        ref = SnippetRef(new_id, encrypted, f"item{new_id}_title", f"item{new_id}_content")
+        self._config.set(section, ref.title_key, title + ENCRYPTED_SUFFIX if encrypted else title)
+        self._config.set(section, ref.content_key, content)
+        index[title] = ref
+        return ref
+
+    @_synchronized
+    def add_batch(self, batch):
+        """
+        Adds [(section, [(title, content, encrypted), ...]), ...] in one step, sections that do not exist yet
+        are added at the end. The store lock is held until everything is added, so the background writer
+        writes all of it or nothing of it. Listeners get the events of every section and title, or a single
+        "reloaded" for more than BATCH_EVENTS. Returns the number of added titles.
+
+        batch can also be a function that returns it. It is called with the lock held, so it can check the
+        titles of the store (e.g. for duplicates) and no other thread changes them before they are added.
+        """
+        self.refresh()
+        if callable(batch):
+            batch = batch()
+
+        events = []
+        for section, snippets in batch:
+            if not self._config.has_section(section):
+                self._config.add_section(section)
+                self._config.set(section, ORDER_KEY, "")
+                events.append(("section_added", section))
+
+            index = self._index(section)
+            for title, content, encrypted in snippets:
+                self._add(section, index, title, content, encrypted)
+                events.append(("snippet_added", section, title))
+            self._write_order(section)
+
+        for event in batch_events(events):
+            self._notify(*event)
+        return sum(event[0] == "snippet_added" for event in events)
+
+    @_synchronized
+    def rename_snippet(self, section, old_title, new_title):
+        """
+        Renames a title and keeps its encryption flag. Returns False if the title does not exist.
+        """
+        self.refresh()
+        index = self._index(section)
+
+        ref = index.get(old_title)
+        if ref is None:
+            return False
+
+        self._config.set(section, ref.title_key, new_title + ENCRYPTED_SUFFIX if ref.encrypted else new_title)
+
+        # Rebuild the dictionary to keep the position of the renamed title
+        self._indexes[section] = {(new_title if title == old_title else title): value
+                                  for title, value in index.items()}
+        self._notify("snippet_renamed", section, old_title, new_title)
+        return True
+
+    @_synchronized
+    def remove_snippet(self, section, title):
+        """
+        Removes a title with its content, the other items keep their keys.
+        Returns False if the title does not exist.
+        """
+        return self.remove_snippets(section, [title]) == 1
+
+    @_synchronized
+    def remove_snippets(self, section, titles):
+        """
+        Removes many titles with their contents, the other items keep their keys.
+        Titles that do not exist are ignored. Returns the number of removed titles.
+        """
+        self.refresh()
+        index = self._index(section)
+
+        removed = []
+        for title in titles:
+            ref = index.pop(title, None)
+            if ref is None:
+                continue
+            self._config.remove_option(section, ref.title_key)
+            self._config.remove_option(section, ref.content_key)
+            removed.append(title)
+
+        if not removed:
+            return 0
+
+        self._write_order(section)
+        for title in removed:
+            self._notify("snippet_removed", section, title)
+        return len(removed)
+
+    @_synchronized
+    def reorder_snippets(self, section, new_order):
+        """
+        Puts the titles of a section in the given order, only the order key is written.
+        Titles missing in new_order keep their relative order at the end.
+        """
+        self.refresh()
+        index = self._index(section)
+
+        ordered = [title for title in new_order if title in index]
+        ordered_set = set(ordered)
+        ordered += [title for title in index if title not in ordered_set]
+
+        self._indexes[section] = {title: index[title] for title in ordered}
+        self._write_order(section)
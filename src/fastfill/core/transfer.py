@@ -0,0 +1,189 @@
+# Import and export of titles as CSV, JSON Lines or FastFill config (INI) files.
+# An import reads one row (one section of a config file) at a time and hands the rows to
+# SnippetRepository.add_batch, which checks them as they are read and keeps them until the end of the file, then
+# dedupes them and adds them all in one step, so an import is added completely or not at all. The checked rows of
+# a file are held in memory until then. An export writes one title at a time into a temporary file, which replaces
+# the target file once it is complete.
+#
+# CSV and JSON Lines use the columns / keys "category", "title", "content" and "encrypted" (true / false).
+# Encrypted values are exported as they are stored, an import of them needs the password they were encrypted with.
+# Like the config itself, an INI file drops the indentation of the lines of a text, CSV and JSON Lines keep it.
+import configparser
+import csv
+import json
+import os
+
+from fastfill.core.persistence import atomic_file
+from fastfill.core.store import build_index, new_config_parser, write_config
+
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".ini": "ini"}
+COLUMNS = ["category", "title", "content", "encrypted"]
+TRUE_VALUES = {"1", "true", "yes", "y", "x"}
+CSV_FIELD_LIMIT = 2 ** 31 - 1  # the csv default of 128 KB is too small for long texts
+
+# Text encodings of the files. The config file uses the locale encoding like ConfigStore,
+# CSV files get a BOM so Excel opens them as UTF-8.
+ENCODINGS = {"csv": "utf-8-sig", "jsonl": "utf-8", "ini": None}
+
+
+class TransferError(Exception):
+    """
+    The file is not in the expected format. Nothing was imported.
+    """
+
+
+def format_of(path):
+    """
+    Returns the format of a file by its extension: "csv", "jsonl" or "ini".
+    """
+    file_format = FORMATS.get(os.path.splitext(str(path))[1].lower())
+    if file_format is None:
+        raise TransferError(f"Unknown file type {path}, use one of {', '.join(FORMATS)}")
+    return file_format
+
+
+def _text(value):
+    return None if value is None else str(value)
+
+
+def _flag(value):
+    if isinstance(value, bool):
+        return value
+    return str(value or "").strip().casefold() in TRUE_VALUES
+
+
+def read_csv(lines, default_section=None):
+    """
+    Yields (section, title, content, encrypted) for the rows of a CSV file with a header row.
+    Rows without a category are added to default_section.
+    """
+    csv.field_size_limit(CSV_FIELD_LIMIT)
+    reader = csv.DictReader(lines)
+    try:
+        if reader.fieldnames is None:
+            return  # empty file
+        reader.fieldnames = [name.strip().casefold() for name in reader.fieldnames]
+        if "title" not in reader.fieldnames:
+            raise TransferError(f"The CSV file has no title column, the header must be {','.join(COLUMNS)}")
+
+        for row in reader:
+            yield (_text(row.get("category")) or default_section, _text(row.get("title")),
+                   _text(row.get("content")), _flag(row.get("encrypted")))
+    except csv.Error as e:
+        raise TransferError(f"Line {reader.line_num}: {e}")
+
+
+def read_jsonl(lines, default_section=None):
+    """
+    Yields (section, title, content, encrypted) for the objects of a JSON Lines file, one object per line.
+    Objects without a category are added to default_section.
+    """
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            raise TransferError(f"Line {number}: {e}")
+        if not isinstance(row, dict):
+            raise TransferError(f"Line {number}: expected an object with the keys {', '.join(COLUMNS)}")
+
+        yield (_text(row.get("category")) or default_section, _text(row.get("title")), _text(row.get("content")),
+               _flag(row.get("encrypted")))
+
+
+def read_ini(lines):
+    """
+    Yields (section, title, content, encrypted) for the titles of a FastFill config file in display order.
+    Only one section is parsed at a time.
+    """
+    section_lines = []
+    for line in lines:
+        # A section header is never indented, indented lines continue the value above
+        if line.startswith("[") and section_lines and configparser.ConfigParser.SECTCRE.match(line):
+            yield from _read_ini_section(section_lines)
+            section_lines = []
+        section_lines.append(line)
+    yield from _read_ini_section(section_lines)
+
+
+def _read_ini_section(section_lines):
+    config = new_config_parser()
+    try:
+        config.read_string("".join(section_lines))
+    except configparser.Error as e:
+        raise TransferError(str(e))
+
+    for section in config.sections():
+        section_data = config[section]
+        index, _ = build_index(section_data)
+        for title, ref in index.items():
+            yield section, title, section_data.get(ref.content_key, ""), ref.encrypted
+
+
+def read_file(path, file_format=None, default_section=None):
+    """
+    Yields (section, title, content, encrypted) for every row of a file, see read_csv, read_jsonl and read_ini.
+    """
+    file_format = file_format or format_of(path)
+    newline = "" if file_format == "csv" else None  # the csv module handles line breaks in values itself
+    with open(path, encoding=ENCODINGS[file_format], newline=newline) as import_file:
+        if file_format == "csv":
+            yield from read_csv(import_file, default_section)
+        elif file_format == "jsonl":
+            yield from read_jsonl(import_file, default_section)
+        else:
+            yield from read_ini(import_file)
+
+
+def import_file(repository, path, file_format=None, on_duplicate="skip", default_section=None):
+    """
+    Imports a file into the categories of a SnippetRepository, see SnippetRepository.add_batch for on_duplicate.
+    Raises TransferError (and imports nothing) if the file is not in the expected format.
+    Returns the BatchResult.
+    """
+    try:
+        return repository.add_batch(read_file(path, file_format, default_section), on_duplicate)
+    except UnicodeDecodeError as e:
+        raise TransferError(f"The file is not a {ENCODINGS[file_format or format_of(path)] or 'text'} file: {e}")
+
+
+def _snippets(store, section):
+    for title, encrypted in store.titles(section):
+        yield title, store.get_content(section, title), encrypted
+
+
+def export_file(store, path, file_format=None, sections=None):
+    """
+    Writes the titles of `sections` (all categories if None) to a file in display order.
+    Returns the number of written titles.
+    """
+    file_format = file_format or format_of(path)
+    sections = store.sections() if sections is None else sections
+    count = 0
+
+    newline = "" if file_format == "csv" else None
+    with atomic_file(path, encoding=ENCODINGS[file_format], newline=newline) as export:
+        if file_format == "csv":
+            writer = csv.writer(export)
+            writer.writerow(COLUMNS)
+            for section in sections:
+                for title, content, encrypted in _snippets(store, section):
+                    writer.writerow((section, title, content, "true" if encrypted else "false"))
+                    count += 1
+        elif file_format == "jsonl":
+            for section in sections:
+                for title, content, encrypted in _snippets(store, section):
+                    export.write(json.dumps({"category": section, "title": title, "content": content,
+                                             "encrypted": encrypted}, ensure_ascii=False) + "\n")
+                    count += 1
+        else:
+            def section_snippets():
+                nonlocal count
+                for section in sections:
+                    snippets = list(_snippets(store, section))  # the order key needs the number of titles
+                    count += len(snippets)
+                    yield section, snippets
+            write_config(export, section_snippets())
+
+    return count
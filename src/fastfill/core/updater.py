@@ -0,0 +1,231 @@
+# Update check against version.json on GitHub.
+# The response is cached next to the config with its ETag / Last-Modified, so a launch within the TTL does not
+# touch the network at all and a later launch only asks whether the file changed (HTTP 304).
+# Every request has a strict timeout, a slow or dead network never delays the check for long.
+#
+# The installer download resumes an interrupted download with an HTTP Range request and
+# verifies the SHA-256 that version.json publishes as "installer_sha256" before the file may be run.
+#
+# requests is imported on first use, on the update thread, so importing it never delays the startup.
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+
+from fastfill.core.persistence import write_atomic
+
+VERSION_URL = "https://raw.githubusercontent.com/PaulK6803/FastFill/main/version.json"
+CACHE_TTL = 6 * 60 * 60  # seconds
+TIMEOUT = (3.05, 5)  # connect and read timeout in seconds
+
+INSTALLER_URL = "https://github.com/PaulK6803/FastFill/releases/latest/download/FastFillSetup.exe"
+RELEASES_URL = "https://github.com/PaulK6803/FastFill/releases"
+DOWNLOAD_TIMEOUT = (5, 30)
+MIN_CHUNK = 64 * 1024
+MAX_CHUNK = 4 * 1024 * 1024
+CHUNK_SECONDS = 0.25  # the chunk size is adapted so that one read takes about this long
+PROGRESS_INTERVAL = 0.1  # seconds between two progress reports
+RETRIES = 3  # resumed attempts after a broken connection
+
+
+class ChecksumError(Exception):
+    """
+    The downloaded installer does not match the published SHA-256.
+    """
+
+
+def read_cache(cache_path):
+    """
+    Returns the cached response as {"fetched": timestamp, "etag": ..., "last_modified": ..., "data": {...}} or None.
+    """
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as cache_file:
+            cache = json.load(cache_file)
+        if isinstance(cache, dict) and isinstance(cache.get("data"), dict):
+            return cache
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def write_cache(cache_path, cache):
+    try:
+        write_atomic(cache_path, json.dumps(cache))
+    except OSError as e:
+        logging.error(f"Could not write update cache: {e}")
+
+
+def fetch_version_info(cache_path, url=VERSION_URL, ttl=CACHE_TTL, timeout=TIMEOUT, now=time.time):
+    """
+    Returns the data of version.json. A cached response younger than ttl is used without a request,
+    an older one is revalidated with If-None-Match / If-Modified-Since.
+    If the request fails, the cached data is returned regardless of its age, or the error is raised if there is none.
+    """
+    cache = read_cache(cache_path)
+    if cache is not None and 0 <= now() - cache.get("fetched", 0) < ttl:
+        logging.info("Using cached version info")
+        return cache["data"]
+
+    import requests
+
+    headers = {}
+    if cache is not None:
+        if cache.get("etag"):
+            headers["If-None-Match"] = cache["etag"]
+        if cache.get("last_modified"):
+            headers["If-Modified-Since"] = cache["last_modified"]
+
+    try:
+        response = requests.get(url, headers=headers, timeout=timeout)
+
+        if response.status_code == 304 and cache is not None:
+            logging.info("Version info not modified")
+            cache["fetched"] = now()
+            write_cache(cache_path, cache)
+            return cache["data"]
+
+        response.raise_for_status()  # Ensure we catch HTTP errors
+        data = response.json()
+    except (requests.RequestException, ValueError) as e:
+        if cache is None:
+            raise
+        logging.warning(f"Update check failed, using cached version info: {e}")
+        return cache["data"]
+
+    write_cache(cache_path, {
+        "fetched": now(),
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "data": data,
+    })
+    return data
+
+
+def is_newer(latest_version, current_version):
+    """
+    Compares versions like "1.10.0" and "1.9.2" number by number.
+    """
+    def parse(version):
+        return tuple(int(part) if part.isdigit() else 0 for part in str(version).split("."))
+
+    try:
+        return parse(latest_version) > parse(current_version)
+    except Exception:
+        return str(latest_version) > str(current_version)
+
+
+def installer_sha256(data):
+    """
+    Returns the published SHA-256 of the installer from the version.json data, or None if it is missing or invalid.
+    """
+    checksum = str(data.get("installer_sha256") or "").strip().lower()
+    return checksum if re.fullmatch(r"[0-9a-f]{64}", checksum) else None
+
+
+def file_sha256(path):
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(MAX_CHUNK), b""):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+
+def download_installer(path, sha256, url=INSTALLER_URL, progress=None, is_cancelled=None,
+                       timeout=DOWNLOAD_TIMEOUT, retries=RETRIES):
+    """
+    Downloads the installer to path and returns path, or None if is_cancelled() became True.
+    The data goes to a ".part" file named after the checksum first, so a cancelled or broken download is
+    resumed by the next attempt (also after a restart) and a partial file of another version is never continued.
+    progress(received, total) is called at most every PROGRESS_INTERVAL seconds, total is 0 if unknown.
+    Raises ChecksumError if the finished file does not match sha256.
+    """
+    import requests
+    import urllib3
+
+    is_cancelled = is_cancelled or (lambda: False)
+
+    if os.path.exists(path) and file_sha256(path) == sha256:
+        logging.info("Installer already downloaded")
+        return path
+
+    part_path = f"{path}.{sha256[:16]}.part"
+    attempt = 0
+    while True:
+        try:
+            done = _download_part(url, part_path, progress, is_cancelled, timeout)
+            break
+        except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError,
+                urllib3.exceptions.HTTPError) as e:  # raw reads raise urllib3's errors
+            attempt += 1
+            if attempt > retries or is_cancelled():
+                raise
+            logging.warning(f"Download interrupted, resuming ({attempt}/{retries}): {e}")
+
+    if not done:
+        logging.info("Update download canceled.")
+        return None
+
+    if file_sha256(part_path) != sha256:
+        os.unlink(part_path)  # never resume a corrupt file
+        raise ChecksumError("The downloaded installer does not match the published SHA-256")
+
+    os.replace(part_path, path)
+    return path
+
+
+def _download_part(url, part_path, progress, is_cancelled, timeout):
+    """
+    Appends the missing bytes to part_path. Returns False if cancelled.
+    """
+    import requests
+
+    received = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    headers = {"Range": f"bytes={received}-", "Accept-Encoding": "identity"} if received else {}
+
+    with requests.get(url, headers=headers, stream=True, timeout=timeout) as response:
+        if received and response.status_code == 416:
+            return True  # the part file is already complete
+        response.raise_for_status()
+
+        if response.status_code == 206:
+            logging.info(f"Resuming download at {received} bytes")
+        elif received:
+            logging.info("Server does not support resuming, restarting download")
+            received = 0
+
+        length = int(response.headers.get("content-length", 0))
+        total = received + length if length else 0
+
+        chunk_size = MIN_CHUNK
+        last_report = 0
+        with open(part_path, 'ab' if received else 'wb') as file:
+            while True:
+                if is_cancelled():
+                    return False
+
+                started = time.monotonic()
+                chunk = response.raw.read(chunk_size)
+                if not chunk:
+                    break
+                file.write(chunk)
+                received += len(chunk)
+
+                # Large chunks on a fast connection, small ones on a slow one so that cancelling stays responsive
+                elapsed = time.monotonic() - started
+                if elapsed < CHUNK_SECONDS / 2:
+                    chunk_size = min(chunk_size * 2, MAX_CHUNK)
+                elif elapsed > CHUNK_SECONDS * 2:
+                    chunk_size = max(chunk_size // 2, MIN_CHUNK)
+
+                if progress is not None and time.monotonic() - last_report >= PROGRESS_INTERVAL:
+                    last_report = time.monotonic()
+                    progress(received, total)
+
+        if length and received < total:
+            raise requests.exceptions.ChunkedEncodingError(f"Connection closed after {received} of {total} bytes")
+
+    if progress is not None:
+        progress(received, total)
+    return True
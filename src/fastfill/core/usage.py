@@ -0,0 +1,217 @@
+# Usage statistics: how often and how recently every title was copied.
+# Every copy is one line appended to FastFillUsage.log. Copying only updates a dict and queues the line, the
+# append happens on a background thread (DebouncedWriter), which also compacts the log into one line per title
+# once it has much more lines than titles.
+#
+# The statistics order the titles of a category by "most used" or "recently used" and rank search results by
+# their frecency, a copy count where older copies count less (half after HALF_LIFE).
+import json
+import logging
+import math
+import threading
+import time
+
+from fastfill.core.persistence import DebouncedWriter, write_atomic
+
+HALF_LIFE = 14 * 24 * 3600  # seconds after which a copy counts half for the frecency
+COMPACT_MIN_LINES = 1000  # the log is compacted once it has this many lines and more than 4 per title
+
+# Orders of the titles in a category besides the order of the config
+MOST_USED = "used"
+RECENTLY_USED = "recent"
+
+
+def add_copy(frecency, when):
+    """
+    Returns the frecency after one more copy at `when`.
+
+    The frecency is kept as log2(score) + time / HALF_LIFE, where score is the sum of 2^(-age / HALF_LIFE) over
+    every copy. Decaying every score to the same time leaves their order unchanged, so two frecencies can be
+    compared at any time without updating them.
+    """
+    if frecency is None:
+        return when / HALF_LIFE
+    exponent = frecency - when / HALF_LIFE  # log2 of the score at `when`
+    if exponent > 0:
+        return frecency + math.log2(1 + 2 ** -exponent)
+    return math.log2(2 ** exponent + 1) + when / HALF_LIFE
+
+
+class UsageStats(object):
+    """
+    Copy count, time of the last copy and frecency of every (section, title) that was copied.
+    Follows renamed and removed titles when it listens to the store (store.add_listener(stats.on_store_changed)).
+    """
+
+    def __init__(self, path, save_delay=1.0):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stats = {}  # (section, title) -> [count, last used, frecency]
+        self._scores = None  # (section, title) -> frecency, built on request
+        self._pending = []  # log records not written yet
+        self._lines = 0  # lines in the log file
+        self._writer = DebouncedWriter(self._write, delay=save_delay, max_delay=5.0)
+        self._load()
+
+    def __len__(self):
+        return len(self._stats)
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as log_file:
+                lines = log_file.readlines()
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            logging.error(f"Error reading usage statistics: {e}")
+            return
+
+        skipped = 0
+        for line in lines:
+            try:
+                self._apply(json.loads(line))
+            except (ValueError, TypeError, IndexError):
+                skipped += 1  # e.g. the last line of a write that was cut off
+        if skipped:
+            logging.warning(f"Skipped {skipped} unreadable lines of {self.path}")
+        self._lines = len(lines)
+
+    def _apply(self, record):
+        """
+        Applies one log record: a copy, a snapshot of a title (compacted log), or a rename or removal.
+        """
+        kind = record[0]
+        if kind == "c":  # ["c", section, title, time]
+            _, section, title, when = record
+            entry = self._stats.get((section, title))
+            if entry is None:
+                self._stats[(section, title)] = [1, when, add_copy(None, when)]
+            else:
+                entry[:] = [entry[0] + 1, max(entry[1], when), add_copy(entry[2], when)]
+        elif kind == "s":  # ["s", section, title, count, last used, frecency]
+            _, section, title, count, last_used, frecency = record
+            self._stats[(section, title)] = [count, last_used, frecency]
+        elif kind == "m":  # ["m", section, old title, new title]
+            _, section, old_title, new_title = record
+            entry = self._stats.pop((section, old_title), None)
+            if entry is not None:
+                self._stats[(section, new_title)] = entry
+        elif kind == "d":  # ["d", section, title]
+            self._stats.pop((record[1], record[2]), None)
+        elif kind == "ms":  # ["ms", old section, new section]
+            _, old_section, new_section = record
+            for section, title in [key for key in self._stats if key[0] == old_section]:
+                self._stats[(new_section, title)] = self._stats.pop((section, title))
+        elif kind == "ds":  # ["ds", section]
+            for key in [key for key in self._stats if key[0] == record[1]]:
+                del self._stats[key]
+        else:
+            raise ValueError(f"Unknown usage record {kind!r}")
+        self._scores = None
+
+    def _log(self, record):
+        with self._lock:
+            self._apply(record)
+            self._pending.append(record)
+        # For every record, not only the first pending one: the records of a failed write stay pending and are only
+        # written by the next scheduled write
+        self._writer.schedule()
+
+    def record(self, section, title, when=None):
+        """
+        Records that a title was copied. Only updates memory, the log is written in the background.
+        """
+        self._log(["c", section, title, time.time() if when is None else when])
+
+    def count(self, section, title):
+        entry = self._stats.get((section, title))
+        return entry[0] if entry else 0
+
+    def last_used(self, section, title):
+        """
+        Returns the time.time() of the last copy, None if it was never copied.
+        """
+        entry = self._stats.get((section, title))
+        return entry[1] if entry else None
+
+    def frecency(self, section, title):
+        """
+        Returns the frecency (see add_copy), higher for titles copied often and recently. None if never copied.
+        """
+        entry = self._stats.get((section, title))
+        return entry[2] if entry else None
+
+    def scores(self):
+        """
+        Returns {(section, title): frecency} of every copied title, for the `boost` of the searches.
+        The dict is shared until the next change, it must not be modified.
+        """
+        with self._lock:
+            if self._scores is None:
+                self._scores = {key: entry[2] for key, entry in self._stats.items()}
+            return self._scores
+
+    def sort_key(self, order):
+        """
+        Returns a key(section, title) for sorting titles by MOST_USED or RECENTLY_USED. Titles that were never
+        copied get the same key, so a stable sort keeps them in the order of the config, after the others.
+        """
+        if order == MOST_USED:
+            return lambda section, title: -self.count(section, title)
+        if order == RECENTLY_USED:
+            return lambda section, title: -(self.last_used(section, title) or 0)
+        raise ValueError(f"Unknown order {order!r}")
+
+    def on_store_changed(self, event, *args):
+        """
+        Store listener, moves or drops the statistics of renamed and removed titles and categories.
+        """
+        if event == "snippet_renamed":
+            section, old_title, new_title = args
+            with self._lock:
+                known = (section, old_title) in self._stats
+            if known:
+                self._log(["m", section, old_title, new_title])
+        elif event == "snippet_removed":
+            with self._lock:
+                known = args in self._stats
+            if known:
+                self._log(["d", *args])
+        elif event == "section_renamed":
+            self._log(["ms", *args])
+        elif event == "section_removed":
+            self._log(["ds", *args])
+
+    def _write(self):
+        """
+        Appends the pending records to the log, or replaces the log with one line per title if it got long.
+        Called on the DebouncedWriter thread.
+        """
+        with self._lock:
+            records, self._pending = self._pending, []
+            compact = self._lines + len(records) > max(COMPACT_MIN_LINES, 4 * len(self._stats))
+            if compact:
+                snapshot = [["s", section, title, *entry] for (section, title), entry in self._stats.items()]
+
+        try:
+            if compact:
+                write_atomic(self.path, "".join(json.dumps(record) + "\n" for record in snapshot))
+                lines = len(snapshot)
+                logging.info(f"Compacted usage statistics to {lines} lines")
+            else:
+                with open(self.path, "a", encoding="utf-8") as log_file:
+                    log_file.write("".join(json.dumps(record) + "\n" for record in records))
+                lines = self._lines + len(records)
+        except Exception:
+            with self._lock:
+                self._pending[:0] = records  # written with the next try
+            raise
+
+        with self._lock:
+            self._lines = lines
+
+    def flush(self):
+        """
+        Writes pending records now, on exit.
+        """
+        self._writer.flush()
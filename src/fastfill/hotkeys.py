@@ -0,0 +1,171 @@
+# Global hotkey that opens the quick paste palette while another application has the focus.
+# The backend depends on the platform: on Windows the hotkey is registered with RegisterHotKey and arrives as a
+# WM_HOTKEY message in Qt's event loop. FakeHotkeyBackend is pressed from code, so the palette can be used and
+# tested on every platform.
+import logging
+import sys
+
+from PyQt5.QtCore import QAbstractNativeEventFilter, QCoreApplication, QObject, pyqtSignal
+
+DEFAULT_HOTKEY = "Ctrl+Shift+Space"
+MODIFIERS = {"ctrl": "Ctrl", "control": "Ctrl", "alt": "Alt", "shift": "Shift", "win": "Win", "meta": "Win"}
+NAMED_KEYS = {"space": "Space", "tab": "Tab", "insert": "Insert", "ins": "Insert", "home": "Home", "end": "End",
+              "pgup": "PgUp", "pageup": "PgUp", "pgdown": "PgDown", "pagedown": "PgDown"}
+
+
+def parse_hotkey(text):
+    """
+    Splits a hotkey like "ctrl+shift+space" into its modifiers and key, as (("Ctrl", "Shift"), "Space").
+    A hotkey needs at least one modifier, a single key would be taken from every other application.
+    Raises ValueError if the text is not a hotkey.
+    """
+    *modifier_names, key_name = [part.strip() for part in text.split("+")]
+    modifiers = set()
+    for name in modifier_names:
+        if name.casefold() not in MODIFIERS:
+            raise ValueError(f"Unknown modifier {name!r} in hotkey {text!r}")
+        modifiers.add(MODIFIERS[name.casefold()])
+    if not modifiers:
+        raise ValueError(f"Hotkey {text!r} needs a modifier (Ctrl, Alt, Shift or Win)")
+
+    if len(key_name) == 1 and key_name.isascii() and key_name.isalnum():
+        key = key_name.upper()
+    elif key_name.casefold() in NAMED_KEYS:
+        key = NAMED_KEYS[key_name.casefold()]
+    elif key_name[:1] in "Ff" and key_name[1:].isdigit() and 1 <= int(key_name[1:]) <= 24:
+        key = key_name.upper()
+    else:
+        raise ValueError(f"Unknown key {key_name!r} in hotkey {text!r}")
+
+    return tuple(name for name in ("Ctrl", "Alt", "Shift", "Win") if name in modifiers), key
+
+
+def format_hotkey(text):
+    """
+    Returns the hotkey in the form it is shown and saved in, e.g. "Ctrl+Shift+Space".
+    """
+    modifiers, key = parse_hotkey(text)
+    return "+".join(modifiers + (key,))
+
+
+class HotkeyBackend(QObject):
+    """
+    Base class of the hotkey backends, also used where there is no global hotkey: register() always fails.
+    `activated` is emitted on the GUI thread whenever the registered hotkey is pressed.
+    """
+
+    activated = pyqtSignal()
+    available = False
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.hotkey = None
+
+    def register(self, hotkey):
+        """
+        Registers the hotkey, replacing the previous one. Returns False if it could not be registered.
+        """
+        return False
+
+    def unregister(self):
+        self.hotkey = None
+
+
+class FakeHotkeyBackend(HotkeyBackend):
+    """
+    Backend without a real key source, press() acts like the hotkey was pressed.
+    """
+
+    available = True
+
+    def register(self, hotkey):
+        self.hotkey = format_hotkey(hotkey)
+        return True
+
+    def press(self, hotkey=None):
+        """
+        Presses `hotkey` (the registered one if None). Returns True if it was the registered hotkey.
+        """
+        if self.hotkey is None or (hotkey is not None and format_hotkey(hotkey) != self.hotkey):
+            return False
+        self.activated.emit()
+        return True
+
+
+class WindowsHotkeyBackend(HotkeyBackend):
+    """
+    Registers the hotkey for the GUI thread with RegisterHotKey, Windows then posts WM_HOTKEY to its message
+    queue, where a native event filter of the application picks it up.
+    """
+
+    available = True
+    HOTKEY_ID = 0xFF11
+    WM_HOTKEY = 0x0312
+    MOD_FLAGS = {"Alt": 0x1, "Ctrl": 0x2, "Shift": 0x4, "Win": 0x8}
+    MOD_NOREPEAT = 0x4000  # holding the keys down opens the palette only once
+    VIRTUAL_KEYS = {"Space": 0x20, "Tab": 0x09, "Insert": 0x2D, "Home": 0x24, "End": 0x23, "PgUp": 0x21,
+                    "PgDown": 0x22}
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        import ctypes  # only available like this on Windows
+        self.user32 = ctypes.windll.user32
+        self.event_filter = _WindowsHotkeyFilter(self)
+        QCoreApplication.instance().installNativeEventFilter(self.event_filter)
+
+    def register(self, hotkey):
+        self.unregister()
+        try:
+            modifiers, key = parse_hotkey(hotkey)
+        except ValueError as e:
+            logging.error(e)
+            return False
+
+        flags = self.MOD_NOREPEAT
+        for modifier in modifiers:
+            flags |= self.MOD_FLAGS[modifier]
+        if key in self.VIRTUAL_KEYS:
+            virtual_key = self.VIRTUAL_KEYS[key]
+        elif len(key) == 1:
+            virtual_key = ord(key)  # the virtual key codes of A-Z and 0-9 are their ASCII codes
+        else:
+            virtual_key = 0x6F + int(key[1:])  # F1 is 0x70
+
+        if not self.user32.RegisterHotKey(None, self.HOTKEY_ID, flags, virtual_key):
+            logging.warning(f"Hotkey {hotkey} could not be registered, it is probably used by another application")
+            return False
+
+        self.hotkey = "+".join(modifiers + (key,))
+        return True
+
+    def unregister(self):
+        if self.hotkey is not None:
+            self.user32.UnregisterHotKey(None, self.HOTKEY_ID)
+        self.hotkey = None
+
+
+class _WindowsHotkeyFilter(QAbstractNativeEventFilter):
+    def __init__(self, backend):
+        super().__init__()
+        self.backend = backend
+
+    def nativeEventFilter(self, event_type, message):
+        if event_type == b"windows_generic_MSG":
+            from ctypes import wintypes
+            msg = wintypes.MSG.from_address(int(message))
+            if msg.message == WindowsHotkeyBackend.WM_HOTKEY and msg.wParam == WindowsHotkeyBackend.HOTKEY_ID:
+                self.backend.activated.emit()
+                return True, 0
+        return False, 0
+
+
+def create_hotkey_backend(parent=None):
+    """
+    Returns the backend for this platform, a HotkeyBackend that registers nothing if there is none.
+    """
+    if sys.platform == "win32":
+        try:
+            return WindowsHotkeyBackend(parent)
+        except Exception as e:
+            logging.error(f"Global hotkeys are not available: {e}")
+    return HotkeyBackend(parent)
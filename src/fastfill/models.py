@@ -0,0 +1,421 @@
+# Qt list models for the categories and titles shown in the main window.
+# The models read directly from the in-memory ConfigStore instead of creating one QListWidgetItem per entry,
+# so the list views only ask for the rows that are actually visible.
+# The titles of a category are fetched in pages (canFetchMore / fetchMore): the view lays out every row it
+# knows of, which takes long for categories with tens of thousands of titles.
+from PyQt5.QtCore import QAbstractListModel, QByteArray, QDataStream, QIODevice, QMimeData, QModelIndex, QSize, Qt, \
+    QTimer
+from PyQt5.QtGui import QBrush, QColor
+
+# Mime type used to drag rows within the same list
+ROWS_MIME_TYPE = "application/x-fastfill-rows"
+
+PAGE_SIZE = 100  # titles fetched when a category is opened or its list is scrolled to the end
+IDLE_FETCH_MS = 50  # the other titles are fetched page by page starting this long after the first page was painted
+
+
+class ReorderableListModel(QAbstractListModel):
+    """
+    Base model for a list of rows that can be reordered with drag & drop (InternalMove).
+    A reorder is done with moveRows, so views and the rowsMoved signal see a real move.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemIsDropEnabled  # dropping between rows
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsDragEnabled
+
+    def supportedDropActions(self):
+        return Qt.MoveAction
+
+    def mimeTypes(self):
+        return [ROWS_MIME_TYPE]
+
+    def mimeData(self, indexes):
+        encoded = QByteArray()
+        stream = QDataStream(encoded, QIODevice.WriteOnly)
+        for row in sorted({index.row() for index in indexes if index.isValid()}):
+            stream.writeInt32(row)
+
+        mime_data = QMimeData()
+        mime_data.setData(ROWS_MIME_TYPE, encoded)
+        return mime_data
+
+    def dropMimeData(self, data, action, row, column, parent):
+        """
+        Moves the dragged rows to the drop position. Used by views that do not call moveRows themselves.
+        """
+        if action != Qt.MoveAction or not data.hasFormat(ROWS_MIME_TYPE):
+            return False
+
+        if row == -1:
+            row = parent.row() if parent.isValid() else len(self._rows)
+
+        encoded = data.data(ROWS_MIME_TYPE)  # keep a reference, the stream does not own the byte array
+        stream = QDataStream(encoded, QIODevice.ReadOnly)
+        rows = []
+        while not stream.atEnd():
+            rows.append(stream.readInt32())
+
+        # The lists only allow a single selection, so exactly one row is dragged
+        if len(rows) == 1:
+            self.moveRows(QModelIndex(), rows[0], 1, QModelIndex(), row)
+
+        # The row is already moved, returning False keeps the view from removing the source row
+        return False
+
+    def moveRows(self, source_parent, source_row, count, destination_parent, destination_child):
+        if source_parent.isValid() or destination_parent.isValid() or count < 1:
+            return False
+        if source_row < 0 or source_row + count > len(self._rows):
+            return False
+        if source_row <= destination_child <= source_row + count:
+            return False  # moving onto itself
+
+        if not self.beginMoveRows(QModelIndex(), source_row, source_row + count - 1, QModelIndex(), destination_child):
+            return False
+
+        moved = self._rows[source_row:source_row + count]
+        del self._rows[source_row:source_row + count]
+        if destination_child > source_row:
+            destination_child -= count
+        self._rows[destination_child:destination_child] = moved
+        # Only the rows between the old and the new position changed
+        self._index_rows(min(source_row, destination_child), max(source_row + count, destination_child + count))
+
+        self.endMoveRows()
+        return True
+
+    def _index_rows(self, start, stop=None):
+        """
+        Called when the rows start to stop (to the end if None) changed, for subclasses that index them.
+        """
+
+
+class CategoryListModel(ReorderableListModel):
+    """
+    Categories (config sections) in the sidebar. The current category is highlighted.
+    """
+
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self._current = None
+
+        self._size_hint = QSize(0, 40)
+        self._current_brush = QBrush(QColor("orange"))
+        self._default_brush = QBrush(QColor("#4c4c4c"))
+        self._text_color = QColor("white")
+
+    def refresh(self):
+        """
+        Reloads the categories from the store.
+        """
+        self.beginResetModel()
+        self._rows = self.store.sections()
+        self.endResetModel()
+
+    def categories(self):
+        return list(self._rows)
+
+    def category(self, row):
+        return self._rows[row]
+
+    def row_of(self, category):
+        try:
+            return self._rows.index(category)
+        except ValueError:
+            return -1
+
+    def set_current(self, category):
+        """
+        Highlights a category, only the rows that change color are repainted.
+        """
+        old_row = self.row_of(self._current) if self._current is not None else -1
+        self._current = category
+        for row in (old_row, self.row_of(category)):
+            if row >= 0:
+                index = self.index(row)
+                self.dataChanged.emit(index, index, [Qt.BackgroundRole])
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        category = self._rows[index.row()]
+
+        if role == Qt.DisplayRole:
+            return category
+        if role == Qt.BackgroundRole:
+            return self._current_brush if category == self._current else self._default_brush
+        if role == Qt.ForegroundRole:
+            return self._text_color
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        if role == Qt.SizeHintRole:
+            return self._size_hint
+        return None
+
+
+class SnippetListModel(ReorderableListModel):
+    """
+    Titles of the current category. Encrypted titles are shown with a lock,
+    titles that are being encrypted or decrypted in the background with an hourglass.
+    The titles are in the order of the config, or sorted by a sort key (see set_sort_key), then they can't be dragged.
+
+    Opening a category only reads its first PAGE_SIZE titles. The view fetches the next page when it is scrolled
+    to the end, the other titles are fetched a page at a time from IDLE_FETCH_MS on, one page per pass of the event
+    loop so painting and input are handled in between. The rows (row numbers, rowCount) are the fetched titles,
+    titles() and find_row() include the others.
+    """
+
+    TitleRole = Qt.UserRole + 1  # title without the lock
+    EncryptedRole = Qt.UserRole + 2
+    BusyRole = Qt.UserRole + 3
+
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.section = None
+        self.sort_key = None  # key(section, title), e.g. UsageStats.sort_key
+        self._busy = set()  # (section, title) with a running crypto task, kept when the category changes
+        # Sorted titles that are not fetched yet. Without a sort key, they are read from the store when fetched:
+        # the fetched rows are always its first titles, so the next page starts at len(self._rows).
+        self._pending = None
+        self._row_of = {}  # title -> row of every fetched title, kept up to date with self._rows
+
+        self._fetch_timer = QTimer(self)
+        self._fetch_timer.setSingleShot(True)
+        self._fetch_timer.timeout.connect(self._fetch_next_page)
+
+        self._size_hint = QSize(100, 35)
+        self._busy_color = QColor("#888888")
+
+    def set_section(self, section):
+        """
+        Shows the titles of another category, the first page at once.
+        """
+        self.beginResetModel()
+        self.section = section
+        if section is None:
+            self._rows, self._pending = [], None
+        elif self.sort_key is None:
+            self._rows, self._pending = self.store.titles(section, 0, PAGE_SIZE), None
+        else:
+            rows = self.sorted_rows(self.store.titles(section))  # sorting needs all of them
+            self._rows, self._pending = rows[:PAGE_SIZE], rows[PAGE_SIZE:]
+        self._row_of = {}
+        self._index_rows(0)
+        self.endResetModel()
+
+        if self.canFetchMore():
+            self._fetch_timer.start(IDLE_FETCH_MS)
+        else:
+            self._fetch_timer.stop()
+
+    def clear(self):
+        self.set_section(None)
+
+    def set_sort_key(self, sort_key):
+        """
+        Shows the titles sorted by sort_key(section, title), or in the order of the config with None.
+        Titles that are added later are appended, the list is sorted again when a category is opened.
+        """
+        self.sort_key = sort_key
+        self.set_section(self.section)
+
+    def sorted_rows(self, rows):
+        """
+        Returns the (title, encrypted) rows of the current category in the order they are shown.
+        """
+        if self.sort_key is None:
+            return rows
+        section = self.section
+        return sorted(rows, key=lambda row: self.sort_key(section, row[0]))
+
+    def _index_rows(self, start, stop=None):
+        """
+        Updates the row of the titles in the rows start to stop (to the end if None) in self._row_of.
+        """
+        for row in range(start, len(self._rows) if stop is None else stop):
+            self._row_of[self._rows[row][0]] = row
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if self.sort_key is not None:
+            flags &= ~(Qt.ItemIsDragEnabled | Qt.ItemIsDropEnabled)  # the order is not the one of the config
+        return flags
+
+    # Paging
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.section is None:
+            return False
+        if self._pending is not None:
+            return bool(self._pending)
+        # The count comes from the title index, the view asks this often
+        return self.store.has_section(self.section) and len(self._rows) < self.store.title_count(self.section)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not parent.isValid():
+            self._fetch(PAGE_SIZE)
+
+    def _fetch_next_page(self):
+        """
+        Fetches the next page in the background, the following one once the event loop is idle again.
+        """
+        self._fetch(PAGE_SIZE)
+        if self.canFetchMore():
+            self._fetch_timer.start(0)
+
+    def fetch_all(self):
+        """
+        Fetches every title that is not fetched yet.
+        """
+        self._fetch(None)
+
+    def _unfetched(self, count=None):
+        """
+        Returns the next `count` (all if None) rows that are not fetched yet.
+        """
+        if self._pending is not None:
+            return self._pending[:count]
+        start = len(self._rows)
+        return self.store.titles(self.section, start, None if count is None else start + count)
+
+    def _fetch(self, count):
+        if not self.canFetchMore():
+            return
+        rows = self._unfetched(count)
+        if not rows:
+            return
+
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self._rows += rows
+        self._index_rows(first)
+        if self._pending is not None:
+            del self._pending[:len(rows)]
+        self.endInsertRows()
+
+    def titles(self):
+        """
+        Returns the titles in the order they are shown, including the ones that are not fetched yet.
+        """
+        rows = self._rows + self._unfetched() if self.canFetchMore() else self._rows
+        return [title for title, _ in rows]
+
+    def title(self, row):
+        return self._rows[row][0]
+
+    def row_of(self, title):
+        """
+        Returns the row of a fetched title, -1 if it was not fetched (see find_row).
+        """
+        return self._row_of.get(title, -1)
+
+    def find_row(self, title):
+        """
+        Returns the row of a title and fetches the titles up to it if needed. -1 if it is not in the category.
+        """
+        row = self.row_of(title)
+        if row >= 0 or not self.canFetchMore():
+            return row
+        for offset, (unfetched_title, _) in enumerate(self._unfetched()):
+            if unfetched_title == title:
+                self._fetch(offset + 1)
+                return len(self._rows) - 1
+        return -1
+
+    def set_busy(self, section, title, busy):
+        """
+        Shows or hides the busy state of a title. The title does not have to be in the current category.
+        """
+        if busy:
+            self._busy.add((section, title))
+        else:
+            self._busy.discard((section, title))
+
+        row = self.row_of(title) if section == self.section else -1
+        if row >= 0:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.ForegroundRole, self.BusyRole])
+
+    def is_busy(self, row):
+        return (self.section, self._rows[row][0]) in self._busy
+
+    def is_encrypted(self, row):
+        return self._rows[row][1]
+
+    def append_title(self, title, encrypted=False):
+        """
+        Shows a title at the end of the list. The titles that were not fetched yet are fetched first,
+        if the title was already added to the store it is one of them.
+        """
+        if self.canFetchMore():
+            self.fetch_all()
+            row = self.row_of(title)
+            if row >= 0:
+                return row
+
+        row = len(self._rows)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._rows.append((title, encrypted))
+        self._row_of[title] = row
+        self.endInsertRows()
+        return row
+
+    def rename_title(self, row, new_title):
+        self._row_of.pop(self._rows[row][0], None)
+        self._rows[row] = (new_title, self._rows[row][1])
+        self._row_of[new_title] = row
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole])
+
+    def set_encrypted(self, row, encrypted):
+        if self._rows[row][1] != encrypted:
+            self._rows[row] = (self._rows[row][0], encrypted)
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.DisplayRole, self.EncryptedRole])
+
+    def remove_title(self, row):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self._row_of.pop(self._rows[row][0], None)
+        del self._rows[row]
+        self._index_rows(row)  # the rows below moved up
+        self.endRemoveRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        title, encrypted = self._rows[index.row()]
+
+        if role == Qt.DisplayRole:
+            if self._busy and (self.section, title) in self._busy:
+                return title + " ⏳"
+            return title + " 🔒" if encrypted else title
+        if role == Qt.ForegroundRole:
+            if self._busy and (self.section, title) in self._busy:
+                return self._busy_color
+            return None
+        if role == self.TitleRole:
+            return title
+        if role == self.EncryptedRole:
+            return encrypted
+        if role == self.BusyRole:
+            return (self.section, title) in self._busy
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        if role == Qt.SizeHintRole:
+            return self._size_hint
+        return None
@@ -0,0 +1,51 @@
+# Performance overlay for the main window.
+# Shows the calls, p50 and p99 of every instrumented function in the last minute (see fastfill.core.instrumentation).
+# Only created when instrumentation is enabled, toggled with Ctrl+Shift+P.
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QFont
+from PyQt5.QtWidgets import QLabel
+
+from fastfill.core import instrumentation
+
+
+class PerfOverlay(QLabel):
+    """
+    Small semi-transparent label in the bottom left corner of its parent, refreshed every second.
+    It does not take mouse clicks, the widgets below it stay usable.
+    """
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setTextFormat(Qt.PlainText)
+        self.setFont(QFont("Consolas", 8))
+        self.setStyleSheet("background-color: rgba(0, 0, 0, 170); color: #ffffff; padding: 4px; border-radius: 4px;")
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(1000)
+        self.timer.timeout.connect(self.refresh)
+        self.hide()
+
+    def set_visible(self, visible):
+        if visible:
+            self.refresh()
+            self.show()
+            self.raise_()
+            self.timer.start()
+        else:
+            self.timer.stop()
+            self.hide()
+
+    def toggle(self):
+        self.set_visible(not self.isVisible())
+
+    def refresh(self):
+        lines = [f"{'last minute':<22}{'calls':>6}{'p50 ms':>9}{'p99 ms':>9}"]
+        for name, (calls, p50, p99) in sorted(instrumentation.recent().items()):
+            lines.append(f"{name[:22]:<22}{calls:>6}{p50 * 1000:>9.2f}{p99 * 1000:>9.2f}")
+        if len(lines) == 1:
+            lines.append("no calls")
+
+        self.setText("\n".join(lines))
+        self.adjustSize()
+        self.move(8, self.parentWidget().height() - self.height() - 8)
@@ -0,0 +1,125 @@
+# Quick paste palette: a small search window opened with the global hotkey (see fastfill.hotkeys).
+# Typing filters the titles of all categories through the TitleIndex, Enter copies the selected one.
+# The palette is created hidden at the start and only shown and hidden again, so opening it builds nothing.
+from PyQt5.QtCore import QCoreApplication, QEvent, Qt, QTimer, pyqtSignal
+from PyQt5.QtGui import QCursor, QFont
+from PyQt5.QtWidgets import QApplication, QFrame, QLineEdit, QListWidget, QListWidgetItem, QVBoxLayout, QWidget
+
+MAX_RESULTS = 12  # shown without scrolling
+
+
+class QuickPastePalette(QWidget):
+    """
+    Frameless window on top of every other window, in the middle of the screen with the mouse cursor.
+    Emits `chosen` with the section and title of the selected result and hides when it loses the focus.
+    `boost` returns the scores that move titles up in the results (e.g. UsageStats.scores), see TitleIndex.search.
+    """
+
+    chosen = pyqtSignal(str, str)
+
+    def __init__(self, title_index, boost=None, parent=None):
+        super().__init__(parent, Qt.Tool | Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
+        self.title_index = title_index
+        self.boost = boost
+        self.setObjectName("QuickPastePalette")
+        self.setFixedWidth(520)
+
+        frame = QFrame(self)
+        frame.setStyleSheet("QFrame { background-color: #2c2c2e; border: 1px solid #48484a; border-radius: 8px; }")
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(frame)
+        frame_layout = QVBoxLayout(frame)
+        frame_layout.setContentsMargins(8, 8, 8, 8)
+        frame_layout.setSpacing(6)
+
+        font = QFont()
+        font.setPointSize(11)
+
+        self.lineEdit = QLineEdit(frame)
+        self.lineEdit.setFont(font)
+        self.lineEdit.setPlaceholderText(QCoreApplication.translate("QuickPastePalette", "Copy a text..."))
+        self.lineEdit.setStyleSheet("QLineEdit { color: white; background-color: #3a3a3c; border: 0px; "
+                                    "border-radius: 4px; padding: 6px; }")
+        self.lineEdit.textChanged.connect(self.update_results)
+        self.lineEdit.installEventFilter(self)
+        frame_layout.addWidget(self.lineEdit)
+
+        self.listWidget = QListWidget(frame)
+        self.listWidget.setFont(font)
+        self.listWidget.setUniformItemSizes(True)
+        self.listWidget.setFocusPolicy(Qt.NoFocus)  # the keys go to the line edit, see eventFilter
+        self.listWidget.setStyleSheet("QListWidget { color: white; background-color: transparent; border: 0px; }"
+                                      "QListWidget::item { padding: 4px; }"
+                                      "QListWidget::item:selected { background-color: #0a84ff; "
+                                      "border-radius: 4px; }")
+        self.listWidget.itemClicked.connect(self.choose)
+        frame_layout.addWidget(self.listWidget)
+
+    def open(self):
+        """
+        Shows the palette with an empty query, or brings it to the front if it is open.
+        """
+        self.lineEdit.clear()
+        self.update_results("")
+
+        screen = QApplication.screenAt(QCursor.pos()) or QApplication.primaryScreen()
+        area = screen.availableGeometry()
+        self.adjustSize()
+        self.move(area.center().x() - self.width() // 2, area.top() + area.height() // 4)
+
+        self.show()
+        self.raise_()
+        self.activateWindow()
+        self.lineEdit.setFocus()
+
+    def update_results(self, text):
+        self.listWidget.clear()
+        if not self.title_index.ready:
+            item = QListWidgetItem(QCoreApplication.translate("QuickPastePalette", "Preparing the search..."))
+            item.setFlags(Qt.NoItemFlags)
+            self.listWidget.addItem(item)
+            # Search again once the index is built, unless the text was changed in the meantime
+            QTimer.singleShot(200, lambda: self.isVisible() and text == self.lineEdit.text()
+                              and self.update_results(text))
+        else:
+            boost = self.boost() if self.boost is not None else None
+            for result in self.title_index.search(text, limit=MAX_RESULTS, boost=boost):
+                item = QListWidgetItem(f"{result.title}  ({result.section})")
+                item.setData(Qt.UserRole, (result.section, result.title))
+                self.listWidget.addItem(item)
+            self.listWidget.setCurrentRow(0)
+
+        rows = max(1, self.listWidget.count())
+        self.listWidget.setFixedHeight(rows * self.listWidget.sizeHintForRow(0) + 2 * self.listWidget.frameWidth())
+        self.adjustSize()
+
+    def choose(self, item=None):
+        item = item or self.listWidget.currentItem()
+        if item is None or item.data(Qt.UserRole) is None:
+            return
+        self.hide()
+        self.chosen.emit(*item.data(Qt.UserRole))
+
+    def eventFilter(self, watched, event):
+        if watched is self.lineEdit and event.type() == QEvent.KeyPress:
+            key = event.key()
+            if key in (Qt.Key_Up, Qt.Key_Down):
+                step = -1 if key == Qt.Key_Up else 1
+                row = self.listWidget.currentRow() + step
+                if 0 <= row < self.listWidget.count():
+                    self.listWidget.setCurrentRow(row)
+                return True
+            if key in (Qt.Key_Return, Qt.Key_Enter):
+                self.choose()
+                return True
+            if key == Qt.Key_Escape:
+                self.hide()
+                return True
+        return super().eventFilter(watched, event)
+
+    def changeEvent(self, event):
+        # Clicking into another window closes the palette, like a menu
+        if event.type() == QEvent.ActivationChange and not self.isActiveWindow():
+            self.hide()
+        super().changeEvent(event)
@@ -0,0 +1,86 @@
+# Watches the config file for changes made outside of FastFill (sync tools, scripts, a text editor).
+# A change is picked up right away instead of the next time a handler happens to read the config: the store
+# reloads it and reports which categories and titles changed, so the main window only updates those rows.
+# The SQLite and packed stores are checked for changes of another FastFill on a timer instead (StoreRefresher).
+import os
+
+from PyQt5.QtCore import QFileSystemWatcher, QObject, QTimer, pyqtSignal
+
+
+class ConfigWatcher(QObject):
+    """
+    Calls store.refresh() shortly after the file at store.path was changed, and passes the changes the store
+    found on to the GUI thread. A ConfigStore does not reload on reads, so this watcher is how external edits of
+    the file get in. The changes of a merge in the background writer (see ConfigStore._write) reach the GUI
+    through the same signal.
+    """
+
+    changed = pyqtSignal(object)  # [(event, *args)] as sent by the store, or [("reloaded",)]
+    conflict = pyqtSignal(object, object)  # path of the conflict copy (or None), [(section, title)]
+
+    def __init__(self, store, delay_ms=200, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.path = str(store.path)
+
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self._schedule)
+        # The file is replaced on every write, which removes it from the watcher. Changes of the directory
+        # show when it is back.
+        self.watcher.directoryChanged.connect(self._schedule)
+        self.watcher.addPath(self.path)
+        self.watcher.addPath(os.path.dirname(os.path.abspath(self.path)))
+
+        # Editors and sync tools write in several steps, wait until they are done
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay_ms)
+        self.timer.timeout.connect(self.check)
+
+        store.add_listener(self._on_store_changed)
+
+    def _schedule(self, path=None):
+        self.timer.start()
+
+    def check(self):
+        """
+        Watches the file again if it was replaced and lets the store reload it if it changed.
+        """
+        if self.path not in self.watcher.files():
+            self.watcher.addPath(self.path)
+        self.store.refresh()
+
+    def _on_store_changed(self, event, *args):
+        # Called on the thread that made the change, the signals are queued to the GUI thread if needed
+        if event == "external_changes":
+            self.changed.emit(args[0])
+        elif event == "reloaded":
+            self.changed.emit([("reloaded",)])
+        elif event == "conflict":
+            self.conflict.emit(*args)
+
+
+class StoreRefresher(QObject):
+    """
+    Calls store.refresh() every interval_ms for the SQLite and packed stores, which do not reload on reads
+    either, so a change another FastFill made to the database or index shows up. A reload is passed on to the
+    GUI thread as [("reloaded",)], like ConfigWatcher.changed.
+    """
+
+    changed = pyqtSignal(object)
+
+    def __init__(self, store, interval_ms=2000, parent=None):
+        super().__init__(parent)
+        self.store = store
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.store.refresh)
+        self.timer.start()
+
+        store.add_listener(self._on_store_changed)
+
+    def _on_store_changed(self, event, *args):
+        # Also called for a refresh before a change on a worker thread, the signal is queued to the GUI thread then
+        if event == "reloaded":
+            self.changed.emit([("reloaded",)])
@@ -0,0 +1,212 @@
+# Background workers for the main window.
+# Deriving a key takes about 100 ms on purpose, so encrypting and decrypting runs on a thread pool
+# instead of the GUI thread, and the update check and download never wait for the network on the GUI thread.
+# Results are delivered back to the GUI thread through Qt signals.
+import itertools
+import logging
+import threading
+
+from PyQt5.QtCore import QObject, QRunnable, QThread, QThreadPool, pyqtSignal
+
+from fastfill.core import crypto, rotation, updater
+
+
+class _Task(QRunnable):
+    """
+    Runs one function on the thread pool and reports its result through the worker's signal.
+    """
+
+    def __init__(self, worker, task_id, function, args):
+        super().__init__()
+        self.worker = worker
+        self.task_id = task_id
+        self.function = function
+        self.args = args
+
+    def run(self):
+        if self.worker.is_cancelled(self.task_id):
+            self.worker._done.emit(self.task_id, None, "")  # cancelled before it was started
+            return
+
+        try:
+            result, error = self.function(*self.args), ""
+        except Exception as e:
+            logging.error(f"Error in crypto task: {e}")
+            result, error = None, str(e)
+
+        self.worker._done.emit(self.task_id, result, error)
+
+
+class CryptoWorker(QObject):
+    """
+    Runs crypto functions on a QThreadPool. Every call returns a task id at once, the result is passed to
+    the on_done callback (and the finished signal) on the GUI thread.
+
+    A cancelled task does not call on_done. A running key derivation cannot be interrupted,
+    its result is dropped when it is done.
+    """
+
+    finished = pyqtSignal(int, object)  # task id, result (None if decrypting failed, e.g. wrong password)
+    failed = pyqtSignal(int, str)  # task id, error message
+    cancelled = pyqtSignal(int)  # task id
+    progress = pyqtSignal(int, int, int)  # task id, done steps, total steps (long running tasks only)
+
+    _done = pyqtSignal(int, object, str)  # emitted on the pool thread, queued to the GUI thread
+
+    def __init__(self, max_threads=None, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads or max(1, min(4, QThread.idealThreadCount())))
+
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()  # guards the cancelled ids, they are read on the pool threads
+        self._callbacks = {}  # task id -> on_done
+        self._cancelled = set()
+
+        self._done.connect(self._on_done)
+
+    def submit(self, function, *args, on_done=None):
+        """
+        Runs function(*args) in the background and returns the task id.
+        """
+        return self._start(next(self._ids), function, args, on_done)
+
+    def _start(self, task_id, function, args, on_done):
+        self._callbacks[task_id] = on_done
+        self.pool.start(_Task(self, task_id, function, args))
+        return task_id
+
+    def encrypt(self, password, plaintext, key_cache=None, params=crypto.DEFAULT_PARAMS, on_done=None):
+        return self.submit(crypto.encrypt_data, password, plaintext, key_cache, params, on_done=on_done)
+
+    def decrypt(self, password, encrypted_data, key_cache=None, on_done=None):
+        return self.submit(crypto.decrypt_data, password, encrypted_data, key_cache, on_done=on_done)
+
+    def rotate_password(self, entries, old_password, new_password, params=crypto.DEFAULT_PARAMS, on_done=None):
+        """
+        Re-encrypts many values with a new password, see rotation.rotate_password.
+        Reports its progress with the progress signal and stops early when it is cancelled.
+        """
+        task_id = next(self._ids)
+
+        def report(done, total):
+            self.progress.emit(task_id, done, total)
+
+        def is_cancelled():
+            return self.is_cancelled(task_id)
+
+        return self._start(task_id, rotation.rotate_password,
+                           (entries, old_password, new_password, params, report, is_cancelled), on_done)
+
+    def is_pending(self, task_id):
+        return task_id in self._callbacks
+
+    def is_cancelled(self, task_id):
+        with self._lock:
+            return task_id in self._cancelled
+
+    def cancel(self, task_id):
+        """
+        Cancels a task. Returns False if it is already done.
+        """
+        if task_id not in self._callbacks:
+            return False
+        with self._lock:
+            self._cancelled.add(task_id)
+        return True
+
+    def cancel_all(self):
+        for task_id in list(self._callbacks):
+            self.cancel(task_id)
+
+    def wait(self, msecs=-1):
+        """
+        Waits until all started tasks are done, e.g. before the application exits.
+        """
+        return self.pool.waitForDone(msecs)
+
+    def _on_done(self, task_id, result, error):
+        on_done = self._callbacks.pop(task_id, None)
+        with self._lock:
+            was_cancelled = task_id in self._cancelled
+            self._cancelled.discard(task_id)
+
+        if was_cancelled:
+            self.cancelled.emit(task_id)
+            return
+
+        if error:
+            self.failed.emit(task_id, error)
+        else:
+            self.finished.emit(task_id, result)
+
+        if on_done is not None:
+            on_done(result)
+
+
+class UpdateCheckWorker(QObject):
+    """
+    Fetches version.json on a background thread and reports the data with the finished signal
+    (None if the check failed). The thread is a daemon, a hanging request never keeps FastFill from exiting.
+    """
+
+    finished = pyqtSignal(object)
+
+    def __init__(self, cache_path, parent=None):
+        super().__init__(parent)
+        self.cache_path = cache_path
+
+    def start(self):
+        threading.Thread(target=self._run, name="UpdateCheck", daemon=True).start()
+
+    def _run(self):
+        try:
+            data = updater.fetch_version_info(self.cache_path)
+        except Exception as e:
+            logging.error(f"Update check failed: {e}")
+            data = None
+        self.finished.emit(data)
+
+
+class UpdateDownloadWorker(QObject):
+    """
+    Downloads the installer on a background thread, see updater.download_installer.
+    Exactly one of finished, failed and cancelled is emitted at the end.
+    """
+
+    progress = pyqtSignal('qint64', 'qint64')  # received bytes, total bytes (0 if unknown)
+    finished = pyqtSignal(str)  # path of the verified installer
+    failed = pyqtSignal(str, bool)  # error message, True if the checksum did not match
+    cancelled = pyqtSignal()
+
+    def __init__(self, path, sha256, url=updater.INSTALLER_URL, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.sha256 = sha256
+        self.url = url
+        self._cancel = threading.Event()
+
+    def start(self):
+        # A daemon thread, exiting in the middle of a download is fine: the next attempt resumes it
+        threading.Thread(target=self._run, name="UpdateDownload", daemon=True).start()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def _run(self):
+        try:
+            path = updater.download_installer(self.path, self.sha256, self.url,
+                                              progress=self.progress.emit, is_cancelled=self._cancel.is_set)
+        except updater.ChecksumError as e:
+            logging.error(e)
+            self.failed.emit(str(e), True)
+            return
+        except Exception as e:
+            logging.error(f"Failed to download update: {e}")
+            self.failed.emit(str(e), False)
+            return
+
+        if path is None:
+            self.cancelled.emit()
+        else:
+            self.finished.emit(path)
@@ -1,45 +1,63 @@
 # FastFill is a Windows application built using Python and PyQt5,
 # designed to easily manage and copy frequently used texts - such as emails, templates, and more.
 # It allows you to easily copy these texts to your clipboard for fast and efficient pasting, saving you time and effort.
+#
+# FastFill starts with Windows, so only what the window and the tray icon need is imported here.
+# requests, cryptography, pyqttoast, win32com and webbrowser are imported on first use.
+import time
+started = time.perf_counter()
+
+import atexit
 import subprocess
 import tempfile
-import webbrowser
-import winreg
 
-from plyer import notification
 from pathlib import Path
 import configparser
 import os
 import sys
-import win32com.client
-
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-from cryptography.hazmat.backends import default_backend
-import base64
 
-from PyQt5.QtGui import QBrush, QColor, QIcon
-from PyQt5.QtCore import QTimer, Qt, QSize, QPoint, QCoreApplication, QTranslator, QSettings, QPropertyAnimation, \
-    QEasingCurve
+from PyQt5.QtGui import QColor, QIcon
+from PyQt5.QtCore import QTimer, Qt, QPoint, QCoreApplication, QTranslator, QSettings, QPropertyAnimation, \
+    QEasingCurve, QPersistentModelIndex
 from PyQt5.QtWidgets import QDialog, QApplication, QSystemTrayIcon, QMenu, QAction, QInputDialog, QFrame, QLineEdit, \
-    QVBoxLayout, QLabel, QProgressBar, QPushButton, QProgressDialog, QAbstractItemView, QWidget
+    QVBoxLayout, QLabel, QProgressBar, QPushButton, QAbstractItemView, QWidget, QFileDialog
 from PyQt5 import QtCore, QtGui, QtWidgets
 from PyQt5.QtWidgets import QMessageBox
 
-from pyqttoast import Toast, ToastPreset, ToastPosition
-
-import requests
 import logging
 
 from _internal.version import __version__
+from fastfill.core import (CategoryExistsError, ConfigStore, InvalidNameError, LastCategoryError, RepositoryError,
+                           SnippetRepository, TitleExistsError, TitleNotFoundError, instrumentation)
+from fastfill.core.crypto import KDF_NAMES, DEFAULT_KDF_PARAMS, KeyCache, calibrate, decrypt_cached, \
+    encrypt_cached, is_legacy
+from fastfill.core.instrumentation import timed
+from fastfill.core.logs import setup_logging
+from fastfill.core.search import FullTextSearch, SearchIndex, TitleIndex
+from fastfill.core.startup import StartupTimer
+from fastfill.core.usage import MOST_USED, RECENTLY_USED, UsageStats
+from fastfill.core.updater import RELEASES_URL, installer_sha256, is_newer
+from fastfill.hotkeys import DEFAULT_HOTKEY, create_hotkey_backend
+from fastfill.models import CategoryListModel, SnippetListModel
+from fastfill.overlay import PerfOverlay
+from fastfill.palette import QuickPastePalette
+from fastfill.watcher import ConfigWatcher, StoreRefresher
+from fastfill.workers import CryptoWorker, UpdateCheckWorker, UpdateDownloadWorker
+
+startup_timer = StartupTimer(started)
+startup_timer.mark("imports")
 
 
 # New config file path in AppData
 appData_path = Path(os.getenv("APPDATA")) / "FastFill"
 config_file = appData_path / "FastFillConfig.ini"
+database_file = appData_path / "FastFill.db"  # used instead of config_file if Storage/backend is sqlite
+packed_file = appData_path / "FastFill.idx"  # used instead of config_file if Storage/backend is packed
 settings_file = appData_path / "settings.ini"
 log_file = appData_path / "FastFill_app.log"
+perf_file = appData_path / "FastFill_perf.json"  # written on exit if Debug/instrumentation is enabled
+update_cache_file = appData_path / "version_cache.json"  # last version.json response, see fastfill.core.updater
+usage_file = appData_path / "FastFillUsage.log"  # copy counts and times, see fastfill.core.usage
 
 # Old config file path (FastFill version 1.x) in Documents
 documents_path = Path.home() / "Documents"
@@ -48,27 +66,25 @@ old_config_file = documents_path / "FastFillConfig.ini"
 current_section = None
 
 # Ensure the directory exists
-if not appData_path.exists():
-    logging.info(f"Creating directory: {appData_path}")
+created_appData_path = not appData_path.exists()
+if created_appData_path:
     appData_path.mkdir(parents=True, exist_ok=True)
 
-if not log_file.exists():
-    # You could open the file to create it or add initial logging if needed
-    log_file.touch()  # This will create an empty log file
+# Set up logging before anything is logged, the level is "Logging/level" in settings.ini (debug, info, warning, error)
+startup_settings = configparser.ConfigParser(interpolation=None)
+try:
+    startup_settings.read(settings_file)
+except configparser.Error:
+    pass
+setup_logging(log_file, startup_settings.get("Logging", "level", fallback=""))
 
-# Set up logging
-logging.basicConfig(
-    filename=log_file,  # Log file location
-    level=logging.DEBUG,
-    format='%(asctime)s - %(funcName)s - Line: %(lineno)d ---- %(levelname)s - %(message)s'
-)
+# Opt-in timing of the hot paths, exported to FastFill_perf.json on exit
+if startup_settings.get("Debug", "instrumentation", fallback="false").strip().lower() == "true":
+    instrumentation.enable()
+    atexit.register(instrumentation.export, str(perf_file))
 
-# write log file
-try:
-    with open(log_file, "w"):
-        pass
-except Exception as e:
-    logging.error(e)
+if created_appData_path:
+    logging.info(f"Created directory: {appData_path}")
 
 # Check if the old config file exists and delete it
 if old_config_file.exists():
@@ -90,40 +106,66 @@ if not settings_file.exists():
     logging.info(f"Config file does not exist, creating: {settings_file}")
     settings_file.touch()  # This will create an empty config file
 
-config = configparser.ConfigParser()
-
-try:
-    # Now read the config (whether it was just created or already existed)
-    config.read(config_file)
-except Exception as e:
-    logging.error(e)
-
-# Save any new sections back to the file
-try:
-    with open(config_file, 'w') as f:
-        config.write(f)
-except Exception as e:
-    logging.info(e)
+# Load the config once, the UI reads from this store. "Storage/backend" in settings.ini selects
+# FastFillConfig.ini (ini, the default), the SQLite database FastFill.db (sqlite) for large libraries
+# or FastFill.idx with memory-mapped bodies (packed) for large bodies.
+config_store = None
+storage_backend = startup_settings.get("Storage", "backend", fallback="ini").strip().lower()
+if storage_backend == "sqlite":
+    try:
+        from fastfill.core.sqlite_store import SqliteStore  # imported on first use
+        config_store = SqliteStore(database_file, ini_path=config_file)
+    except Exception as e:
+        logging.error(f"Error opening the database, using the config file instead: {e}")
+elif storage_backend == "packed":
+    try:
+        from fastfill.core.packed_store import PackedStore  # imported on first use
+        config_store = PackedStore(packed_file, ini_path=config_file)
+    except Exception as e:
+        logging.error(f"Error opening the packed store, using the config file instead: {e}")
+if config_store is None:
+    config_store = ConfigStore(config_file)
+startup_timer.mark("config")
+
+# File types of "Import texts..." and "Export texts...", see fastfill.core.transfer
+TRANSFER_FILTER = "CSV (*.csv);;JSON Lines (*.jsonl *.ndjson);;FastFill config (*.ini)"
+SCROLL_RETRY_MS = 20  # scroll_to_row tries again after this long while the row is not laid out
+SCROLL_RETRIES = 100
+UPDATE_CHECK_DELAY_MS = 3000  # after the start, the check imports requests and would compete with the first paint
+update_check_worker = None  # kept alive while the update check runs
+download_worker = None  # kept alive while the update is downloaded
+download_dialog = None
 
 logging.info("Starting FastFill application.")
 
 
 def check_for_update():
     """
-    Checks for updates by fetching the latest version info from GitHub version.json.
-    Notifies the user if a new version is available.
+    Starts checking for updates in the background, the latest version info comes from GitHub version.json
+    (or its cached copy, see fastfill.core.updater). Returns at once, show_update_available gets the result.
     """
+    global update_check_worker
+
+    logging.info("Checking for updates...")
+
+    # Keep a reference, otherwise the worker and its signal are gone before the check is done
+    update_check_worker = UpdateCheckWorker(str(update_cache_file))
+    update_check_worker.finished.connect(show_update_available)
+    update_check_worker.start()
+
+
+def show_update_available(data):
+    """
+    Notifies the user if a new version is available. Runs on the GUI thread when the update check is done.
+    """
+
+    if data is None:
+        return None  # the check failed, the error is already logged
 
     settings_config = configparser.ConfigParser()
     settings_config.read(settings_file)
 
-    logging.info("Checking for updates...")
-
     try:
-        response = requests.get("https://raw.githubusercontent.com/PaulK6803/FastFill/main/version.json")
-        response.raise_for_status()  # Ensure we catch HTTP errors
-        data = response.json()
-
         latest_version = data.get("version")
 
         new_features = None
@@ -137,7 +179,7 @@ def check_for_update():
         elif language_code == "en":  # If the language is English
             new_features = data.get("new_features_en")
 
-        if latest_version > __version__:
+        if latest_version and is_newer(latest_version, __version__):
             logging.info(f"Current installed version: {__version__}")
             logging.info(f"New version available: {latest_version}")
             if Dialog.isVisible():
@@ -154,7 +196,7 @@ def check_for_update():
                 reply = updateWindow.exec_()
 
                 if reply == QMessageBox.StandardButton.Yes:
-                    download_update()
+                    download_update(data)
 
                     # logging.info("Opening new webbrowser tab...")
                     # webbrowser.open_new_tab("https://github.com/PaulK6803/FastFill/releases")
@@ -173,62 +215,81 @@ def check_for_update():
         return None
 
 
-def download_update():
+def download_update(data):
     """
-        Downloads FastFillSetup.exe and installs it.
-        """
-    url = "https://github.com/PaulK6803/FastFill/releases/latest/download/FastFillSetup.exe"
-    temp_dir = tempfile.gettempdir()
-    setup_path = os.path.join(temp_dir, "FastFillSetup.exe")
+    Downloads FastFillSetup.exe in the background and installs it once its SHA-256 matches the one in version.json.
+    Without a published checksum the installer is never run, the releases page is opened instead.
+    """
+    global download_worker, download_dialog
 
-    try:
-        response = requests.get(url, stream=True)
-        response.raise_for_status()
+    sha256 = installer_sha256(data)
+    if sha256 is None:
+        logging.warning("No installer checksum published, opening the releases page instead")
+        open_url(RELEASES_URL)
+        return
 
-        total_size = int(response.headers.get("content-length", 0))
-        block_size = 1024  # 1 KB
-        downloaded_size = 0
+    if download_worker is not None:
+        download_dialog.show()  # already downloading
+        return
 
-        progress = QProgressDialog("Downloading update...", "Cancel", 0, total_size)
-        progress.setWindowIcon(QIcon("_internal/Icon.ico"))
-        progress.setWindowTitle("FastFill Update")
+    setup_path = os.path.join(tempfile.gettempdir(), "FastFillSetup.exe")
 
-        progress.setWindowModality(Qt.WindowModality.ApplicationModal)
-        progress.setMinimumDuration(0)
-        progress.setValue(0)
+    download_dialog = UpdateProgressDialog(Dialog if Dialog.isVisible() else None,
+                                           QCoreApplication.translate("UpdateWindow", "FastFill Update"),
+                                           QCoreApplication.translate("UpdateWindow", "Downloading update..."))
+    download_dialog.setWindowIcon(QIcon("_internal/Icon.ico"))
 
-        with open(setup_path, "wb") as file:
-            for chunk in response.iter_content(block_size):
-                if progress.wasCanceled():
-                    logging.info("Update download canceled.")
-                    return
+    download_worker = UpdateDownloadWorker(setup_path, sha256)
+    download_worker.progress.connect(download_dialog.set_progress)
+    download_worker.finished.connect(on_update_downloaded)
+    download_worker.failed.connect(on_update_download_failed)
+    download_worker.cancelled.connect(on_update_download_done)
+    download_dialog.rejected.connect(download_worker.cancel)
 
-                file.write(chunk)
-                downloaded_size += len(chunk)
-                progress.setValue(downloaded_size)
+    download_dialog.show()
+    download_worker.start()
 
-        progress.close()
 
-        logging.info(f"Downloaded FastFillSetup.exe to {setup_path}")
+def on_update_download_done():
+    global download_worker, download_dialog
 
-        # Execute the installer
-        subprocess.Popen([setup_path], shell=True)
-        sys.exit(0)  # Exit the application after launching the installer
+    if download_dialog is not None:
+        download_dialog.hide()
+        download_dialog.deleteLater()
+    download_worker = download_dialog = None
 
-    except Exception as e:
-        logging.error(f"Failed to download update: {e}")
 
+def on_update_downloaded(setup_path):
+    on_update_download_done()
+    logging.info(f"Downloaded FastFillSetup.exe to {setup_path}")
+    install_update(setup_path)
 
-def install_update(installer_path):
-    subprocess.Popen([installer_path], shell=True)  # Run installer
-    sys.exit()  # Exit application
 
+def on_update_download_failed(error, checksum_mismatch):
+    on_update_download_done()
 
-def isSectionEmpty(config, section):
-    if section in config:
-        return not bool(config[section])  # True if section has no keys
+    if checksum_mismatch:
+        text = QCoreApplication.translate("UpdateWindow", "The downloaded update is damaged and was deleted. "
+                                                          "The releases page will be opened instead.")
     else:
-        raise ValueError("Section is empty")
+        text = QCoreApplication.translate("UpdateWindow", "The update could not be downloaded. "
+                                                          "The next attempt continues where this one stopped.")
+    QMessageBox.warning(Dialog if Dialog.isVisible() else None,
+                        QCoreApplication.translate("UpdateWindow", "FastFill Update"), text)
+
+    if checksum_mismatch:
+        open_url(RELEASES_URL)
+
+
+def open_url(url):
+    import webbrowser  # imported on first use
+    webbrowser.open_new_tab(url)
+
+
+def install_update(installer_path):
+    config_store.flush()  # Write pending config changes
+    subprocess.Popen([installer_path], shell=True)  # Run installer
+    sys.exit()  # Exit application
 
 
 class UiDialogMain(object):
@@ -238,8 +299,20 @@ class UiDialogMain(object):
 
     def setupUi(self, Dialog):
 
-        config = configparser.ConfigParser()
-        config.read(config_file)
+        self.store = config_store
+        self.repository = SnippetRepository(self.store)  # every add / rename / remove / reorder goes through it
+        # Built in the background once the window is up (see __main__), follows every change of the store.
+        # The SQLite database has its own full-text index.
+        if getattr(self.store, "has_full_text_search", False):
+            self.searchIndex = FullTextSearch(self.store)
+        else:
+            self.searchIndex = SearchIndex(self.store, build=False)
+        self.titleIndex = TitleIndex(self.store, build=False)  # for the quick paste palette, built like searchIndex
+        self.quickPaste = None  # created by setup_quick_paste
+        # How often and how recently each title was copied, for the "most used" order and the search ranking
+        self.usage = UsageStats(usage_file)
+        self.store.add_listener(self.usage.on_store_changed)
+        self.hotkeyBackend = None
 
         self.current_toast = None # Store the toast object of show_toast_notification function
         self.clear_clipboard_timer = None  # Store the QTimer object of button_copy_clicked function
@@ -251,6 +324,19 @@ class UiDialogMain(object):
         # Use QSettings with INI format
         self.settings = QSettings(str(settings_file), QSettings.IniFormat)
 
+        # Derived keys of encrypted values, only kept if the user enabled the unlocked session
+        self.key_cache = KeyCache(
+            enabled=self.settings.value("Security/unlocked_session", False, type=bool),
+            idle_timeout=self.settings.value("Security/session_timeout_minutes", 5, type=int) * 60)
+        self.session_timer = QTimer()
+        self.session_timer.timeout.connect(self.key_cache.expire)
+        self.session_timer.start(30000)  # wipe the keys soon after the idle timeout
+
+        # Key derivation takes ~100 ms, encrypting and decrypting runs in the background
+        self.cryptoWorker = CryptoWorker()
+        self.decrypt_task = None  # (task id, section, title) of the value that is being decrypted
+        self.kdf_params = self.load_kdf_params()  # key derivation used for new encrypted values
+
         # Check if it's the first run
         if self.settings.value("App/first_run", True, type=bool):  # Check if 'first_run' is True
             logging.info("Starting first time configuration")  # Log first-time run
@@ -270,25 +356,17 @@ class UiDialogMain(object):
             logging.info("fastFill_de.qm language file loaded successfully")
 
             try:
-                if not config.sections():  # If config is empty, initialize German sections
-                    config.add_section("Kategorie 1")
-                    config.set('Kategorie 1', 'item1_title', 'Beispiel Text')
-                    config.set('Kategorie 1', 'item1_content', 'beispiel.mail@mail.de')
-
-                    with open(config_file, 'w') as cfg:
-                        config.write(cfg)
+                if not self.repository.categories():  # If config is empty, initialize German sections
+                    self.repository.add_category("Kategorie 1")
+                    self.repository.add('Kategorie 1', 'Beispiel Text', 'beispiel.mail@mail.de')
             except Exception as e:
                 logging.error(f"Error with config: {e}")
 
         else:  # If language is English
             try:
-                if not config.sections():  # If config is empty, initialize English sections
-                    config.add_section("Category 1")
-                    config.set('Category 1', 'item1_title', 'Example Text')
-                    config.set('Category 1', 'item1_content', 'example.mail@mail.com')
-
-                    with open(config_file, 'w') as cfg:
-                        config.write(cfg)
+                if not self.repository.categories():  # If config is empty, initialize English sections
+                    self.repository.add_category("Category 1")
+                    self.repository.add('Category 1', 'Example Text', 'example.mail@mail.com')
             except Exception as e:
                 logging.error(f"Error with config: {e}")
 
@@ -363,52 +441,60 @@ class UiDialogMain(object):
             self.pushButtonCopyValue.setIconSize(QtCore.QSize(15, 15))
             self.pushButtonCopyValue.setCheckable(False)
             self.pushButtonCopyValue.setObjectName("pushButtonCopy")
-            self.listWidget = QtWidgets.QListWidget(Dialog)
-            self.listWidget.setGeometry(QtCore.QRect(200, 80, 450, 520))
-            self.listWidget.setMinimumSize(QtCore.QSize(450, 520))
-            self.listWidget.setMaximumSize(QtCore.QSize(450, 520))
+            self.listView = QtWidgets.QListView(Dialog)
+            self.listView.setGeometry(QtCore.QRect(200, 80, 450, 520))
+            self.listView.setMinimumSize(QtCore.QSize(450, 520))
+            self.listView.setMaximumSize(QtCore.QSize(450, 520))
             font = QtGui.QFont()
             font.setFamily("Arial")
             font.setPointSize(11)
-            self.listWidget.setFont(font)
-            self.listWidget.setStyleSheet("background-color:rgb(255, 255, 255);\n"
+            self.listView.setFont(font)
+            self.listView.setStyleSheet("background-color:rgb(255, 255, 255);\n"
                                           "border: 0px solid;\n"
                                           "border-radius: 0px;")
-            self.listWidget.setFrameShadow(QtWidgets.QFrame.Raised)
-            self.listWidget.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
-            self.listWidget.setTabKeyNavigation(True)
-            self.listWidget.setProperty("showDropIndicator", False)
-            self.listWidget.setMovement(QtWidgets.QListView.Static)
-            self.listWidget.setLayoutMode(QtWidgets.QListView.SinglePass)
-            self.listWidget.setViewMode(QtWidgets.QListView.ListMode)
-            self.listWidget.setBatchSize(100)
-            self.listWidget.setWordWrap(False)
-            self.listWidget.setSelectionRectVisible(False)
-            self.listWidget.setObjectName("listWidget")
-
-            self.listWidgetCategories = QtWidgets.QListWidget(Dialog)
-            self.listWidgetCategories.setGeometry(QtCore.QRect(0, 80, 200, 520))
-            self.listWidgetCategories.setMinimumSize(QtCore.QSize(200, 520))
-            self.listWidgetCategories.setMaximumSize(QtCore.QSize(200, 520))
+            self.listView.setFrameShadow(QtWidgets.QFrame.Raised)
+            self.listView.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+            self.listView.setTabKeyNavigation(True)
+            self.listView.setProperty("showDropIndicator", False)
+            self.listView.setMovement(QtWidgets.QListView.Static)
+            # Rows are laid out in batches between events, a category with 50k titles is painted after the first
+            self.listView.setLayoutMode(QtWidgets.QListView.Batched)
+            self.listView.setViewMode(QtWidgets.QListView.ListMode)
+            self.listView.setBatchSize(100)
+            self.listView.setWordWrap(False)
+            self.listView.setSelectionRectVisible(False)
+            self.listView.setUniformItemSizes(True)  # all rows are 35 px high, only visible rows are laid out
+            self.listView.setObjectName("listView")
+            self.snippetModel = SnippetListModel(self.store, self.listView)
+            self.apply_title_order(self.settings.value("User/title_order", "manual"))
+            self.listView.setModel(self.snippetModel)
+
+            self.listViewCategories = QtWidgets.QListView(Dialog)
+            self.listViewCategories.setGeometry(QtCore.QRect(0, 80, 200, 520))
+            self.listViewCategories.setMinimumSize(QtCore.QSize(200, 520))
+            self.listViewCategories.setMaximumSize(QtCore.QSize(200, 520))
             font = QtGui.QFont()
             font.setFamily("Arial")
             font.setPointSize(12)
             font.setBold(True)
-            self.listWidgetCategories.setFont(font)
-            self.listWidgetCategories.setStyleSheet("color: white; background-color: #4c4c4c;\n"
+            self.listViewCategories.setFont(font)
+            self.listViewCategories.setStyleSheet("color: white; background-color: #4c4c4c;\n"
                                                     "border: 0px solid;\n"
                                                     "border-radius: 0px;\n")
-            self.listWidgetCategories.setFrameShadow(QtWidgets.QFrame.Raised)
-            self.listWidgetCategories.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
-            self.listWidgetCategories.setTabKeyNavigation(True)
-            self.listWidgetCategories.setProperty("showDropIndicator", False)
-            self.listWidgetCategories.setMovement(QtWidgets.QListView.Static)
-            self.listWidgetCategories.setLayoutMode(QtWidgets.QListView.SinglePass)
-            self.listWidgetCategories.setViewMode(QtWidgets.QListView.ListMode)
-            self.listWidgetCategories.setBatchSize(100)
-            self.listWidgetCategories.setWordWrap(False)
-            self.listWidgetCategories.setSelectionRectVisible(False)
-            self.listWidgetCategories.setObjectName("listWidgetCategories")
+            self.listViewCategories.setFrameShadow(QtWidgets.QFrame.Raised)
+            self.listViewCategories.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+            self.listViewCategories.setTabKeyNavigation(True)
+            self.listViewCategories.setProperty("showDropIndicator", False)
+            self.listViewCategories.setMovement(QtWidgets.QListView.Static)
+            self.listViewCategories.setLayoutMode(QtWidgets.QListView.SinglePass)
+            self.listViewCategories.setViewMode(QtWidgets.QListView.ListMode)
+            self.listViewCategories.setBatchSize(100)
+            self.listViewCategories.setWordWrap(False)
+            self.listViewCategories.setSelectionRectVisible(False)
+            self.listViewCategories.setUniformItemSizes(True)
+            self.listViewCategories.setObjectName("listViewCategories")
+            self.categoryModel = CategoryListModel(self.store, self.listViewCategories)
+            self.listViewCategories.setModel(self.categoryModel)
 
             self.frame_4 = QtWidgets.QFrame(Dialog)
             self.frame_4.setGeometry(QtCore.QRect(200, 40, 800, 40))
@@ -545,6 +631,51 @@ class UiDialogMain(object):
                                               "}")
             self.pushButtonHelp.setObjectName("pushButtonHelp")
 
+            self.lineEditSearch = QtWidgets.QLineEdit(self.frame_5)
+            self.lineEditSearch.setGeometry(QtCore.QRect(690, 5, 300, 30))
+            font = QtGui.QFont()
+            font.setFamily("Arial")
+            font.setPointSize(10)
+            self.lineEditSearch.setFont(font)
+            self.lineEditSearch.setClearButtonEnabled(True)
+            self.lineEditSearch.setStyleSheet("QLineEdit{\n"
+                                              "color: black;\n"
+                                              "background-color: #f0f0f0;\n"
+                                              "border: 1px solid #bbb;\n"
+                                              "border-radius: 8px;\n"
+                                              "padding: 0px 8px;\n"
+                                              "}")
+            self.lineEditSearch.setObjectName("lineEditSearch")
+
+            # Search results, shown below the search box while there is a search text
+            self.listWidgetSearchResults = QtWidgets.QListWidget(Dialog)
+            self.listWidgetSearchResults.setGeometry(QtCore.QRect(590, 40, 400, 320))
+            font = QtGui.QFont()
+            font.setFamily("Arial")
+            font.setPointSize(10)
+            self.listWidgetSearchResults.setFont(font)
+            self.listWidgetSearchResults.setStyleSheet("QListWidget{\n"
+                                                       "color: black;\n"
+                                                       "background-color: white;\n"
+                                                       "border: 1px solid #bbb;\n"
+                                                       "border-radius: 0px;\n"
+                                                       "}\n"
+                                                       "\n"
+                                                       "QListWidget::item {\n"
+                                                       "    padding: 6px;\n"
+                                                       "}")
+            self.listWidgetSearchResults.setUniformItemSizes(True)
+            self.listWidgetSearchResults.setObjectName("listWidgetSearchResults")
+            self.listWidgetSearchResults.hide()
+
+            # Performance overlay (only with Debug/instrumentation enabled), toggled with Ctrl+Shift+P
+            self.perfOverlay = None
+            if instrumentation.is_enabled():
+                self.perfOverlay = PerfOverlay(Dialog)
+                self.perfOverlay.set_visible(self.settings.value("Debug/perf_overlay", False, type=bool))
+                perf_overlay_shortcut = QtWidgets.QShortcut(QtGui.QKeySequence("Ctrl+Shift+P"), Dialog)
+                perf_overlay_shortcut.activated.connect(self.perfOverlay.toggle)
+
             self.pushButtonAddCategory = QtWidgets.QPushButton(self.frame_4)
             self.pushButtonAddCategory.setGeometry(QtCore.QRect(0, 2, 41, 41))
             self.pushButtonAddCategory.setCursor(QtGui.QCursor(QtCore.Qt.PointingHandCursor))
@@ -675,7 +806,7 @@ class UiDialogMain(object):
             self.frame_6.raise_()
             self.labelHeadline.raise_()
             self.pushButtonCopyValue.raise_()
-            self.listWidget.raise_()
+            self.listView.raise_()
             self.pushButtonEdit.raise_()
             self.pushButtonEditConfirm.raise_()
             self.pushButtonSettings.raise_()
@@ -692,6 +823,21 @@ class UiDialogMain(object):
 
             self.populate_sidebar()
 
+            # Connected once here, populate_sidebar only rebuilds the items
+            self.listViewCategories.clicked.connect(self.on_section_item_click)
+
+            # Changes made to the config outside of FastFill show up right away, only the changed rows are updated.
+            # The stores are only reloaded from here (and before a change), never while they are read.
+            self.configWatcher = None
+            self.storeRefresher = None
+            if isinstance(self.store, ConfigStore):
+                self.configWatcher = ConfigWatcher(self.store, parent=Dialog)
+                self.configWatcher.changed.connect(self.on_config_changed_externally)
+                self.configWatcher.conflict.connect(self.on_config_conflict)
+            else:
+                self.storeRefresher = StoreRefresher(self.store, parent=Dialog)
+                self.storeRefresher.changed.connect(self.on_config_changed_externally)
+
             self.pushButtonSettings.clicked.connect(lambda: self.show_settings_ContextMenu(
                 self.pushButtonSettings.mapToGlobal(QPoint(0, self.pushButtonSettings.height()))))
 
@@ -702,17 +848,23 @@ class UiDialogMain(object):
             self.pushButtonRenameCategory.clicked.connect(self.rename_category)
             self.pushButtonAddTitle.clicked.connect(self.add_title)
             self.pushButtonAddEncTitle.clicked.connect(self.add_encrypted_title)
-            self.pushButtonRemoveTitle.clicked.connect(lambda: self.remove_title(self.listWidget.currentItem()))
+            self.pushButtonRemoveTitle.clicked.connect(lambda: self.remove_title(self.listView.currentIndex()))
             self.pushButtonRenameTitle.clicked.connect(self.rename_title)
 
             self.pushButtonEdit.clicked.connect(lambda: self.edit_fields(editing=True))
             self.pushButtonEditConfirm.clicked.connect(lambda: self.edit_fields(editing=False))
             self.pushButtonHelp.clicked.connect(self.show_help_contextMenu)
 
-            self.listWidget.itemClicked.connect(self.update_fields)
-            # Enable right-click context menu for the list widget
-            self.listWidget.setContextMenuPolicy(Qt.CustomContextMenu)
-            self.listWidget.customContextMenuRequested.connect(self.show_listWidget_contextMenu)
+            self.lineEditSearch.textChanged.connect(self.search_snippets)
+            self.lineEditSearch.returnPressed.connect(
+                lambda: self.open_search_result(self.listWidgetSearchResults.item(0)))
+            self.listWidgetSearchResults.itemClicked.connect(self.open_search_result)
+            self.listWidgetSearchResults.itemActivated.connect(self.open_search_result)
+
+            self.listView.clicked.connect(self.update_fields)
+            # Enable right-click context menu for the list view
+            self.listView.setContextMenuPolicy(Qt.CustomContextMenu)
+            self.listView.customContextMenuRequested.connect(self.show_listView_contextMenu)
 
 
 
@@ -721,18 +873,18 @@ class UiDialogMain(object):
 
             self.retranslateUi(Dialog)
 
-            self.listWidget.setDragDropMode(QAbstractItemView.InternalMove)
-            self.listWidget.setDefaultDropAction(Qt.MoveAction)
-            self.listWidget.setDragEnabled(True)
-            self.listWidget.setAcceptDrops(True)
+            self.listView.setDragDropMode(QAbstractItemView.InternalMove)
+            self.listView.setDefaultDropAction(Qt.MoveAction)
+            self.listView.setDragEnabled(True)
+            self.listView.setAcceptDrops(True)
 
-            self.listWidgetCategories.setDragDropMode(QAbstractItemView.InternalMove)
-            self.listWidgetCategories.setDefaultDropAction(Qt.MoveAction)
-            self.listWidgetCategories.setDragEnabled(True)
-            self.listWidgetCategories.setAcceptDrops(True)
+            self.listViewCategories.setDragDropMode(QAbstractItemView.InternalMove)
+            self.listViewCategories.setDefaultDropAction(Qt.MoveAction)
+            self.listViewCategories.setDragEnabled(True)
+            self.listViewCategories.setAcceptDrops(True)
 
-            self.listWidget.model().rowsMoved.connect(self.save_title_order)
-            self.listWidgetCategories.model().rowsMoved.connect(self.save_category_order)
+            self.snippetModel.rowsMoved.connect(self.save_title_order)
+            self.categoryModel.rowsMoved.connect(self.save_category_order)
         except Exception as e:
             logging.error(e)
             QMessageBox.warning(Dialog, "FastFill Error",
@@ -751,6 +903,7 @@ class UiDialogMain(object):
             self.pushButtonCopyValue.setText(_translate("Dialog", "Copy text"))
             self.pushButtonSettings.setText(_translate("Dialog", "Settings"))
             self.pushButtonHelp.setText(_translate("Dialog", "Help"))
+            self.lineEditSearch.setPlaceholderText(_translate("Dialog", "Search..."))
             self.pushButtonEdit.setText(_translate("Dialog", "Edit"))
             self.pushButtonEditConfirm.setText(_translate("Dialog", "Confirm"))
             self.pushButtonAddCategory.setToolTip(
@@ -863,43 +1016,19 @@ class UiDialogMain(object):
 
         global current_section
 
-        config = configparser.ConfigParser()
-        config.read(config_file)
-
         try:
-            # Clear the existing items in listWidgetCategories to prevent duplicates
-            self.listWidgetCategories.clear()
-
-            # List to store section items for later access
-            section_items = []
+            # Reload the categories into the sidebar model
+            self.categoryModel.refresh()
 
-            for section in config.sections():
-                # Dynamically create a QListWidgetItem for each section
-                section_item = QtWidgets.QListWidgetItem(section)
-                section_item.setSizeHint(QSize(0, 40))
-                section_item.setTextAlignment(Qt.AlignCenter)
-
-                # Add the item to the listWidgetCategories
-                self.listWidgetCategories.addItem(section_item)
-
-                # Store the item in the section_items list
-                section_items.append(section_item)
-
-                # Connect item click signal to handle category selection
-                self.listWidgetCategories.itemClicked.connect(
-                    lambda item=section_item: self.on_section_item_click(item))
+            sections = self.categoryModel.categories()
 
             # Set initial section (if needed)
-            if config.sections():
-                current_section = config.sections()[0]
+            if sections:
+                current_section = sections[0]
                 self.populate_list(section=current_section)
-                # Find the item corresponding to the first section
-                for item in section_items:
-                    if item.text() == current_section:
-                        item.setBackground(QBrush(QColor("orange")))  # Set the background color using QBrush
-                        item.setForeground(QColor("white"))  # Set the text color to white
-                        self.listWidgetCategories.setCurrentItem(item)
-                        break
+                # Highlight the first section
+                self.categoryModel.set_current(current_section)
+                self.listViewCategories.setCurrentIndex(self.categoryModel.index(0))
 
         except Exception as e:
             logging.error(e)
@@ -926,6 +1055,10 @@ class UiDialogMain(object):
             open_action.triggered.connect(self.show_dialog)
             tray_menu.addAction(open_action)
 
+            lock_action = QAction(QCoreApplication.translate("TrayIcon", "Lock encrypted values"), Dialog)
+            lock_action.triggered.connect(self.lock_session)
+            tray_menu.addAction(lock_action)
+
             exit_action = QAction(QCoreApplication.translate("TrayIcon", "Exit FastFill"), Dialog)
             exit_action.triggered.connect(self.exit_application)
             tray_menu.addAction(exit_action)
@@ -956,8 +1089,67 @@ class UiDialogMain(object):
         except Exception as e:
             logging.error(e)
 
-    def on_section_item_click(self, clicked_item):
+    def setup_quick_paste(self, hotkey_backend):
+        """
+        Creates the quick paste palette and registers its global hotkey with hotkey_backend (see fastfill.hotkeys).
+        """
+        try:
+            self.quickPaste = QuickPastePalette(self.titleIndex, self.usage.scores)
+            self.quickPaste.chosen.connect(self.copy_snippet)
+
+            self.hotkeyBackend = hotkey_backend
+            self.hotkeyBackend.activated.connect(self.quickPaste.open)
+            if self.settings.value("Hotkey/enabled", True, type=bool):
+                self.register_hotkey()
+        except Exception as e:
+            logging.error(e)
+
+    def register_hotkey(self):
+        hotkey = self.settings.value("Hotkey/sequence", DEFAULT_HOTKEY)
+        if self.hotkeyBackend.register(hotkey):
+            logging.info(f"Quick paste hotkey {self.hotkeyBackend.hotkey} registered")
+            return True
+        return False
+
+    def toggle_hotkey(self, checked):
+        """
+        Enables or disables the quick paste hotkey.
+        """
+        self.settings.setValue("Hotkey/enabled", checked)
+        self.settings.sync()
+        if not checked:
+            self.hotkeyBackend.unregister()
+        elif not self.register_hotkey():
+            QMessageBox.warning(Dialog, "FastFill", QCoreApplication.translate(
+                "toggle_hotkey", "The hotkey {0} could not be registered, it is probably used by another "
+                                 "application.").format(self.settings.value("Hotkey/sequence", DEFAULT_HOTKEY)))
+
+    def copy_snippet(self, section, title):
+        """
+        Copies a title chosen in the quick paste palette. Encrypted values are copied right away in an unlocked
+        session, otherwise the main window opens them and asks for the password.
+        """
+        try:
+            ref = self.store.find(section, title)
+            if ref is None:
+                return
+
+            content = self.store.get_content(section, title).strip()
+            if ref.encrypted:
+                content = decrypt_cached(content, self.key_cache) if self.key_cache.enabled else None
+                if content is None:
+                    self.show_dialog()
+                    Dialog.activateWindow()
+                    self.show_snippet(section, title)
+                    return
+
+            self.copy_to_clipboard(content, (section, title))
+        except Exception as e:
+            logging.error(e)
+
+    def on_section_item_click(self, clicked_index):
         # Clear the text fields and hide buttons when an item is clicked
+        self.cancel_decrypt()
         self.plainTextEdit.clear()
         self.labelShowcaseTitle.clear()
         self.pushButtonEdit.setVisible(False)
@@ -966,15 +1158,12 @@ class UiDialogMain(object):
                                                                          "Click on a value to display more information"))
 
         try:
-            config = configparser.ConfigParser()
-            config.read(config_file)
-
             # Update the current section based on the clicked item
             global current_section
-            current_section = clicked_item.text()
+            current_section = self.categoryModel.category(clicked_index.row())
 
-            if isSectionEmpty(config, current_section):
-                self.listWidget.clear()
+            if self.store.is_section_empty(current_section):
+                self.snippetModel.clear()
                 self.labelNoValuesHint.setText(QCoreApplication.translate("on_section_item_click",
                                                                           f"No values have been added to the selected category yet"))
 
@@ -983,25 +1172,109 @@ class UiDialogMain(object):
                 self.labelNoValuesHint.hide()
                 self.populate_list(section=current_section)
 
-            # Change colors for clicked and other items
-            for index in range(self.listWidgetCategories.count()):
-                item = self.listWidgetCategories.item(index)
-                if item == clicked_item:
-                    item.setBackground(QBrush(QColor("orange")))  # Set the clicked item to orange
-                    item.setForeground(QColor("white"))  # Set the text color to white
-                else:
-                    item.setBackground(QBrush(QColor("#4c4c4c")))  # Set other items to gray
-                    item.setForeground(QColor("white"))  # Set the text color to white
+            # Highlight the clicked category (orange), the others stay gray
+            self.categoryModel.set_current(current_section)
 
         except Exception as e:
             logging.error(e)
 
+    def on_config_changed_externally(self, changes):
+        """
+        Applies changes that were made to the config outside of FastFill (e.g. by a sync tool) to the lists.
+        Only the rows of the changed titles are updated, the lists are rebuilt if the order changed.
+        """
+        global current_section
+
+        try:
+            sections = self.store.sections()
+            if any(change[0] == "reloaded" for change in changes) or current_section not in sections:
+                shown_section = current_section
+                self.populate_sidebar()  # shows the first category
+                if shown_section in sections:
+                    self.on_section_item_click(self.categoryModel.index(sections.index(shown_section)))
+                return
+
+            if self.categoryModel.categories() != sections:
+                self.categoryModel.refresh()
+                self.categoryModel.set_current(current_section)
+                self.listViewCategories.setCurrentIndex(self.categoryModel.index(sections.index(current_section)))
+
+            shown_index = self.listView.currentIndex()
+            shown_title = self.snippetModel.title(shown_index.row()) if shown_index.isValid() else None
+
+            for event, *args in changes:
+                if len(args) < 2 or args[0] != current_section:
+                    continue
+                title = args[1]
+                row = self.snippetModel.row_of(title)
+
+                if event == "snippet_removed" and row >= 0:
+                    self.snippetModel.remove_title(row)
+                    if title == shown_title:
+                        self.plainTextEdit.clear()
+                        self.labelShowcaseTitle.clear()
+                        self.pushButtonEdit.setVisible(False)
+                        self.pushButtonCopyValue.setVisible(False)
+                        shown_title = None
+                elif event == "snippet_added" and row < 0:
+                    self.snippetModel.append_title(title, self.store.find(current_section, title).encrypted)
+                elif event == "content_changed" and row >= 0:
+                    encrypted = self.store.find(current_section, title).encrypted
+                    self.snippetModel.set_encrypted(row, encrypted)
+                    if title == shown_title:
+                        if self.plainTextEdit.isReadOnly() and encrypted:
+                            # Don't ask for a password out of nowhere, the user clicks the title to unlock it
+                            self.plainTextEdit.clear()
+                            self.pushButtonEdit.hide()
+                            self.plainTextEdit.setPlaceholderText(QCoreApplication.translate(
+                                "update_fields",
+                                "Click on the title again and enter the password to unlock the content"))
+                        elif self.plainTextEdit.isReadOnly():
+                            self.update_fields(self.snippetModel.index(row))
+                        else:
+                            QMessageBox.warning(Dialog, "FastFill", QCoreApplication.translate(
+                                "on_config_changed_externally", "This value was changed outside of FastFill while "
+                                                                "you were editing it. Confirming saves your version."))
+
+            titles = [title for title, _ in self.snippetModel.sorted_rows(self.store.titles(current_section))]
+            if self.snippetModel.titles() != titles:
+                self.populate_list(current_section)  # reordered, or titles added in between
+            self.labelNoValuesHint.setVisible(not titles)
+        except Exception as e:
+            logging.error(f"Error applying external config changes: {e}")
+
+    def on_config_conflict(self, conflict_path, conflicts):
+        """
+        Tells the user that the config was changed here and outside of FastFill at the same time.
+        """
+        names = [f"{title} ({section})" if title is not None else section for section, title in conflicts[:10]]
+        if len(conflicts) > 10:
+            names.append("...")
+        text = QCoreApplication.translate("on_config_conflict", "The config was changed outside of FastFill while "
+                                                                "there were unsaved changes. FastFill kept its "
+                                                                "version of these values:") + "\n\n" + "\n".join(names)
+        if conflict_path is not None:
+            text += "\n\n" + QCoreApplication.translate("on_config_conflict", "The other version was saved to:") \
+                    + f"\n{conflict_path}"
+        QMessageBox.warning(Dialog if Dialog.isVisible() else None, "FastFill", text)
+
     def button_copy_clicked(self):
+        title = self.labelShowcaseTitle.text()
+        in_store = self.store.has_section(current_section) and self.store.has_title(current_section, title)
+        snippet = (current_section, title) if in_store else None
+        self.copy_to_clipboard(self.plainTextEdit.toPlainText(), snippet)  # Copy the content from QPlainTextEdit
+
+    def copy_to_clipboard(self, text, snippet=None):
+        """
+        Copies text to the clipboard, which is cleared again after 10 seconds.
+        snippet is the (section, title) the text belongs to, its copy is counted in the usage statistics.
+        """
         try:
             clipboard = QApplication.clipboard()
 
-            # Copy the content from QPlainTextEdit
-            clipboard.setText(self.plainTextEdit.toPlainText())
+            clipboard.setText(text)
+            if snippet is not None:
+                self.usage.record(*snippet)
 
             # Cancel the previous timer if it exists
             if self.clear_clipboard_timer:
@@ -1018,108 +1291,274 @@ class UiDialogMain(object):
         except Exception as e:
             logging.error(e)
 
-    def populate_list(self, section):
+    def search_snippets(self, text):
+        """
+        Shows the titles of all categories that match the search text, updated with every typed character.
+        """
+        try:
+            self.listWidgetSearchResults.clear()
+
+            if not text.strip():
+                self.listWidgetSearchResults.hide()
+                return
 
+            if not self.searchIndex.ready:
+                item = QtWidgets.QListWidgetItem(QCoreApplication.translate("search_snippets", "Preparing the search..."))
+                item.setFlags(Qt.NoItemFlags)
+                self.listWidgetSearchResults.addItem(item)
+                # Search again once the index is built, unless the text was changed in the meantime
+                QTimer.singleShot(200, lambda: text == self.lineEditSearch.text() and self.search_snippets(text))
+            else:
+                results = self.searchIndex.search(text, limit=50, boost=self.usage.scores())
+                for result in results:
+                    item = QtWidgets.QListWidgetItem(f"{result.title}  ({result.section})")
+                    item.setData(Qt.UserRole, (result.section, result.title))
+                    self.listWidgetSearchResults.addItem(item)
+
+                if not results:
+                    item = QtWidgets.QListWidgetItem(QCoreApplication.translate("search_snippets", "No results"))
+                    item.setFlags(Qt.NoItemFlags)
+                    self.listWidgetSearchResults.addItem(item)
+
+            self.listWidgetSearchResults.show()
+            self.listWidgetSearchResults.raise_()
+        except Exception as e:
+            logging.error(e)
+
+    def open_search_result(self, item):
+        """
+        Opens the category of a search result and selects its title.
+        """
+        if item is None or item.data(Qt.UserRole) is None:
+            return
+        self.lineEditSearch.clear()  # hides the results
+        self.show_snippet(*item.data(Qt.UserRole))
+
+    def show_snippet(self, section, title):
+        """
+        Opens a category and selects one of its titles.
+        """
         try:
-            self.listWidget.clear()
+            category_row = self.categoryModel.row_of(section)
+            if category_row < 0:
+                return
+
+            category_index = self.categoryModel.index(category_row)
+            self.listViewCategories.setCurrentIndex(category_index)
+            self.on_section_item_click(category_index)
+
+            row = self.snippetModel.find_row(title)  # fetches the titles up to it
+            if row < 0:
+                return
+
+            index = self.snippetModel.index(row)
+            self.listView.setCurrentIndex(index)
+            self.scroll_to_row(index)
+            self.update_fields(index)
+        except Exception as e:
+            logging.error(e)
+
+    def scroll_to_row(self, index, retries=SCROLL_RETRIES):
+        """
+        Scrolls the title list to a row. The list lays out its rows in batches after a category was opened and
+        only updates its scroll range after the last one, until then the row is scrolled to later.
+        """
+        last_row = self.snippetModel.index(self.snippetModel.rowCount() - 1)
+        if self.listView.visualRect(last_row).isValid() or retries <= 0:
+            self.listView.scrollTo(index)
+            return
 
-            config = configparser.ConfigParser()
-            config.read(config_file)
+        row = QPersistentModelIndex(index)  # follows the row if rows are inserted or removed in the meantime
+        QTimer.singleShot(SCROLL_RETRY_MS, lambda: row.isValid() and
+                          self.scroll_to_row(self.snippetModel.index(row.row()), retries - 1))
 
-            if isSectionEmpty(config, section):
+    @timed("populate_list")
+    def populate_list(self, section):
+
+        try:
+            # The model reads the titles from the store, the view only asks for the visible rows
+            self.snippetModel.set_section(section)
+
+            if self.store.is_section_empty(section):
                 self.labelNoValuesHint.show()
                 self.labelNoValuesHint.setText(
                     QCoreApplication.translate("populate_list", f"No values have been added to") + f" {section}")
-            else:
-                if section in config:
-                    for key in config[section]:
-                        if key.endswith("_title"):
-                            config_value = config[section][key]
-                            if config_value.endswith("_encrypted"):
-                                config_value = config_value.replace("_encrypted", "")
-                                config_value = config_value + " 🔒"
-                            item = QtWidgets.QListWidgetItem(config_value)
-                            item.setSizeHint(QSize(100, 35))
-                            item.setTextAlignment(Qt.AlignCenter)
-                            self.listWidget.addItem(item)
 
         except ValueError as e:
             logging.error(f"Error populating lists: {e}")
 
-    def update_fields(self, item):
+    @timed("update_fields")
+    def update_fields(self, index):
         """Update QLabel and QPlainTextEdit when an item is selected."""
 
+        self.cancel_decrypt()  # a value that is still being decrypted is not shown anymore
+
         self.pushButtonEdit.setVisible(True)
         self.pushButtonCopyValue.setVisible(True)
         self.plainTextEdit.clear()
 
         try:
-            config = configparser.ConfigParser()
-            config.read(config_file)
-
-            if current_section not in config.sections():
-                logging.warning(f"Section '{current_section}' not found in config.")
+            if not self.store.has_section(current_section):
+                logging.warning("Selected category not found in config.")
                 return
 
             # Find the corresponding title and content in the selected section
-            title = item.text()
-            title = title.replace(" 🔒", "")
-            content = ""
-            is_encrypted = False  # to check if the content was originally encrypted
+            title = self.snippetModel.title(index.row())  # title without the lock emoji
 
-            for key in config[current_section]:
-                config_value = config[current_section][key]  # The original value from config
+            ref = self.store.find(current_section, title)
+            if ref is None:
+                return
 
-                if key.endswith("_title") and config_value.replace("_encrypted", "") == title:
-                    content_key = key.replace("_title", "_content")  # Get matching content key
-                    content = config[current_section].get(content_key, "").strip()  # Fetch content, default to ""
+            content = self.store.get_content(current_section, title).strip()  # Fetch content, default to ""
+            is_encrypted = ref.encrypted  # to check if the content was originally encrypted
 
-                    self.labelShowcaseTitle.setText(title)
+            self.labelShowcaseTitle.setText(title)
 
-                    # Check if the original config value (before _encrypted removal) was encrypted
-                    if config_value.endswith("_encrypted"):
-                        is_encrypted = True
+            if not content.strip():  # Check if content is empty or ""
+                self.plainTextEdit.setPlaceholderText(
+                    QCoreApplication.translate("update_fields", f"Click on 'Edit' to modify the content"))
+                return
 
-                    if not content.strip():  # Check if content is empty or ""
-                        self.plainTextEdit.setPlaceholderText(
-                            QCoreApplication.translate("update_fields", f"Click on 'Edit' to modify the content"))
-                        return
-                    else:
-                        # If needed, decrypt content here
-                        if is_encrypted:
-                            self.pushButtonEdit.hide()
-                            self.plainTextEdit.setPlaceholderText(
-                                QCoreApplication.translate("update_fields",
-                                                           f""))
-                            # Ask for password
-                            password, ok = QInputDialog.getText(Dialog, "Encryption Password",
-                                                                QCoreApplication.translate("update_fields", "Enter the password to access this content:"),
-                                                                QLineEdit.Password)
-                            if not ok or not password.strip():
-                                self.plainTextEdit.setPlaceholderText(
-                                    QCoreApplication.translate("update_fields",
-                                                               f"Click on the title again and enter the password to unlock the content"))
-                                return
-                            content = self.decrypt_data(password, content)  # Decrypt config value
-                            if not content:
-                                QMessageBox.critical(Dialog, "Wrong Password", QCoreApplication.translate("update_fields", "Wrong password for this content"))
-                                self.plainTextEdit.setPlaceholderText(
-                                    QCoreApplication.translate("update_fields",
-                                                               f"Click on the title again and enter the password to unlock the content"))
-                                return
-
-                        self.plainTextEdit.setPlainText(content)
-                        self.pushButtonEdit.show()
-                        return
+            decrypted = None
+            if is_encrypted and self.key_cache.enabled:
+                decrypted = decrypt_cached(content, self.key_cache)  # unlocked session, no password needed
+                if decrypted is not None and is_legacy(content):
+                    # Save the value again in the current format, if a key with the current parameters is cached for
+                    # its password. Otherwise it is migrated the next time the password is entered.
+                    migrated = encrypt_cached(decrypted, content, self.key_cache, self.kdf_params)
+                    if migrated is not None:
+                        self.store.set_content(current_section, title, migrated)
+                        self.store.save()
+
+            # If needed, decrypt content here
+            if decrypted is not None:
+                content = decrypted
+            elif is_encrypted:
+                self.pushButtonEdit.hide()
+                self.plainTextEdit.setPlaceholderText(
+                    QCoreApplication.translate("update_fields",
+                                               f""))
+                # Ask for password
+                password, ok = QInputDialog.getText(Dialog, "Encryption Password",
+                                                    QCoreApplication.translate("update_fields", "Enter the password to access this content:"),
+                                                    QLineEdit.Password)
+                if not ok or not password.strip():
+                    self.plainTextEdit.setPlaceholderText(
+                        QCoreApplication.translate("update_fields",
+                                                   f"Click on the title again and enter the password to unlock the content"))
+                    return
+                self.start_decrypt(current_section, title, password, content)  # shown by show_decrypted_content
+                return
+
+            self.plainTextEdit.setPlainText(content)
+            self.pushButtonEdit.show()
 
         except Exception as e:
             logging.error(f"Error in update_fields: {e}")
 
+    def start_decrypt(self, section, title, password, encrypted_content):
+        """
+        Decrypts a value on the crypto worker, the title shows a busy state until it is done.
+        """
+        self.snippetModel.set_busy(section, title, True)
+        self.plainTextEdit.setPlaceholderText(QCoreApplication.translate("update_fields", "Decrypting..."))
+
+        def done(content):
+            self.decrypt_task = None
+            self.snippetModel.set_busy(section, title, False)
+            self.show_decrypted_content(content)
+
+            if content and is_legacy(encrypted_content):
+                self.migrate_encrypted_value(section, title, password, content, encrypted_content)
+
+        task_id = self.cryptoWorker.decrypt(password, encrypted_content, self.key_cache, on_done=done)
+        self.decrypt_task = (task_id, section, title)
+
+    def migrate_encrypted_value(self, section, title, password, content, legacy_content):
+        """
+        Saves a value in the legacy encryption format again in the current format, in the background.
+        The value is only replaced if it was not changed in the meantime.
+        """
+        def done(new_encrypted_content):
+            if new_encrypted_content is None or self.store.get_content(section, title, None) != legacy_content:
+                return
+            self.store.set_content(section, title, new_encrypted_content)
+            self.store.save()
+            logging.info("Migrated an encrypted value to the current format")
+
+        self.cryptoWorker.encrypt(password, content, self.key_cache, self.kdf_params, on_done=done)
+
+    def load_kdf_params(self):
+        """
+        Returns the key derivation for new encrypted values from the settings.
+        The cost is saved per KDF (Security/kdf_cost_scrypt, Security/kdf_cost_pbkdf2), so changing Security/kdf
+        never uses the cost of the other one. If the KDF was not calibrated on this machine yet, its default is used
+        until calibrate_kdf is done.
+        """
+        kdf = KDF_NAMES["scrypt"]
+        try:
+            name = self.settings.value("Security/kdf", "scrypt")
+            if name not in KDF_NAMES:
+                name = "scrypt"
+            kdf = KDF_NAMES[name]
+            cost = self.settings.value(f"Security/kdf_cost_{name}", 0, type=int)
+            if cost:
+                return DEFAULT_KDF_PARAMS[kdf]._replace(cost=cost)
+
+            self.calibrate_kdf(kdf)
+        except Exception as e:
+            logging.error(e)
+        return DEFAULT_KDF_PARAMS[kdf]
+
+    def calibrate_kdf(self, kdf):
+        """
+        Measures the key derivation in the background and saves the cost that takes Security/unlock_target_ms.
+        """
+        target_seconds = self.settings.value("Security/unlock_target_ms", 250, type=int) / 1000
+
+        def done(params):
+            if params is None:
+                return
+            self.kdf_params = params
+            name = next(name for name, value in KDF_NAMES.items() if value == params.kdf)
+            self.settings.setValue(f"Security/kdf_cost_{name}", params.cost)
+            self.settings.sync()
+            logging.info(f"Key derivation calibrated: {params}")
+
+        self.cryptoWorker.submit(calibrate, kdf, target_seconds, on_done=done)
+
+    def cancel_decrypt(self):
+        """
+        Cancels the running decryption, e.g. when another value or category is selected.
+        """
+        if self.decrypt_task is None:
+            return
+
+        task_id, section, title = self.decrypt_task
+        self.decrypt_task = None
+        self.cryptoWorker.cancel(task_id)
+        self.snippetModel.set_busy(section, title, False)
+
+    def show_decrypted_content(self, content):
+        try:
+            if not content:
+                QMessageBox.critical(Dialog, "Wrong Password", QCoreApplication.translate("update_fields", "Wrong password for this content"))
+                self.plainTextEdit.setPlaceholderText(
+                    QCoreApplication.translate("update_fields",
+                                               f"Click on the title again and enter the password to unlock the content"))
+                return
+
+            self.plainTextEdit.setPlainText(content)
+            self.pushButtonEdit.show()
+        except Exception as e:
+            logging.error(e)
+
     def edit_fields(self, editing):
 
         if editing:
-            self.listWidget.setEnabled(False)
-            self.listWidgetCategories.setEnabled(False)
+            self.listView.setEnabled(False)
+            self.listViewCategories.setEnabled(False)
+            self.lineEditSearch.setEnabled(False)
             self.plainTextEdit.setReadOnly(False)
             self.pushButtonEdit.setVisible(False)
             self.pushButtonEditConfirm.setVisible(True)
@@ -1133,11 +1572,13 @@ class UiDialogMain(object):
             self.pushButtonEdit.setVisible(True)
             self.plainTextEdit.setFrameShape(QFrame.NoFrame)
             self.plainTextEdit.setStyleSheet("")
-            self.listWidget.setEnabled(True)
-            self.listWidgetCategories.setEnabled(True)
+            self.listView.setEnabled(True)
+            self.listViewCategories.setEnabled(True)
+            self.lineEditSearch.setEnabled(True)
 
             self.save_fields_content()
 
+    @timed("save_fields_content")
     def save_fields_content(self):
         """
         Saves the current content of QPlainTextEdit to the correct itemX_content in the config.
@@ -1150,50 +1591,42 @@ class UiDialogMain(object):
             if content == self.current_field_content:
                 return
 
-            # Get the selected item from the listWidget
-            selected_item = self.listWidget.currentItem()
-            if not selected_item:
+            # Get the selected item from the listView
+            selected_index = self.listView.currentIndex()
+            if not selected_index.isValid():
                 return  # No item selected, nothing to save
 
-            item_title = selected_item.text().replace("🔒", "").strip()  # Remove lock emoji if present
+            item_title = self.snippetModel.title(selected_index.row())  # title without the lock emoji
 
-            # Get the selected category from listWidgetCategories
-            selected_category_item = self.listWidgetCategories.selectedItems()
-            if not selected_category_item:
+            # Get the category the titles belong to
+            category_name = self.snippetModel.section
+            if category_name is None:
                 return  # No category selected, nothing to save
 
-            category_name = selected_category_item[0].text().strip()  # Get the category name
+            if not self.store.has_section(category_name):
+                return  # Category not found in config
 
-            # Load the config
-            config = configparser.ConfigParser()
-            config.read(config_file)
+            # Find the title in the index of the category
+            ref = self.store.find(category_name, item_title)
+            if ref is None:
+                return  # Title not found, nothing to save
 
-            if category_name not in config.sections():
-                return  # Category not found in config
+            is_encrypted = ref.encrypted  # Track if original content was encrypted
+            if is_encrypted and not content:
+                return
 
-            # Find the key corresponding to the title
-            content_key = None
-            is_encrypted = False  # Track if original content was encrypted
-
-            for key, value in config[category_name].items():
-                if key.endswith("_title"):
-                    # Check for exact match (non-encrypted)
-                    if value == item_title:
-                        content_key = key.replace("_title", "_content")
-                        break
-                    # Check for encrypted match
-                    elif value == item_title + "_encrypted":
-                        if not content:
-                            return
-                        content_key = key.replace("_title", "_content")
-                        is_encrypted = True
-                        break
-
-            if not content_key:
-                return  # Content key not found, nothing to save
+            encrypted_content = None
+            if is_encrypted and self.key_cache.enabled:
+                # Unlocked session: encrypt with a cached key of the same password and the current parameters,
+                # no password needed
+                encrypted_content = encrypt_cached(content, self.store.get_content(category_name, item_title),
+                                                   self.key_cache, self.kdf_params)
 
             # Encrypt if originally encrypted, otherwise save as plain text
-            if is_encrypted:
+            if encrypted_content is not None:
+                self.store.set_content(category_name, item_title, encrypted_content)
+                self.store.save()
+            elif is_encrypted:
                 # Ask for password to encrypt the content
                 password, ok = QtWidgets.QInputDialog.getText(
                     Dialog, "Encryption Password",
@@ -1203,29 +1636,37 @@ class UiDialogMain(object):
                 if not ok or not password.strip():
                     return  # User canceled encryption, do not save
 
-                encrypted_content = self.encrypt_data(password, content)
-                config.set(category_name, content_key, encrypted_content)
-                # Save the updated config
-                with open(config_file, 'w') as cfg:
-                    config.write(cfg)
+                # Encrypt in the background, the title shows a busy state until the value is saved
+                self.snippetModel.set_busy(category_name, item_title, True)
+
+                def done(new_encrypted_content):
+                    self.snippetModel.set_busy(category_name, item_title, False)
+                    if new_encrypted_content is None:
+                        QMessageBox.warning(Dialog, "FastFill Error", QCoreApplication.translate(
+                            "saveFieldsContent", "The content could not be encrypted and was not saved."))
+                        return
+                    self.store.set_content(category_name, item_title, new_encrypted_content)
+                    # Save the updated config
+                    self.store.save()
+
+                self.cryptoWorker.encrypt(password, content, self.key_cache, self.kdf_params, on_done=done)
             else:
                 # Save plain text
-                config.set(category_name, content_key, content)
+                self.store.set_content(category_name, item_title, content)
                 # Save the updated config
-                with open(config_file, 'w') as cfg:
-                    config.write(cfg)
+                self.store.save()
 
         except Exception as e:
             logging.error(f"Error saving content: {e}")
 
 
-    def show_listWidget_contextMenu(self, pos):
+    def show_listView_contextMenu(self, pos):
         try:
             # Get the item under the cursor
-            item = self.listWidget.itemAt(pos)
+            index = self.listView.indexAt(pos)
 
             # Create the context menu
-            contextMenu = QMenu(self.listWidget)
+            contextMenu = QMenu(self.listView)
 
             # Apply hover effects using style sheet
             contextMenu.setStyleSheet("""
@@ -1251,7 +1692,7 @@ class UiDialogMain(object):
                     """)
 
             # If an item is right-clicked
-            if item is not None:
+            if index.isValid():
                 action1 = QAction(QCoreApplication.translate("listWidget_ContextMenu", "Rename"),
                                   Dialog)  # Item-specific action
                 action2 = QAction(QCoreApplication.translate("listWidget_ContextMenu", "Remove"),
@@ -1259,7 +1700,7 @@ class UiDialogMain(object):
                 action3 = QAction(QCoreApplication.translate("listWidget_ContextMenu", "Add"),
                                   Dialog)  # Item-specific action
                 action1.triggered.connect(self.rename_title)
-                action2.triggered.connect(lambda: self.remove_title(item.text))
+                action2.triggered.connect(lambda: self.remove_title(index))
                 action3.triggered.connect(self.add_title)
                 contextMenu.addAction(action1)
                 contextMenu.addAction(action2)
@@ -1274,7 +1715,7 @@ class UiDialogMain(object):
                 contextMenu.addAction(action3)
 
             # Execute the menu at the clicked position
-            contextMenu.exec_(self.listWidget.mapToGlobal(pos))
+            contextMenu.exec_(self.listView.mapToGlobal(pos))
 
         except Exception as e:
             logging.error(e)
@@ -1293,7 +1734,7 @@ class UiDialogMain(object):
             github_url = "https://github.com/PaulK6803/FastFill/issues"  # Replace with your bug reporting page URL
 
             # Connect actions to functions
-            report_bug_action.triggered.connect(lambda: webbrowser.open(github_url))
+            report_bug_action.triggered.connect(lambda: open_url(github_url))
             about_action.triggered.connect(self.about)
 
             # Add actions to the context menu
@@ -1331,6 +1772,19 @@ class UiDialogMain(object):
             language_menu.addAction(action_de)
             language_menu.addAction(action_en)
 
+            # Order of the titles
+            order_menu = QMenu(QCoreApplication.translate("settings_ContextMenu", "Order of the titles"), None)
+            current_order = self.settings.value("User/title_order", "manual")
+            for order, text in (("manual", QCoreApplication.translate("settings_ContextMenu", "Manual (Drag & Drop)")),
+                                (MOST_USED, QCoreApplication.translate("settings_ContextMenu", "Most used first")),
+                                (RECENTLY_USED, QCoreApplication.translate("settings_ContextMenu",
+                                                                           "Recently used first"))):
+                order_action = QAction(text, order_menu)
+                order_action.setCheckable(True)
+                order_action.setChecked(order == current_order)
+                order_action.triggered.connect(lambda checked, order=order: self.apply_title_order(order))
+                order_menu.addAction(order_action)
+
             # Other settings options
             start_with_windows_action = QAction(
                 QCoreApplication.translate("settings_ContextMenu", "Start FastFill with Windows"), None)
@@ -1361,11 +1815,42 @@ class UiDialogMain(object):
                 show_copy_notification_action.triggered.connect(lambda checked: self.settings.setValue("User/show_copy_notification", True))
 
 
+            change_password_action = QAction(
+                QCoreApplication.translate("settings_ContextMenu", "Change password of encrypted values..."), None)
+            change_password_action.triggered.connect(self.change_encryption_password)
+
+            unlocked_session_action = QAction(
+                QCoreApplication.translate("settings_ContextMenu", "Keep encrypted values unlocked until locked"), None)
+            unlocked_session_action.setCheckable(True)
+            unlocked_session_action.setChecked(self.key_cache.enabled)
+            unlocked_session_action.triggered.connect(self.toggle_unlocked_session)
+
+            hotkey_action = None
+            if self.quickPaste is not None and self.hotkeyBackend.available:
+                hotkey_action = QAction(QCoreApplication.translate("settings_ContextMenu", "Open quick paste with {0}")
+                                        .format(self.settings.value("Hotkey/sequence", DEFAULT_HOTKEY)), None)
+                hotkey_action.setCheckable(True)
+                hotkey_action.setChecked(self.hotkeyBackend.hotkey is not None)
+                hotkey_action.triggered.connect(self.toggle_hotkey)
+
+            import_action = QAction(QCoreApplication.translate("settings_ContextMenu", "Import texts..."), None)
+            import_action.triggered.connect(self.import_titles)
+            export_action = QAction(QCoreApplication.translate("settings_ContextMenu", "Export texts..."), None)
+            export_action.triggered.connect(self.export_titles)
+
             # Add actions to menu
             menu.addMenu(language_menu)
+            menu.addMenu(order_menu)
             menu.addAction(start_with_windows_action)
             menu.addAction(start_minimized_action)
             menu.addAction(show_copy_notification_action)
+            if hotkey_action is not None:
+                menu.addAction(hotkey_action)
+            menu.addAction(unlocked_session_action)
+            menu.addAction(change_password_action)
+            menu.addSeparator()
+            menu.addAction(import_action)
+            menu.addAction(export_action)
 
             # Show menu at the button's position
             menu.exec_(pos)
@@ -1380,9 +1865,10 @@ class UiDialogMain(object):
             shortcut_path = os.path.join(startup_folder, "FastFill.lnk")
             exe_path = os.path.abspath(sys.argv[0])  # Get the path of FastFill.exe
 
-            shell = win32com.client.Dispatch("WScript.Shell")
-
             if enable:
+                import win32com.client  # only needed here, importing it takes long
+                shell = win32com.client.Dispatch("WScript.Shell")
+
                 # Create shortcut
                 shortcut = shell.CreateShortcut(shortcut_path)
                 shortcut.TargetPath = exe_path
@@ -1401,11 +1887,228 @@ class UiDialogMain(object):
         except Exception as e:
             logging.error(f"Failed to modify startup setting: {e}")
 
+    def apply_title_order(self, order):
+        """
+        Shows the titles in the order of the config ("manual", can be changed with drag & drop),
+        most used first (MOST_USED) or most recently used first (RECENTLY_USED).
+        """
+        if order not in (MOST_USED, RECENTLY_USED):
+            order = "manual"
+        self.snippetModel.set_sort_key(self.usage.sort_key(order) if order != "manual" else None)
+        if self.settings.value("User/title_order", "manual") != order:
+            self.settings.setValue("User/title_order", order)
+            self.settings.sync()
+
     def toggle_start_minimized(self, checked, settings):
         """Enable or disable starting FastFill minimized."""
         settings.setValue("App/start_minimized", checked)
         settings.sync()
 
+    def toggle_unlocked_session(self, checked):
+        """
+        Enable or disable the unlocked session. While enabled, an encrypted value only needs its password
+        once until the session is locked from the tray menu or was idle for the configured timeout.
+        """
+        self.key_cache.set_enabled(checked)  # disabling wipes the cached keys
+        self.settings.setValue("Security/unlocked_session", checked)
+        self.settings.sync()
+
+    def change_encryption_password(self):
+        """
+        Re-encrypts every encrypted value of all categories from an old to a new password.
+        Runs on the crypto worker with a progress dialog, all new values are written in one atomic save.
+        """
+        try:
+            entries = [(section, title, content) for section, title, encrypted, content in self.store.snippets()
+                       if encrypted and content.strip()]
+            if not entries:
+                QMessageBox.information(Dialog, "FastFill", QCoreApplication.translate(
+                    "change_encryption_password", "There are no encrypted values yet."))
+                return
+
+            old_password, ok = QInputDialog.getText(Dialog, "Change Password", QCoreApplication.translate(
+                "change_encryption_password", "Enter the current password of the encrypted values:"), QLineEdit.Password)
+            if not ok or not old_password.strip():
+                return
+            new_password, ok = QInputDialog.getText(Dialog, "Change Password", QCoreApplication.translate(
+                "change_encryption_password", "Enter the new password:"), QLineEdit.Password)
+            if not ok or not new_password.strip():
+                return
+            repeated_password, ok = QInputDialog.getText(Dialog, "Change Password", QCoreApplication.translate(
+                "change_encryption_password", "Enter the new password again:"), QLineEdit.Password)
+            if not ok:
+                return
+            if repeated_password != new_password:
+                QMessageBox.warning(Dialog, "Change Password", QCoreApplication.translate(
+                    "change_encryption_password", "The new passwords do not match."))
+                return
+
+            self.cancel_decrypt()
+
+            progress_dialog = UpdateProgressDialog(
+                Dialog, title="FastFill", text=QCoreApplication.translate(
+                    "change_encryption_password", "Changing the password of") + f" {len(entries)} " +
+                QCoreApplication.translate("change_encryption_password", "encrypted values..."))
+            progress_dialog.setWindowIcon(QIcon("_internal/Icon.ico"))
+            progress_dialog.setModal(True)
+
+            def on_progress(task_id, done, total):
+                if task_id == rotation_task:
+                    progress_dialog.progress_bar.setValue(int(done * 100 / total))
+
+            def on_cancel():
+                self.cryptoWorker.cancel(rotation_task)
+                self.cryptoWorker.progress.disconnect(on_progress)
+                logging.info("Password change canceled, no value was changed")
+
+            def done(result):
+                self.cryptoWorker.progress.disconnect(on_progress)
+                progress_dialog.accept()
+                if result is None:
+                    return
+
+                # All values at once and written immediately, the file never has a mix of old and new passwords
+                replaced = self.store.replace_contents(result.changes)
+                self.store.save()
+                self.store.flush()  # write now instead of after the save delay
+                self.key_cache.lock()  # cached keys belong to the old password
+
+                logging.info(f"Password changed for {replaced} encrypted values, {len(result.skipped)} skipped")
+                message = QCoreApplication.translate("change_encryption_password",
+                                                     "Encrypted values with the new password:") + f" {replaced}"
+                not_changed = len(entries) - replaced
+                if not_changed:
+                    message += "\n" + QCoreApplication.translate(
+                        "change_encryption_password",
+                        "Not changed (other password or edited in the meantime):") + f" {not_changed}"
+                QMessageBox.information(Dialog, "Change Password", message)
+
+            self.cryptoWorker.progress.connect(on_progress)
+            rotation_task = self.cryptoWorker.rotate_password(entries, old_password, new_password,
+                                                              self.kdf_params, on_done=done)
+            progress_dialog.rejected.connect(on_cancel)
+            progress_dialog.show()
+        except Exception as e:
+            logging.error(e)
+
+    def lock_session(self):
+        """
+        Wipes the cached keys, encrypted values need their password again.
+        """
+        try:
+            self.key_cache.lock()
+            logging.info("Encrypted values locked")
+        except Exception as e:
+            logging.error(e)
+
+    def import_titles(self):
+        """
+        Imports titles from a CSV, JSON Lines or FastFill config file into the categories named in the file
+        (rows without a category go to the current one). Runs on the crypto worker, all titles are added at once.
+        """
+        from fastfill.core.transfer import import_file  # imported on first use
+
+        try:
+            path, _ = QFileDialog.getOpenFileName(Dialog, QCoreApplication.translate("import_titles", "Import texts"),
+                                                  str(Path.home()), TRANSFER_FILTER)
+            if not path:
+                return
+
+            skip = QCoreApplication.translate("import_titles", "Skip them")
+            rename = QCoreApplication.translate("import_titles", "Add them with a number, e.g. \"Title (2)\"")
+            choice, ok = QInputDialog.getItem(Dialog, QCoreApplication.translate("import_titles", "Import texts"),
+                                              QCoreApplication.translate("import_titles",
+                                                                         "Titles that already exist in a category:"),
+                                              [skip, rename], 0, False)
+            if not ok:
+                return
+            on_duplicate = "rename" if choice == rename else "skip"
+            default_section = current_section
+
+            def run():
+                try:
+                    return import_file(self.repository, path, on_duplicate=on_duplicate,
+                                       default_section=default_section), None
+                except Exception as e:  # shown to the user, the worker would only log it
+                    return None, e
+
+            def done(outcome):
+                global current_section
+
+                QApplication.restoreOverrideCursor()
+                result, error = outcome
+                if error is not None:
+                    logging.error(f"Import of {path} failed: {error}")
+                    QMessageBox.warning(Dialog, QCoreApplication.translate("import_titles", "Import texts"),
+                                        QCoreApplication.translate("import_titles", "Nothing was imported:") +
+                                        f"\n{error}")
+                    return
+
+                logging.info(f"Imported {path}: {result.added} added ({result.renamed} renamed), "
+                             f"{result.skipped} skipped, {result.invalid} invalid")
+                shown_section = current_section
+                self.populate_sidebar()
+                sections = self.store.sections()
+                if shown_section in sections:
+                    self.on_section_item_click(self.categoryModel.index(sections.index(shown_section)))
+
+                message = QCoreApplication.translate("import_titles", "Imported texts:") + f" {result.added}"
+                if result.renamed:
+                    message += "\n" + QCoreApplication.translate("import_titles", "Added with a number:") + \
+                               f" {result.renamed}"
+                if result.skipped:
+                    message += "\n" + QCoreApplication.translate("import_titles", "Skipped (already exist):") + \
+                               f" {result.skipped}"
+                if result.invalid:
+                    message += "\n" + QCoreApplication.translate("import_titles", "Skipped (invalid):") + \
+                               f" {result.invalid}"
+                if result.problems:
+                    message += "\n\n" + "\n".join(result.problems[:5])
+                QMessageBox.information(Dialog, QCoreApplication.translate("import_titles", "Import texts"), message)
+
+            QApplication.setOverrideCursor(Qt.WaitCursor)
+            self.cryptoWorker.submit(run, on_done=done)
+        except Exception as e:
+            logging.error(e)
+
+    def export_titles(self):
+        """
+        Exports the titles of all categories to a CSV, JSON Lines or FastFill config file, on the crypto worker.
+        Encrypted values are exported encrypted.
+        """
+        from fastfill.core.transfer import export_file  # imported on first use
+
+        try:
+            path, _ = QFileDialog.getSaveFileName(Dialog, QCoreApplication.translate("export_titles", "Export texts"),
+                                                  str(Path.home() / "FastFill.csv"), TRANSFER_FILTER)
+            if not path:
+                return
+
+            def run():
+                try:
+                    return export_file(self.store, path), None
+                except Exception as e:
+                    return None, e
+
+            def done(outcome):
+                QApplication.restoreOverrideCursor()
+                count, error = outcome
+                if error is not None:
+                    logging.error(f"Export to {path} failed: {error}")
+                    QMessageBox.warning(Dialog, QCoreApplication.translate("export_titles", "Export texts"),
+                                        QCoreApplication.translate("export_titles", "The texts could not be exported:")
+                                        + f"\n{error}")
+                    return
+
+                logging.info(f"Exported {count} titles to {path}")
+                QMessageBox.information(Dialog, QCoreApplication.translate("export_titles", "Export texts"),
+                                        QCoreApplication.translate("export_titles", "Exported texts:") + f" {count}")
+
+            QApplication.setOverrideCursor(Qt.WaitCursor)
+            self.cryptoWorker.submit(run, on_done=done)
+        except Exception as e:
+            logging.error(e)
+
     def rename_category(self):
 
         """
@@ -1415,10 +2118,7 @@ class UiDialogMain(object):
         global current_section
 
         try:
-            config = configparser.ConfigParser()
-            config.read(config_file)
-
-            if current_section not in config.sections():
+            if not self.store.has_section(current_section):
                 QMessageBox.warning(Dialog, "Error",
                                     QCoreApplication.translate("rename_category",
                                                                "An error occurred. Please try restarting the application"))
@@ -1430,33 +2130,16 @@ class UiDialogMain(object):
                                                                                     "New name for the category:"),
                                                          text=current_section)
 
-            if ok and new_category_name:  # If user confirmed and entered a name
-                # Check if the new name already exists
-                if new_category_name in config.sections():
+            if ok and new_category_name.strip():  # If user confirmed and entered a name
+                try:
+                    # Copies the items to a new section and removes the old one, then saves
+                    self.repository.rename_category(current_section, new_category_name)
+                except CategoryExistsError:
                     QMessageBox.warning(Dialog, "Error", QCoreApplication.translate("rename_category",
                                                                                     "A category with this name already exists."))
-
                     return
 
-                # Rename the category in the config
-                config.add_section(new_category_name)  # Add new section
-                for key, value in config[current_section].items():
-                    config[new_category_name][key] = value  # Copy the items to the new section
-
-                # Remove the old section
-                config.remove_section(current_section)
-
-                # Save the updated config file
-                with open(config_file, 'w') as cfg:
-                    config.write(cfg)
-
-                # Update the category button in listWidgetCategories
-                for index in range(self.listWidgetCategories.count()):
-                    item = self.listWidgetCategories.item(index)
-                    if item.text() == current_section:
-                        item.setText(new_category_name)
-                        break
-
+                # Rebuild the sidebar with the renamed category
                 self.populate_sidebar()
                 self.labelNoValuesHint.hide()
 
@@ -1466,30 +2149,26 @@ class UiDialogMain(object):
     def remove_category(self):
         try:
             # Zuerst die ausgewählte Kategorie aus dem listWidget ermitteln
-            selected_item = self.listWidgetCategories.selectedItems()
+            selected_index = self.listViewCategories.currentIndex()
 
-            if not selected_item:
+            if not selected_index.isValid():
                 # Zeige eine Warnung an, wenn keine Kategorie ausgewählt wurde
                 QMessageBox.warning(Dialog, "Input Error", QCoreApplication.translate("remove_category",
                                                                                       "Please select a category to remove."))
                 return
 
             # Den Text der ausgewählten Kategorie extrahieren
-            category_to_remove = selected_item[0].text()
-
-            # Konfiguration laden
-            config = configparser.ConfigParser()
-            config.read(config_file)
+            category_to_remove = self.categoryModel.category(selected_index.row())
 
             # Prevent removing the last category
-            if len(config.sections()) == 1:
+            if len(self.repository.categories()) == 1:
                 QMessageBox.warning(Dialog, "Error",
                                     QCoreApplication.translate("remove_category",
                                                                "The category cannot be removed. There must be at least one category present."))
                 return
 
             # Überprüfen, ob die Kategorie existiert
-            if category_to_remove not in config.sections():
+            if not self.repository.has_category(category_to_remove):
                 QMessageBox.warning(Dialog, "Error",
                                     QCoreApplication.translate("remove_category",
                                                                f"An error occurred. Please try restarting the application."))
@@ -1506,12 +2185,11 @@ class UiDialogMain(object):
             if reply == QtWidgets.QMessageBox.No:
                 return
 
-            # Die Kategorie aus der Konfiguration entfernen
-            config.remove_section(category_to_remove)
-
-            # Die aktualisierte Konfiguration zurück in die Datei schreiben
-            with open(config_file, 'w') as cfg:
-                config.write(cfg)
+            # Die Kategorie aus der Konfiguration entfernen und speichern
+            try:
+                self.repository.remove_category(category_to_remove)
+            except LastCategoryError:
+                return  # the last category was removed elsewhere in the meantime
 
             self.populate_sidebar()
             self.labelNoValuesHint.hide()
@@ -1520,103 +2198,45 @@ class UiDialogMain(object):
 
     def add_category(self):
         try:
-            # Load the existing configuration
-            config = configparser.ConfigParser()
-            config.read(config_file)
-
             # Open a QInputDialog to get the new category name
             new_category, ok = QInputDialog.getText(Dialog, "New category", QCoreApplication.translate("add_category",
                                                                                                        "Name of the new category:"))
 
             # If user clicked OK and entered a valid name
-            if ok and new_category:
-                new_category = new_category.strip()  # Remove leading/trailing spaces
-
-                # Check if category already exists
-                if new_category in config.sections():
+            if ok and new_category.strip():
+                try:
+                    # Add the new section to the config and save it (leading/trailing spaces are removed)
+                    self.repository.add_category(new_category)
+                except CategoryExistsError:
                     QMessageBox.warning(Dialog, "Category Exists", QCoreApplication.translate("add_category",
                                                                                               "A category with this name already exists."))
                     return
 
-                # Add the new section to the config
-                config.add_section(new_category)
-
-                # Save the updated config to the file
-                with open(config_file, 'w') as cfg:
-                    config.write(cfg)
-
                 self.populate_sidebar()
         except Exception as e:
             logging.error(e)
 
     def save_category_order(self):
         """ Saves the new order of categories (sections) to the INI file. """
-        config = configparser.ConfigParser()
-        config.read(config_file)
 
         # Get new category order from listWidget_2
-        new_order = [self.listWidgetCategories.item(i).text() for i in range(self.listWidgetCategories.count())]
-
-        # Recreate the config with new order
-        new_config = configparser.ConfigParser()
-        for section in new_order:
-            new_config.add_section(section)
-            for key, value in config[section].items():
-                new_config.set(section, key, value)
+        new_order = self.categoryModel.categories()
 
-        # Write back to file
-        with open(config_file, 'w') as cfg:
-            new_config.write(cfg)
+        # Recreate the config with new order and save it
+        self.repository.reorder_categories(new_order)
 
+    @timed("save_title_order")
     def save_title_order(self):
         """Saves the new order of items in the selected category to the INI file."""
 
         try:
             global current_section
-            config = configparser.ConfigParser()
-            config.read(config_file)
-
-            keys = []
-            for i in range(self.listWidget.count()):
-                item_title = self.listWidget.item(i).text()
-
-                # Check if the title ends with the lock emoji
-                if item_title.endswith("🔒"):
-                    item_title = item_title.replace(" 🔒", "_encrypted")  # Replace lock emoji with _encrypted
 
-                keys.append(item_title)  # Add modified title to the list
+            # Titles (without lock emoji) in the order shown in the list
+            titles = self.snippetModel.titles()
 
-            # Create a new ordered dictionary to store the updated key-value pairs
-            new_section_data = {}
-
-            # Iterate through the reordered keys from the QListWidget
-            for index, key in enumerate(keys, 1):  # Start enumeration from 1 for consistency with item numbering
-                # Generate new title and content keys based on their new positions
-                title_key = f"item{index}_title"
-                content_key = f"item{index}_content"
-
-                # Find the original key that matches the current key value and ends with "_title"
-                old_title_key = [
-                    k for k in config[current_section]
-                    if config[current_section][k] == key and k.endswith("_title")
-                ]
-
-                if old_title_key:  # If a matching key is found
-                    # Find the corresponding content key by replacing "_title" with "_content"
-                    old_content_key = old_title_key[0].replace("_title", "_content")
-
-                    # Store the reordered keys and their values in the new dictionary
-                    new_section_data[title_key] = config[current_section][old_title_key[0]]
-                    new_section_data[content_key] = config[current_section][old_content_key]
-
-            # At the end of the loop, new_section_data will contain the reordered key-value pairs
-
-            # Update the section in the config with the new ordered dictionary
-            config[current_section] = new_section_data
-
-            # Save the updated config back to the file
-            with open(config_file, "w") as cfg:
-                config.write(cfg)
+            # Write the new order of the item IDs to the order key of the section and save, the items keep their IDs
+            self.repository.reorder(current_section, titles)
 
         except Exception as e:
             logging.error(e)
@@ -1624,56 +2244,36 @@ class UiDialogMain(object):
 
     def rename_title(self):
         """
-        Renames the selected item in listWidget and updates the INI configuration.
+        Renames the selected item in listView and updates the INI configuration.
         """
         global current_section
 
         # Get the selected item from the list
-        selected_item = self.listWidget.currentItem()
-        if not selected_item:
+        selected_index = self.listView.currentIndex()
+        if not selected_index.isValid():
             QtWidgets.QMessageBox.warning(
                 Dialog, "Error",
                 QCoreApplication.translate("rename_title", "Please select a title from the list first.")
             )
             return
 
-        old_title = selected_item.text().replace(" 🔒", "")  # Remove lock emoji if present
-        is_encrypted = False  # To track if the content is encrypted
+        old_title = self.snippetModel.title(selected_index.row())  # title without the lock emoji
 
         try:
-            config = configparser.ConfigParser()
-            config.read(config_file)
-
-            if current_section not in config.sections():
+            if not self.repository.has_category(current_section):
                 QtWidgets.QMessageBox.warning(
                     Dialog, "Error",
                     QCoreApplication.translate("rename_title", "The current category was not found.")
                 )
                 return
 
-            # Find the key for the selected title
-            key_to_rename = None
-            content_key = None
-            original_config_value = None
-
-            for key, value in config[current_section].items():
-                if key.endswith("_title") and value.replace("_encrypted", "") == old_title:
-                    key_to_rename = key
-                    original_config_value = value  # Store the original config value
-                    content_key = key.replace("_title", "_content")  # The corresponding content key
-                    break
-
-            if not key_to_rename:
+            if not self.repository.has_title(current_section, old_title):
                 QtWidgets.QMessageBox.warning(
                     Dialog, "Error",
                     QCoreApplication.translate("rename_title", "Error renaming the title.")
                 )
                 return
 
-            # Check if the original content is encrypted
-            if original_config_value.endswith("_encrypted"):
-                is_encrypted = True
-
             # Ask the user for a new name
             new_title, ok = QtWidgets.QInputDialog.getText(
                 Dialog, "Rename",
@@ -1684,36 +2284,25 @@ class UiDialogMain(object):
             if not ok or not new_title.strip():  # If cancelled or empty input
                 return
 
-            new_title = new_title.strip()  # Trim spaces
-
-            # Check if the new title already exists
-            existing_titles = [
-                config[current_section][k].replace("_encrypted", "")
-                for k in config[current_section] if k.endswith("_title")
-            ]
-
-            if new_title in existing_titles:
+            try:
+                # Rename the title in the config and save (keeps _encrypted if the content is encrypted)
+                new_title = self.repository.rename(current_section, old_title, new_title)
+            except TitleExistsError:
                 QtWidgets.QMessageBox.warning(
                     Dialog, "Error",
                     QCoreApplication.translate("rename_title", "A title with this name already exists.")
                 )
                 return
+            except InvalidNameError:
+                QtWidgets.QMessageBox.warning(
+                    Dialog, "Error",
+                    QCoreApplication.translate("rename_title", "A title cannot end with \"_encrypted\".")
+                )
+                return
 
-            # Preserve encryption status: if the original title had encrypted content, keep _encrypted
-            if is_encrypted:
-                new_title += "_encrypted"
-
-            # Rename the title in the config
-            config[current_section][key_to_rename] = new_title
-
-            # Save changes to the config
-            with open(config_file, 'w') as cfg:
-                config.write(cfg)
-
-            # Update the GUI (list widget and showcase title)
-            display_title = new_title.replace("_encrypted", "")  # Show title without "_encrypted" in the UI
-            selected_item.setText(display_title + (" 🔒" if is_encrypted else ""))  # Add lock icon if encrypted
-            self.labelShowcaseTitle.setText(display_title)
+            # Update the GUI (list view and showcase title), the model adds the lock icon if encrypted
+            self.snippetModel.rename_title(selected_index.row(), new_title)
+            self.labelShowcaseTitle.setText(new_title)
 
         except Exception as e:
             logging.error(f"Error in (rename title): {e}")
@@ -1723,20 +2312,18 @@ class UiDialogMain(object):
 
     def remove_title(self, key):
         """
-        Removes the selected item from listWidget and updates the INI configuration.
+        Removes the selected item from listView and updates the INI configuration.
         """
         global current_section
 
-        # Get the selected item from listWidget
-        selected_item = self.listWidget.currentItem()
-        if not selected_item:
+        # Get the selected item from listView
+        selected_index = self.listView.currentIndex()
+        if not selected_index.isValid():
             QtWidgets.QMessageBox.warning(Dialog, "Selection Error", QCoreApplication.translate("remove_title",
                                                                                                 "Please select a value from the list first."))
             return
 
-        item_title = selected_item.text()  # Get the title of the selected item
-        if item_title.endswith("🔒"):
-            item_title = item_title.replace(" 🔒", "")  # Remove lock emoji if present
+        item_title = self.snippetModel.title(selected_index.row())  # Get the title (without lock emoji)
 
         # Confirm deletion
         reply = QtWidgets.QMessageBox.question(Dialog, "remove value", QCoreApplication.translate("remove_title",
@@ -1749,87 +2336,35 @@ class UiDialogMain(object):
 
         # Load the config file
         try:
-            config = configparser.ConfigParser()
-            config.read(config_file)
-
-            if current_section not in config.sections():
+            if not self.repository.has_category(current_section):
                 QtWidgets.QMessageBox.warning(
                     Dialog, "Error",
                     QCoreApplication.translate("remove_title", "The current category was not found.")
                 )
                 return
 
-            # Find the key index for the selected title
-            key_index_to_remove = None
-            for key, value in config[current_section].items():
-                if key.endswith("_title") and value == item_title + "_encrypted":
-                    key_index_to_remove = int(key.replace("item", "").replace("_title", ""))
-                    break
-                elif key.endswith("_title") and value == item_title:
-                    key_index_to_remove = int(key.replace("item", "").replace("_title", ""))
-                    break
-
-            if key_index_to_remove is None:
+            try:
+                # Remove the title and its content and drop its ID from the order key, then save
+                self.repository.remove(current_section, item_title)
+            except TitleNotFoundError:
                 QtWidgets.QMessageBox.warning(
                     Dialog, "Error",
                     QCoreApplication.translate("remove_title", "Title not found.")
                 )
                 return
 
-            # Remove the title and its corresponding content
-            config.remove_option(current_section, f"item{key_index_to_remove}_title")
-            config.remove_option(current_section, f"item{key_index_to_remove}_content")
-
-            # Collect remaining titles and contents in order
-            items = []
-            for key, value in config[current_section].items():
-                if key.endswith("_title"):
-                    index = int(key.replace("item", "").replace("_title", ""))
-                    content_key = f"item{index}_content"
-                    content_value = config[current_section].get(content_key,
-                                                                "")  # Get content (default to empty string)
-                    items.append((index, value, content_value))
-
-            # Sort by original index to maintain order
-            items.sort()
-
-            # Clear the section
-            for key in list(config[current_section].keys()):
-                config.remove_option(current_section, key)
-
-            # Rewrite the keys with updated numbering
-            for new_index, (_, title_value, content_value) in enumerate(items, start=1):
-                # Preserve _encrypted suffix if needed for the title and content
-                if content_value.endswith("_encrypted"):
-                    config.set(current_section, f"item{new_index}_title", title_value + "_encrypted")
-                else:
-                    config.set(current_section, f"item{new_index}_title", title_value)
-
-                # Save content with or without _encrypted as needed
-                if content_value.endswith("_encrypted"):
-                    config.set(current_section, f"item{new_index}_content", content_value)
-                else:
-                    config.set(current_section, f"item{new_index}_content", content_value)
-
-            # Save changes to the config file
-            with open(config_file, 'w') as cfg:
-                config.write(cfg)
+            # Remove item from listView
+            self.snippetModel.remove_title(selected_index.row())
 
-            # Remove item from listWidget
-            self.listWidget.takeItem(self.listWidget.row(selected_item))
-
-            logging.info(f"Removed Key / Title: {item_title} from {current_section}.")
+            logging.info("Removed a title")  # no titles in the log, they can be confidential
         except Exception as e:
             logging.error(e)
 
     def add_title(self):
         global current_section
-        # Load the existing configuration
-        config = configparser.ConfigParser()
-        config.read(config_file)
 
         # Ensure the selected section exists
-        if current_section not in config.sections():
+        if not self.repository.has_category(current_section):
             QMessageBox.warning(Dialog, "Error",
                                 QCoreApplication.translate("add_title",
                                                            "An error occurred. Try restarting the application."))
@@ -1840,56 +2375,32 @@ class UiDialogMain(object):
                                                                                              "Name of the new title:"))
 
         # If user clicked OK and entered a valid title
-        if ok and new_title:
-            new_title = new_title.strip()  # Remove leading/trailing spaces
-
-            # Check if the title already exists in the selected section
-            existing_titles = [config[current_section][key] for key in config[current_section] if
-                               key.endswith("_title")]
-
-            if new_title in existing_titles:
+        if ok and new_title.strip():
+            try:
+                # Save title as the next itemN and leave content empty (leading/trailing spaces are removed)
+                snippet = self.repository.add(current_section, new_title, " ")  # Default empty content
+            except TitleExistsError:
+                # The title (encrypted or not) already exists in the selected section
                 QMessageBox.warning(Dialog, "Value already exists",
                                     QCoreApplication.translate("add_title",
                                                                f"This title already exists in the category") + f"\n\n{current_section}.")
                 return
-            if new_title + "_encrypted" in existing_titles:
-                QMessageBox.warning(Dialog, "Value already exists",
-                                    QCoreApplication.translate("add_title",
-                                                               f"This title already exists in the category") + f"\n\n{current_section}.")
+            except InvalidNameError:
+                QMessageBox.warning(Dialog, "Error",
+                                    QCoreApplication.translate("add_title", "A title cannot end with \"_encrypted\"."))
                 return
 
-            # Add the title to the QListWidget
-            item = QtWidgets.QListWidgetItem(new_title)
-            item.setSizeHint(QSize(100, 35))
-            item.setTextAlignment(Qt.AlignCenter)
-            self.listWidget.addItem(item)
-
-            # Generate a unique index
-            existing_keys = [key for key in config[current_section] if key.endswith("_title")]
-            new_index = len(existing_keys) + 1  # Example: item1, item2, item3...
-
-            # Define keys for title and content
-            title_key = f"item{new_index}_title"
-            content_key = f"item{new_index}_content"
-
-            # Save title and leave content empty
-            config[current_section][title_key] = new_title
-            config[current_section][content_key] = " "  # Default empty content
-
-            # Save the updated configuration
-            with open(config_file, 'w') as cfg:
-                config.write(cfg)
+            # Add the title to the list
+            self.snippetModel.append_title(snippet.title)
 
             self.labelNoValuesHint.hide()
 
-            logging.info(f"Added new Key / Title: {new_title} to {current_section}")
+            logging.info("Added a new title")
 
     def add_encrypted_title(self):
         global current_section
-        config = configparser.ConfigParser()
-        config.read(config_file)
 
-        if current_section not in config.sections():
+        if not self.repository.has_category(current_section):
             QMessageBox.warning(Dialog, "Error",
                                 QCoreApplication.translate("add_encrypted_title", "An error occurred. Try restarting the application."))
             return
@@ -1901,14 +2412,11 @@ class UiDialogMain(object):
             return
 
         new_title = new_title.strip()
-        existing_titles = [config[current_section][key] for key in config[current_section] if key.endswith("_title")]
-
-        if new_title in existing_titles:
-            QMessageBox.warning(Dialog, "Value already exists",
-                                QCoreApplication.translate("add_encrypted_title", "This title already exists in the currently selected category.") + f"\n\n{current_section}.")
+        if new_title.endswith("_encrypted"):
+            QMessageBox.warning(Dialog, "Error",
+                                QCoreApplication.translate("add_title", "A title cannot end with \"_encrypted\"."))
             return
-
-        if new_title + "_encrypted" in existing_titles:
+        if self.repository.has_title(current_section, new_title):
             QMessageBox.warning(Dialog, "Value already exists",
                                 QCoreApplication.translate("add_encrypted_title",
                                                            f"This title already exists in the currently selected category") + f"\n\n{current_section}.")
@@ -1927,29 +2435,32 @@ class UiDialogMain(object):
         if not ok or not password.strip():
             return
 
-        item = QtWidgets.QListWidgetItem(new_title + " 🔒")  # Indicate encrypted item
-        item.setSizeHint(QSize(100, 35))
-        item.setTextAlignment(Qt.AlignCenter)
-        self.listWidget.addItem(item)
+        section = current_section
+        self.snippetModel.append_title(new_title, encrypted=True)  # shown with a lock
+        self.snippetModel.set_busy(section, new_title, True)  # until the content is encrypted
+        self.labelNoValuesHint.hide()
 
-        existing_keys = [key for key in config[current_section] if key.endswith("_title")]
-        new_index = len(existing_keys) + 1
+        def done(encrypted_content):
+            self.snippetModel.set_busy(section, new_title, False)
+            if encrypted_content is None:
+                if self.snippetModel.section == section and self.snippetModel.row_of(new_title) >= 0:
+                    self.snippetModel.remove_title(self.snippetModel.row_of(new_title))
+                QMessageBox.warning(Dialog, "FastFill Error", QCoreApplication.translate(
+                    "add_encrypted_title", "The content could not be encrypted and was not saved."))
+                return
 
-        title_key = f"item{new_index}_title"
-        content_key = f"item{new_index}_content"
+            try:
+                self.repository.add(section, new_title, encrypted_content, encrypted=True)
+            except RepositoryError as e:
+                # The category was removed or the title added elsewhere while the content was encrypted
+                logging.error(f"Encrypted title not added: {type(e).__name__}")
+                if self.snippetModel.section == section and self.snippetModel.row_of(new_title) >= 0:
+                    self.snippetModel.remove_title(self.snippetModel.row_of(new_title))
+                return
+            logging.info("Added a new encrypted title")
 
         # Encrypt content
-        encrypted_content = self.encrypt_data(password, new_content)
-
-        new_title = new_title + "_encrypted"
-        config[current_section][title_key] = new_title
-        config[current_section][content_key] = encrypted_content
-
-        with open(config_file, 'w') as cfg:
-            config.write(cfg)
-
-        self.labelNoValuesHint.hide()
-        logging.info(f"Added new encrypted Key / Title: {new_title} to {current_section}")
+        self.cryptoWorker.encrypt(password, new_content, self.key_cache, self.kdf_params, on_done=done)
 
     def show_dialog(self):
         """
@@ -1974,6 +2485,12 @@ class UiDialogMain(object):
 
             clipboard.clear()
             logging.info("Exiting application via Tray Icon")
+            self.cancel_decrypt()
+            self.cryptoWorker.wait(5000)  # let running encryptions finish
+            QApplication.processEvents()  # their results save the encrypted values
+            self.key_cache.lock()  # Wipe the keys of the unlocked session
+            self.store.flush()  # Write pending config changes
+            self.usage.flush()
             QApplication.quit()
             sys.exit()
         except Exception as e:
@@ -1995,6 +2512,14 @@ class UiDialogMain(object):
         """
         try:
             logging.info("restarting Application...")
+            self.cancel_decrypt()
+            self.cryptoWorker.wait(5000)  # let running encryptions finish
+            QApplication.processEvents()  # their results save the encrypted values
+            self.key_cache.lock()
+            self.store.flush()  # Write pending config changes before the new instance reads the config
+            self.usage.flush()
+            if self.hotkeyBackend is not None:
+                self.hotkeyBackend.unregister()  # so the new instance can register it
             logging.info("opening new exe...")
             exe_path = os.path.abspath(sys.argv[0])  # Get the path of FastFill.exe
             subprocess.Popen([exe_path], shell=True)  # Run exe
@@ -2004,6 +2529,7 @@ class UiDialogMain(object):
             logging.error(e)
 
     def show_toast_notification(self, title, text, duration):
+        from pyqttoast import Toast, ToastPreset, ToastPosition
 
         # If a toast is already showing, hide it before creating a new one
         if self.current_toast:
@@ -2026,68 +2552,16 @@ class UiDialogMain(object):
 
         self.current_toast.show()
 
-    # Generate a strong encryption key from a password
-    def derive_key(self, password: str, salt: bytes) -> bytes:
-        try:
-            kdf = PBKDF2HMAC(
-                algorithm=hashes.SHA256(),
-                length=32,
-                salt=salt,
-                iterations=100000,
-                backend=default_backend()
-            )
-            return kdf.derive(password.encode())
-        except Exception as e:
-            logging.error(e)
-
-    # Encrypt datc
-    def encrypt_data(self, password: str, plaintext: str) -> str:
-        try:
-            salt = os.urandom(16)  # Generate a new salt
-            key = self.derive_key(password, salt)
-            iv = os.urandom(16)  # Generate a random IV
-
-            cipher = Cipher(algorithms.AES(key), modes.CBC(iv), backend=default_backend())
-            encryptor = cipher.encryptor()
-
-            # Pad plaintext to be a multiple of 16 bytes (AES block size)
-            padding_length = 16 - (len(plaintext) % 16)
-            padded_plaintext = plaintext + chr(padding_length) * padding_length
-
-            ciphertext = encryptor.update(padded_plaintext.encode()) + encryptor.finalize()
-
-            return base64.b64encode(salt + iv + ciphertext).decode()  # Store salt, iv, and ciphertext together
-        except Exception as e:
-            logging.error(e)
-
-    # Decrypt data
-    def decrypt_data(self, password: str, encrypted_data: str) -> str:
-        try:
-            data = base64.b64decode(encrypted_data)
-            salt, iv, ciphertext = data[:16], data[16:32], data[32:]
-
-            key = self.derive_key(password, salt)
-            cipher = Cipher(algorithms.AES(key), modes.CBC(iv), backend=default_backend())
-            decryptor = cipher.decryptor()
-
-            decrypted_padded = decryptor.update(ciphertext) + decryptor.finalize()
-
-            # Remove padding
-            padding_length = decrypted_padded[-1]
-            return decrypted_padded[:-padding_length].decode()
-        except Exception as e:
-            logging.error(e)
-
 
 class UpdateProgressDialog(QDialog):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, title="Updating FastFill", text="Downloading update..."):
         super().__init__(parent)
-        self.setWindowTitle("Updating FastFill")
+        self.setWindowTitle(title)
         self.setFixedSize(300, 150)
 
         layout = QVBoxLayout(self)
 
-        self.label = QLabel("Downloading update...", self)
+        self.label = QLabel(text, self)
         layout.addWidget(self.label)
 
         self.progress_bar = QProgressBar(self)
@@ -2098,10 +2572,21 @@ class UpdateProgressDialog(QDialog):
         self.cancel_button.clicked.connect(self.reject)
         layout.addWidget(self.cancel_button)
 
+    def set_progress(self, received, total):
+        if total > 0:
+            self.progress_bar.setRange(0, 100)
+            self.progress_bar.setValue(int(received * 100 / total))
+            self.label.setText(f"{received / 1048576:.1f} / {total / 1048576:.1f} MB")
+        else:
+            self.progress_bar.setRange(0, 0)  # size unknown, busy indicator
+            self.label.setText(f"{received / 1048576:.1f} MB")
+
 
 if __name__ == '__main__':
     try:
         app = QApplication(sys.argv)
+        app.aboutToQuit.connect(config_store.flush)  # Write pending config changes on every way out
+        startup_timer.mark("qt")
 
         settings = QSettings(str(settings_file), QSettings.IniFormat)
         start_minimized = settings.value("App/start_minimized", False, type=bool)
@@ -2110,17 +2595,26 @@ if __name__ == '__main__':
         ui = UiDialogMain()
         ui.setupUi(Dialog)
         ui.dialog = Dialog  # saves the Dialog-Object
+        app.aboutToQuit.connect(ui.key_cache.lock)  # Wipe the keys of the unlocked session
+        app.aboutToQuit.connect(ui.usage.flush)
+        startup_timer.mark("window")
 
         # Create tray icon (this should happen after setting up the dialog)
         ui.create_tray_icon(Dialog)
-
+        startup_timer.mark("tray")
 
         if not start_minimized:
             Dialog.show()
+            startup_timer.mark("show")
 
         logging.info("FastFill application started.")  #
+        logging.info(startup_timer.summary())
 
-        check_for_update()
+        # Everything else waits until the event loop runs, so it does not delay the tray icon and the window
+        QTimer.singleShot(0, ui.searchIndex.rebuild)
+        QTimer.singleShot(0, ui.titleIndex.rebuild)
+        QTimer.singleShot(0, lambda: ui.setup_quick_paste(create_hotkey_backend(app)))
+        QTimer.singleShot(UPDATE_CHECK_DELAY_MS, check_for_update)
 
         sys.exit(app.exec_())
     except Exception as e:
@@ -0,0 +1,22 @@
+# The tests run without a display (offscreen Qt platform) and main.py keeps its files in a temporary APPDATA.
+import os
+import sys
+import tempfile
+
+import pytest
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC)
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ["APPDATA"] = tempfile.mkdtemp(prefix="FastFill-tests-")  # read when main.py is imported
+os.makedirs(os.path.join(os.environ["APPDATA"], "FastFill"))
+with open(os.path.join(os.environ["APPDATA"], "FastFill", "settings.ini"), "w") as settings_file:
+    # A saved KDF cost, so the main window does not calibrate the key derivation in the background
+    settings_file.write("[App]\nfirst_run = false\n\n[Security]\nkdf = scrypt\nkdf_cost_scrypt = 15\n")
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication(sys.argv[:1])
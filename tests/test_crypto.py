@@ -0,0 +1,99 @@
+# Encrypted values in the current (v2) and the legacy format, and wiping the keys of an unlocked session.
+import base64
+import os
+
+import pytest
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+from fastfill.core import crypto
+
+FAST_SCRYPT = crypto.KdfParams(crypto.KDF_SCRYPT, crypto.MIN_SCRYPT_LOG_N, 8, 1)
+FAST_PBKDF2 = crypto.KdfParams(crypto.KDF_PBKDF2, crypto.MIN_PBKDF2_ITERATIONS, 0, 0)
+
+
+def legacy_value(password, plaintext):
+    """
+    Encrypts like FastFill up to 2.x: base64(salt + iv + AES-CBC ciphertext) with PKCS7 padding.
+    """
+    salt, iv = os.urandom(crypto.SALT_SIZE), os.urandom(crypto.IV_SIZE)
+    key = crypto.derive_key(password, salt, crypto.LEGACY_PARAMS)
+    data = plaintext.encode()
+    padding = 16 - len(data) % 16
+    encryptor = Cipher(algorithms.AES(key), modes.CBC(iv)).encryptor()
+    ciphertext = encryptor.update(data + bytes([padding]) * padding) + encryptor.finalize()
+    return base64.b64encode(salt + iv + ciphertext).decode()
+
+
+@pytest.mark.parametrize("params", [FAST_SCRYPT, FAST_PBKDF2])
+def test_round_trip(params):
+    value = crypto.encrypt_data("secret", "Street 1\nTown", params=params)
+    assert not crypto.is_legacy(value)
+    assert crypto.params_of(value)[1] == params
+    assert crypto.decrypt_data("secret", value) == "Street 1\nTown"
+    assert crypto.decrypt_data("wrong", value) is None
+
+
+def test_changed_value_is_detected():
+    value = crypto.encrypt_data("secret", "text", params=FAST_SCRYPT)
+    data = bytearray(base64.b64decode(value[len(crypto.FORMAT_PREFIX):]))
+    data[-1] ^= 1
+    assert crypto.decrypt_data("secret", crypto.FORMAT_PREFIX + base64.b64encode(bytes(data)).decode()) is None
+
+
+def test_legacy_value_is_decrypted():
+    value = legacy_value("secret", "old text")
+    assert crypto.is_legacy(value)
+    assert crypto.params_of(value)[1] == crypto.LEGACY_PARAMS
+    assert crypto.decrypt_data("secret", value) == "old text"
+    assert crypto.decrypt_data("wrong", value) is None
+
+
+def test_cached_key_is_only_reused_with_the_same_params():
+    key_cache = crypto.KeyCache(enabled=True)
+    legacy = legacy_value("secret", "old text")
+    assert crypto.decrypt_data("secret", legacy, key_cache) == "old text"
+    assert crypto.decrypt_cached(legacy, key_cache) == "old text"
+
+    # Only the legacy key is cached, the value is not re-saved with its parameters
+    assert crypto.encrypt_cached("new text", legacy, key_cache, FAST_SCRYPT) is None
+
+    first = crypto.encrypt_data("secret", "one", key_cache, FAST_SCRYPT)
+    second = crypto.encrypt_data("secret", "two", key_cache, FAST_SCRYPT)
+    assert crypto.params_of(first) == crypto.params_of(second)
+    assert crypto.params_of(first)[0] != crypto.params_of(legacy)[0]
+
+    migrated = crypto.encrypt_cached("new text", legacy, key_cache, FAST_SCRYPT)
+    assert crypto.params_of(migrated) == crypto.params_of(first)
+    assert crypto.decrypt_data("secret", migrated) == "new text"
+
+
+def test_lock_wipes_the_keys():
+    key_cache = crypto.KeyCache(enabled=True)
+    value = crypto.encrypt_data("secret", "text", key_cache, FAST_SCRYPT)
+    salt, _ = crypto.params_of(value)
+    key = key_cache.get(salt)
+    assert any(key)
+
+    key_cache.lock()
+    assert not any(key)  # the bytearray handed out before is zeroed as well
+    assert len(key_cache) == 0
+    assert crypto.decrypt_cached(value, key_cache) is None
+    with pytest.raises(ValueError):
+        crypto.decrypt_with_key(key, value)
+    with pytest.raises(ValueError):
+        crypto.encrypt_with_key(key, salt, FAST_SCRYPT, "text")
+
+
+def test_idle_and_disabled_cache_wipe_the_keys():
+    key_cache = crypto.KeyCache(enabled=True, idle_timeout=0)
+    crypto.encrypt_data("secret", "text", key_cache, FAST_SCRYPT)
+    assert len(key_cache) == 1
+    key_cache.expire()
+    assert len(key_cache) == 0
+
+    key_cache = crypto.KeyCache(enabled=True)
+    crypto.encrypt_data("secret", "text", key_cache, FAST_SCRYPT)
+    key_cache.set_enabled(False)
+    assert len(key_cache) == 0
+    crypto.encrypt_data("secret", "text", key_cache, FAST_SCRYPT)
+    assert len(key_cache) == 0
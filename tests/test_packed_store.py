@@ -0,0 +1,49 @@
+# PackedStore keeping titles and bodies across a restart, and exporting them back to FastFillConfig.ini.
+import pytest
+
+from fastfill.core.packed_store import PackedStore
+from fastfill.core.store import ConfigStore
+
+LONG_BODY = "line of a long text\n" * 5000
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return str(tmp_path / "FastFill.idx"), str(tmp_path / "FastFillConfig.ini")
+
+
+def test_round_trip(paths):
+    index_path, ini_path = paths
+    store = PackedStore(index_path, ini_path, save_delay=60)
+    store.add_section("Work")
+    store.add_snippets("Work", [("Mail", "me@example.com", False), ("Letter", LONG_BODY, False),
+                                ("Secret", "$ff2$ciphertext", True)])
+    store.set_content("Work", "Mail", "new@example.com")
+    store.rename_snippet("Work", "Letter", "Long letter")
+    store.reorder_snippets("Work", ["Secret", "Mail"])
+    store.save()
+    store.flush()
+
+    reopened = PackedStore(index_path, ini_path)
+    assert reopened.sections() == ["Work"]
+    assert reopened.titles("Work") == [("Secret", True), ("Mail", False), ("Long letter", False)]
+    assert reopened.get_content("Work", "Mail") == "new@example.com"
+    assert reopened.get_content("Work", "Long letter") == LONG_BODY
+    assert reopened.get_content("Work", "Secret") == "$ff2$ciphertext"
+
+    exported = ConfigStore(ini_path)
+    assert exported.titles("Work") == reopened.titles("Work")
+    assert exported.get_content("Work", "Mail") == "new@example.com"
+
+
+def test_ini_is_imported_when_the_store_is_created(paths):
+    index_path, ini_path = paths
+    config = ConfigStore(ini_path, save_delay=0)
+    config.add_section("Home")
+    config.add_snippets("Home", [("Wifi", "password", False), ("Alarm", "0000", False)])
+    config.save()
+    config.flush()
+
+    store = PackedStore(index_path, ini_path)
+    assert store.titles("Home") == [("Wifi", False), ("Alarm", False)]
+    assert store.get_content("Home", "Alarm") == "0000"
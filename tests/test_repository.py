@@ -0,0 +1,104 @@
+# SnippetRepository on a ConfigStore: validation, duplicates, renames, moves and batches.
+import pytest
+
+from fastfill.core.repository import (CategoryExistsError, CategoryNotFoundError, InvalidNameError,
+                                      LastCategoryError, SnippetRepository, TitleExistsError, TitleNotFoundError)
+from fastfill.core.store import ConfigStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ConfigStore(str(tmp_path / "FastFillConfig.ini"), save_delay=60)
+    yield store
+    store.flush()
+
+
+@pytest.fixture
+def repository(store):
+    repository = SnippetRepository(store)
+    repository.add_category("Work")
+    repository.add_many("Work", [("Mail", "me@example.com"), ("Phone", "123"), ("Address", "Street 1")])
+    return repository
+
+
+def titles(repository, section="Work"):
+    return [title for title, _ in repository.titles(section)]
+
+
+def test_names_are_checked(repository):
+    assert repository.add_category("  Home  ") == "Home"
+    with pytest.raises(CategoryExistsError):
+        repository.add_category("Home")
+    with pytest.raises(InvalidNameError):
+        repository.add("Work", "   ", "content")
+    with pytest.raises(InvalidNameError):
+        repository.add("Work", "Two\nlines", "content")
+    with pytest.raises(InvalidNameError):
+        repository.add("Work", "Secret_encrypted", "content")
+    with pytest.raises(CategoryNotFoundError):
+        repository.add("Missing", "Title", "content")
+
+
+def test_add_many_adds_nothing_on_a_duplicate(repository):
+    with pytest.raises(TitleExistsError):
+        repository.add_many("Work", [("New", "1"), ("Mail", "2")])
+    assert titles(repository) == ["Mail", "Phone", "Address"]
+
+
+def test_rename_keeps_position_and_encryption(repository):
+    repository.add("Work", "Secret", "ciphertext", encrypted=True)
+    assert repository.rename("Work", "Secret", " Vault ") == "Vault"
+    assert repository.get("Work", "Vault").encrypted
+    assert repository.rename("Work", "Phone", "Mobile") == "Mobile"
+    assert titles(repository) == ["Mail", "Mobile", "Address", "Vault"]
+    with pytest.raises(TitleExistsError):
+        repository.rename("Work", "Mail", "Address")
+    with pytest.raises(TitleNotFoundError):
+        repository.rename("Work", "Phone", "Other")
+
+
+def test_remove_and_reorder(repository):
+    repository.remove("Work", "Phone")
+    assert repository.remove_many("Work", ["Address", "Missing"]) == 1
+    repository.add_many("Work", [("B", "b"), ("C", "c")])
+    repository.reorder("Work", ["C", "Mail"])
+    assert titles(repository) == ["C", "Mail", "B"]
+    with pytest.raises(TitleNotFoundError):
+        repository.remove("Work", "Phone")
+
+
+def test_move_within_and_between_categories(repository):
+    repository.move("Work", "Address", 0)
+    assert titles(repository) == ["Address", "Mail", "Phone"]
+
+    repository.add_category("Home")
+    repository.add("Home", "Wifi", "password")
+    repository.move("Work", "Mail", 0, to_section="Home")
+    assert titles(repository) == ["Address", "Phone"]
+    assert titles(repository, "Home") == ["Mail", "Wifi"]
+    assert repository.get("Home", "Mail").content == "me@example.com"
+
+
+def test_last_category_cannot_be_removed(repository):
+    repository.add_category("Home")
+    repository.remove_category("Home")
+    with pytest.raises(LastCategoryError):
+        repository.remove_category("Work")
+
+
+def test_add_batch_resolves_duplicates(repository):
+    rows = [("Work", "Mail", "other", False), ("Home", "Wifi", "pw", False), ("Home", "Wifi", "again", False),
+            ("Home", "", "no title", False)]
+
+    result = repository.add_batch(iter(rows), on_duplicate="rename")
+    assert (result.added, result.renamed, result.skipped, result.invalid) == (3, 2, 0, 1)
+    assert titles(repository) == ["Mail", "Phone", "Address", "Mail (2)"]
+    assert titles(repository, "Home") == ["Wifi", "Wifi (2)"]
+    assert result.problems[0] == "Row 1: Mail (Work) already exists, added as Mail (2)"
+
+    result = repository.add_batch(rows, on_duplicate="skip")
+    assert (result.added, result.skipped, result.invalid) == (0, 3, 1)
+
+    with pytest.raises(TitleExistsError):
+        repository.add_batch(rows + [("Work", "New", "", False)], on_duplicate="error")
+    assert not repository.has_title("Work", "New")
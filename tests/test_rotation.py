@@ -0,0 +1,31 @@
+# rotate_password re-encrypting values of several keys, and leaving values of another password alone.
+from fastfill.core import crypto
+from fastfill.core.rotation import rotate_password
+
+PARAMS = crypto.KdfParams(crypto.KDF_SCRYPT, crypto.MIN_SCRYPT_LOG_N, 8, 1)
+
+
+def test_values_get_the_new_password():
+    entries = [("Work", "Mail", crypto.encrypt_data("old", "me@example.com", params=PARAMS)),
+               ("Work", "Pin", crypto.encrypt_data("old", "1234", params=PARAMS)),
+               ("Home", "Wifi", crypto.encrypt_data("other", "password", params=PARAMS)),
+               ("Home", "Broken", "$ff2$not base64")]
+    progress = []
+
+    result = rotate_password(entries, "old", "new", PARAMS, progress=lambda done, total: progress.append(done))
+
+    assert sorted(result.skipped) == [("Home", "Broken"), ("Home", "Wifi")]
+    assert sorted((section, title) for section, title, _, _ in result.changes) == [("Work", "Mail"), ("Work", "Pin")]
+    old_values = {(section, title): value for section, title, value in entries}
+    new_values = [new_value for _, _, _, new_value in result.changes]
+    for section, title, old_value, _ in result.changes:
+        assert old_value == old_values[(section, title)]
+    assert {crypto.decrypt_data("new", value) for value in new_values} == {"me@example.com", "1234"}
+    assert crypto.decrypt_data("old", new_values[0]) is None
+    assert len({crypto.params_of(value) for value in new_values}) == 1  # one new key
+    assert progress[-1] == 4  # the new key and the three readable keys
+
+
+def test_cancel():
+    entries = [("Work", "Mail", crypto.encrypt_data("old", "me@example.com", params=PARAMS))]
+    assert rotate_password(entries, "old", "new", PARAMS, is_cancelled=lambda: True) is None
@@ -0,0 +1,43 @@
+# The category list of the main window is rebuilt after every change of the categories. Its click signal is
+# connected once in setupUi, so one click has to call on_section_item_click once, however often it was rebuilt.
+import pytest
+from PyQt5.QtCore import Qt
+from PyQt5.QtTest import QTest
+from PyQt5.QtWidgets import QDialog
+
+from conftest import SRC
+
+
+@pytest.fixture
+def window(qapp, monkeypatch):
+    monkeypatch.chdir(SRC)  # the icons are loaded relative to src
+    import main
+
+    clicks = []
+    monkeypatch.setattr(main.UiDialogMain, "on_section_item_click", lambda self, index: clicks.append(index.row()))
+    if not main.config_store.has_section("Category"):
+        main.config_store.add_section("Category")
+
+    dialog = QDialog()
+    monkeypatch.setattr(main, "app", qapp, raising=False)  # globals of the __main__ block
+    monkeypatch.setattr(main, "Dialog", dialog, raising=False)
+    ui = main.UiDialogMain()
+    ui.setupUi(dialog)
+    ui.dialog = dialog
+    dialog.show()
+    yield ui, clicks
+    ui.cryptoWorker.pool.waitForDone()
+    dialog.close()
+
+
+def test_one_click_after_rebuilds(window, qapp):
+    ui, clicks = window
+    for _ in range(100):
+        ui.populate_sidebar()
+    qapp.processEvents()
+
+    view = ui.listViewCategories
+    QTest.mouseClick(view.viewport(), Qt.LeftButton, pos=view.visualRect(view.model().index(0, 0)).center())
+    qapp.processEvents()
+
+    assert clicks == [0]
@@ -0,0 +1,84 @@
+# SqliteStore importing FastFillConfig.ini, and moved_positions giving new positions to as few titles as possible.
+import pytest
+
+from fastfill.core.sqlite_store import SqliteStore, moved_positions
+from fastfill.core.store import ConfigStore
+
+
+def write_ini(path, sections):
+    store = ConfigStore(str(path), save_delay=0)
+    for section, snippets in sections:
+        if not store.has_section(section):
+            store.add_section(section)
+        store.add_snippets(section, snippets)
+    store.save()
+    store.flush()
+
+
+@pytest.fixture
+def ini_path(tmp_path):
+    path = tmp_path / "FastFillConfig.ini"
+    write_ini(path, [("Work", [("Mail", "me@example.com", False), ("Secret", "$ff2$ciphertext", True)]),
+                     ("Home", [("Wifi", "password", False)])])
+    return str(path)
+
+
+@pytest.fixture
+def open_store(tmp_path, ini_path):
+    stores = []
+
+    def open_store():
+        store = SqliteStore(str(tmp_path / "FastFill.db"), ini_path)
+        stores.append(store)
+        return store
+    yield open_store
+    for store in stores:
+        store.close()
+
+
+def test_ini_is_imported_when_the_database_is_created(open_store):
+    store = open_store()
+    assert store.sections() == ["Work", "Home"]
+    assert store.titles("Work") == [("Mail", False), ("Secret", True)]
+    assert store.get_content("Work", "Secret") == "$ff2$ciphertext"
+
+
+def test_import_skips_existing_titles_or_replaces(tmp_path, open_store):
+    store = open_store()
+    other = tmp_path / "other.ini"
+    write_ini(other, [("Work", [("Mail", "other@example.com", False), ("Phone", "123", False)])])
+
+    assert store.import_ini(str(other)) == 1
+    assert store.titles("Work") == [("Mail", False), ("Secret", True), ("Phone", False)]
+    assert store.get_content("Work", "Mail") == "me@example.com"
+
+    assert store.import_ini(str(other), replace=True) == 2
+    assert store.sections() == ["Work"]
+    assert store.get_content("Work", "Mail") == "other@example.com"
+
+
+def test_changed_ini_is_imported_again(ini_path, open_store):
+    open_store().close()
+    write_ini(ini_path, [("Home", [("Alarm", "0000", False)])])
+
+    store = open_store()
+    assert store.titles("Home") == [("Wifi", False), ("Alarm", False)]
+
+
+def test_moved_positions():
+    positions = {"a": 1.0, "b": 2.0, "c": 3.0, "d": 4.0}
+
+    assert moved_positions(positions, ["a", "b", "c", "d"]) == {}
+    assert moved_positions(positions, ["d", "a", "b", "c"]) == {"d": 0.0}
+    assert moved_positions(positions, ["a", "b", "d", "c"]) == {"d": 2.5}
+    assert moved_positions(positions, ["a", "c", "d", "b"]) == {"b": 5.0}
+
+    order = ["d", "c", "b", "a"]
+    new_positions = dict(positions, **moved_positions(positions, order))
+    assert sorted(positions, key=new_positions.get) == order
+
+
+def test_moved_positions_renumber_when_out_of_precision():
+    # No float fits between a and b, so all titles are renumbered
+    positions = {"a": 1.0, "b": 1.0 + 2 ** -52, "c": 5.0, "d": 6.0}
+    assert moved_positions(positions, ["a", "d", "b", "c"]) == {"d": 2.0, "b": 3.0, "c": 4.0}
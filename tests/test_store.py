@@ -0,0 +1,80 @@
+# ConfigStore merging the changes someone else wrote to the config file with its own unsaved changes.
+import glob
+import os
+
+import pytest
+
+from fastfill.core.store import ConfigStore
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = str(tmp_path / "FastFillConfig.ini")
+    store = ConfigStore(path, save_delay=0)
+    store.add_section("Work")
+    store.add_snippets("Work", [("Mail", "me@example.com", False), ("Phone", "123", False),
+                                ("Address", "Street 1", False)])
+    store.save()
+    store.flush()
+    return path
+
+
+def edit_file(path, change):
+    """
+    Changes the config file like another program would, through a second store.
+    """
+    other = ConfigStore(path, save_delay=0)
+    change(other)
+    other.save()
+    other.flush()
+
+
+def test_changes_on_both_sides_are_merged(path):
+    store = ConfigStore(path, save_delay=60)
+    events = []
+    store.add_listener(lambda event, *args: events.append((event, *args)))
+    store.set_content("Work", "Mail", "mine@example.com")
+    store.add_snippet("Work", "Ours", "added here")
+    store.save()
+
+    def theirs(other):
+        other.set_content("Work", "Phone", "456")
+        other.remove_snippet("Work", "Address")
+        other.add_section("Home")
+        other.add_snippet("Home", "Wifi", "password")
+    edit_file(path, theirs)
+    store.flush()
+
+    merged = ConfigStore(path)
+    assert merged.get_content("Work", "Mail") == "mine@example.com"
+    assert merged.get_content("Work", "Phone") == "456"
+    assert not merged.has_title("Work", "Address")
+    assert merged.get_content("Work", "Ours") == "added here"
+    assert merged.get_content("Home", "Wifi") == "password"
+    assert ("content_changed", "Work", "Phone") in events
+    assert not [event for event in events if event[0] == "conflict"]
+    assert not glob.glob(os.path.join(os.path.dirname(path), "*.conflict-*"))
+
+
+def test_conflict_keeps_ours_and_a_copy_of_theirs(path):
+    store = ConfigStore(path, save_delay=60)
+    events = []
+    store.add_listener(lambda event, *args: events.append((event, *args)))
+    store.set_content("Work", "Mail", "ours@example.com")
+    store.save()
+
+    def theirs(other):
+        other.set_content("Work", "Mail", "theirs@example.com")
+        other.set_content("Work", "Phone", "456")
+    edit_file(path, theirs)
+    store.flush()
+
+    merged = ConfigStore(path)
+    assert merged.get_content("Work", "Mail") == "ours@example.com"
+    assert merged.get_content("Work", "Phone") == "456"
+
+    conflicts = [event for event in events if event[0] == "conflict"]
+    assert len(conflicts) == 1
+    _, conflict_path, titles = conflicts[0]
+    assert titles == [("Work", "Mail")]
+    assert ConfigStore(conflict_path).get_content("Work", "Mail") == "theirs@example.com"
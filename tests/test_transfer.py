@@ -0,0 +1,51 @@
+# Exporting titles to CSV, JSON Lines and INI files and importing them again.
+import pytest
+
+from fastfill.core import transfer
+from fastfill.core.repository import SnippetRepository
+from fastfill.core.store import ConfigStore
+
+SNIPPETS = [("Work", "Mail", "me@example.com", False),
+            ("Work", "Letter", "Dear Sir,\n\nkind regards", False),
+            ("Work", "Quotes", 'He said "yes", then; no', False),
+            ("Home", "Wifi", "$ff2$ciphertext", True),
+            ("Home", "Umlaute", "Grüße aus Köln", False)]
+
+
+def repository(tmp_path, name):
+    return SnippetRepository(ConfigStore(str(tmp_path / name), save_delay=60))
+
+
+def snippets(store):
+    return [(section, title, store.get_content(section, title), encrypted)
+            for section in store.sections() for title, encrypted in store.titles(section)]
+
+
+@pytest.mark.parametrize("extension", [".csv", ".jsonl", ".ini"])
+def test_export_and_import_round_trip(tmp_path, extension):
+    source = repository(tmp_path, "source.ini")
+    source.add_batch(SNIPPETS)
+    path = str(tmp_path / f"export{extension}")
+
+    assert transfer.export_file(source.store, path) == len(SNIPPETS)
+
+    target = repository(tmp_path, "target.ini")
+    result = transfer.import_file(target, path)
+    assert result.added == len(SNIPPETS)
+    assert snippets(target.store) == SNIPPETS
+
+    assert transfer.import_file(target, path).skipped == len(SNIPPETS)
+
+
+def test_export_of_some_categories(tmp_path):
+    source = repository(tmp_path, "source.ini")
+    source.add_batch(SNIPPETS)
+    path = str(tmp_path / "export.jsonl")
+
+    assert transfer.export_file(source.store, path, sections=["Home"]) == 2
+    assert [row[:2] for row in transfer.read_file(path)] == [("Home", "Wifi"), ("Home", "Umlaute")]
+
+
+def test_unknown_file_type(tmp_path):
+    with pytest.raises(transfer.TransferError):
+        transfer.import_file(repository(tmp_path, "target.ini"), str(tmp_path / "export.txt"))
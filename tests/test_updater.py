@@ -0,0 +1,96 @@
+# fetch_version_info against a version.json server on localhost: caching, revalidation (HTTP 304) and timeouts.
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from fastfill.core import updater
+
+VERSION = {"version": "9.9.9", "installer_sha256": "0" * 64}
+ETAG = '"v1"'
+
+
+class VersionHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+        if server.delay:
+            time.sleep(server.delay)
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = json.dumps(VERSION).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", ETAG)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), VersionHandler)
+    server.daemon_threads = True
+    server.requests = []  # headers of every request
+    server.delay = 0  # seconds before the response
+    server.url = f"http://127.0.0.1:{server.server_port}/version.json"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "version_cache.json")
+
+
+def test_fetch_writes_cache(server, cache_path):
+    assert updater.fetch_version_info(cache_path, url=server.url, now=lambda: 1000) == VERSION
+
+    cache = updater.read_cache(cache_path)
+    assert cache["data"] == VERSION
+    assert cache["etag"] == ETAG
+    assert cache["fetched"] == 1000
+
+
+def test_cache_within_ttl_skips_request(server, cache_path):
+    updater.fetch_version_info(cache_path, url=server.url, ttl=60, now=lambda: 1000)
+    assert updater.fetch_version_info(cache_path, url=server.url, ttl=60, now=lambda: 1030) == VERSION
+    assert len(server.requests) == 1
+
+
+def test_expired_cache_is_revalidated(server, cache_path):
+    updater.fetch_version_info(cache_path, url=server.url, ttl=60, now=lambda: 1000)
+    assert updater.fetch_version_info(cache_path, url=server.url, ttl=60, now=lambda: 2000) == VERSION
+
+    assert len(server.requests) == 2
+    assert server.requests[1].get("If-None-Match") == ETAG  # answered with 304
+    assert updater.read_cache(cache_path)["fetched"] == 2000
+
+
+def test_timeout_without_cache_raises(server, cache_path):
+    server.delay = 1
+    started = time.monotonic()
+    with pytest.raises(requests.Timeout):
+        updater.fetch_version_info(cache_path, url=server.url, timeout=(0.2, 0.2))
+    assert time.monotonic() - started < 1
+
+
+def test_timeout_uses_cache(server, cache_path):
+    updater.fetch_version_info(cache_path, url=server.url, ttl=60, now=lambda: 1000)
+    server.delay = 1
+    started = time.monotonic()
+    assert updater.fetch_version_info(cache_path, url=server.url, ttl=60, timeout=(0.2, 0.2),
+                                      now=lambda: 2000) == VERSION
+    assert time.monotonic() - started < 1
+    assert updater.read_cache(cache_path)["fetched"] == 1000  # not revalidated